@@ -0,0 +1,59 @@
+""" Scrolls one pixel per frame over a level covered in a repeating
+32x32 graphic, drawn three ways: with a sprite for every copy of the
+graphic, with a BackgroundLayer drawing every visible copy, and with a
+BackgroundLayer drawing its cached strip. Reports how long drawing
+takes. Runs headless, as fast as possible.
+
+Usage: python background.py [level size in tiles] [frames]
+"""
+
+import sys
+import timeit
+
+import sgl
+from sgl.lib.Background import BackgroundLayer
+from sgl.lib.Sprite import Scene, Sprite
+
+def make_tile():
+    tile = sgl.make_surface(32, 32, 0.2, 0.3, 0.5)
+    with sgl.with_buffer(tile):
+        sgl.no_stroke()
+        sgl.set_fill(0.3, 0.4, 0.7)
+        sgl.draw_rect(0, 0, 16, 16)
+        sgl.draw_rect(16, 16, 16, 16)
+    return tile
+
+def measure(scene, frames):
+    timer = timeit.default_timer
+    times = []
+
+    for frame in range(frames):
+        scene.camera.position = frame, frame // 2
+        scene.update()
+
+        start = timer()
+        scene.draw()
+        times.append(timer() - start)
+
+    return 1000 * sum(times) / len(times)
+
+def run(size=100, frames=300):
+    sgl.init(320, 240, headless=True)
+    tile = make_tile()
+
+    scene = Scene()
+    for row in range(size):
+        for column in range(size):
+            sprite = scene.add(Sprite(tile))
+            sprite.position = column * 32, row * 32
+    scene.enable_spatial_index()
+    print("{:<16}{:>8.2f} ms/frame".format("sprites", measure(scene, frames)))
+
+    for name, cache_strip in (("copies", False), ("cached strip", True)):
+        scene = Scene()
+        background = scene.add(BackgroundLayer(tile))
+        background.cache_strip = cache_strip
+        print("{:<16}{:>8.2f} ms/frame".format(name, measure(scene, frames)))
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,61 @@
+""" Draws a HUD made of a few hundred shape sprites, with and without
+cache_as_surface, and reports how long each frame takes. Runs
+headless, as fast as possible.
+
+Usage: python cached_hud.py [frames]
+"""
+
+import sys
+import timeit
+
+import sgl
+from sgl.lib.Sprite import Scene, Sprite, RectSprite, EllipseSprite
+
+def make_hud():
+    hud = Sprite()
+    hud.size = 300, 60
+    hud.position = 10, 170
+    hud.fixed = True
+
+    for row in range(6):
+        for column in range(30):
+            if (row + column) % 2:
+                part = RectSprite()
+            else:
+                part = EllipseSprite()
+            part.size = 9, 9
+            part.position = column * 10, row * 10
+            part.fill_color = (column / 30.0, row / 6.0, 0.5)
+            hud.add(part)
+
+    return hud
+
+def measure(cached, frames):
+    scene = Scene()
+    hud = scene.add(make_hud())
+    hud.cache_as_surface = cached
+
+    timer = timeit.default_timer
+    times = []
+
+    for frame in range(frames):
+        start = timer()
+
+        # The HUD stays put while the world scrolls under it
+        scene.camera.x = frame
+        scene.update()
+        scene.draw()
+
+        times.append(timer() - start)
+
+    return 1000 * sum(times) / len(times)
+
+def run(frames=300):
+    sgl.init(320, 240, headless=True)
+
+    for cached in (False, True):
+        print("cache_as_surface={:<8}{:>8.2f} ms/frame".format(
+            str(cached), measure(cached, frames)))
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,90 @@
+""" Checks one moving sprite against a group of 1,000 others every
+frame through sgl.lib.Collision, and reports how long the checks take
+and how many Rect objects they create. Compares the cached collision
+bounds :any:`Sprite` uses with building a world_collision_rect for
+both sprites of every pair, which is what every sprite did before.
+Runs headless, as fast as possible.
+
+Usage: python collision.py [sprites] [frames]
+"""
+
+import sys
+import timeit
+
+import sgl
+import sgl.lib.Collision as collision
+from sgl.lib.Rect import Rect
+from sgl.lib.Sprite import Sprite, SpriteGroup
+
+try:
+    import tracemalloc
+    has_tracemalloc = True
+except ImportError:
+    has_tracemalloc = False
+
+class RectSprite(Sprite):
+    def is_being_collided(self, other):
+        return self.world_collision_rect.is_in(other.world_collision_rect)
+
+# Count every Rect made while the checks run
+created = [0]
+original_init = Rect.__init__
+
+def counting_init(self, *args):
+    created[0] += 1
+    original_init(self, *args)
+
+def measure(sprite_class, count, frames):
+    group = SpriteGroup()
+    for i in range(count):
+        sprite = group.add(sprite_class())
+        sprite.size = 16, 16
+        sprite.position = (i * 37) % 2000, (i * 53) % 2000
+        sprite.collision_rect = (2, 2, 12, 12)
+
+    player = sprite_class()
+    player.size = 16, 16
+    hits = [0]
+
+    def hit(other):
+        hits[0] += 1
+
+    collision.manager = collision.CollisionManager()
+    collision.add(player, group, hit)
+
+    timer = timeit.default_timer
+    times = []
+    created[0] = 0
+    Rect.__init__ = counting_init
+    if has_tracemalloc:
+        tracemalloc.start()
+
+    try:
+        for frame in range(frames):
+            start = timer()
+            player.position = (frame * 7) % 2000, (frame * 11) % 2000
+            collision.update()
+            times.append(timer() - start)
+
+        peak = tracemalloc.get_traced_memory()[1] if has_tracemalloc else 0
+    finally:
+        Rect.__init__ = original_init
+        if has_tracemalloc:
+            tracemalloc.stop()
+
+    return 1000 * sum(times) / len(times), created[0] // frames, peak, hits[0]
+
+def run(count=1000, frames=200):
+    sgl.init(320, 240, headless=True)
+
+    for name, sprite_class in (("Rects", RectSprite),
+                               ("bounds", Sprite)):
+        ms, rects, peak, hits = measure(sprite_class, count, frames)
+        line = "{:<8}{:>8.2f} ms/frame{:>8} Rects/frame{:>6} hits".format(
+            name, ms, rects, hits)
+        if has_tracemalloc:
+            line += "{:>8.1f} KB peak".format(peak / 1e3)
+        print(line)
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
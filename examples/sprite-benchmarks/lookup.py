@@ -0,0 +1,69 @@
+""" Finds the player and every enemy in a scene of a few thousand
+sprites spread over a few groups, by walking the sprite tree with
+isinstance checks and with the scene's index, and reports how long
+each takes per frame. Runs headless, as fast as possible.
+
+Usage: python lookup.py [sprites] [frames]
+"""
+
+import sys
+import timeit
+
+import sgl
+from sgl.lib.Sprite import Scene, Sprite, SpriteGroup
+
+class Enemy(Sprite):
+    pass
+
+class Player(Sprite):
+    pass
+
+def walk(sprite):
+    to_visit = [sprite]
+    while to_visit:
+        sprite = to_visit.pop()
+        yield sprite
+        to_visit.extend(sprite.subsprites)
+
+def by_walking(scene):
+    player = None
+    enemies = []
+    for sprite in walk(scene):
+        if isinstance(sprite, Player):
+            player = sprite
+        elif isinstance(sprite, Enemy):
+            enemies.append(sprite)
+    return player, enemies
+
+def by_index(scene):
+    return scene.find("player"), scene.by_tag("enemy")
+
+def run(count=5000, frames=200):
+    sgl.init(320, 240, headless=True)
+
+    scene = Scene()
+    groups = [scene.add(SpriteGroup()) for i in range(10)]
+    for i in range(count):
+        if i % 4 == 0:
+            sprite = Enemy()
+            sprite.add_tag("enemy")
+        else:
+            sprite = Sprite()
+        groups[i % len(groups)].add(sprite)
+
+    player = groups[-1].add(Player())
+    player.name = "player"
+
+    timer = timeit.default_timer
+    for name, find in (("walking", by_walking), ("index", by_index)):
+        start = timer()
+        for frame in range(frames):
+            found, enemies = find(scene)
+        elapsed = timer() - start
+
+        assert found is player and len(enemies) == (count + 3) // 4
+        print("{:<10}{:>10.3f} ms/frame".format(
+            name, 1000 * elapsed / frames))
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,85 @@
+""" Compares how much memory 100,000 sprites take with the slotted
+layout :any:`Sprite` uses, and with an ordinary ``__dict__``, which
+is what every sprite had before. Also times a loop that reads and
+writes attributes, like update code does.
+
+Each layout is measured in a fresh process, so that memory freed by
+one measurement can't hide the cost of the next.
+
+Usage: python memory.py [number of sprites]
+"""
+
+import gc
+import subprocess
+import sys
+import timeit
+
+import sgl
+from sgl.lib.Sprite import Sprite
+
+try:
+    import tracemalloc
+    has_tracemalloc = True
+except ImportError:
+    has_tracemalloc = False
+
+# A copy of Sprite with no slots. (A subclass would not do: it gets a
+# __dict__, but everything Sprite defines would still live in slots.)
+DictSprite = type("DictSprite", (object,), dict(
+    (name, value) for name, value in Sprite.__dict__.items()
+    if name not in Sprite.__slots__ and name != "__slots__"))
+
+def current_memory():
+    if has_tracemalloc:
+        return tracemalloc.get_traced_memory()[0]
+
+    # Python 2 has no tracemalloc, so fall back to the resident set
+    # size, which is Linux only
+    with open("/proc/self/statm") as statm:
+        pages = int(statm.read().split()[1])
+    import resource
+    return pages * resource.getpagesize()
+
+def measure(sprite_class, count):
+    gc.collect()
+    before = current_memory()
+    sprites = [sprite_class() for i in range(count)]
+    used = current_memory() - before
+
+    def move():
+        for sprite in sprites:
+            sprite.prev_x = sprite.x
+            sprite.x = sprite.x + 1
+            sprite.visible = sprite.active
+
+    seconds = min(timeit.repeat(move, number=1, repeat=5))
+    return used, seconds
+
+CLASSES = [
+    ("Sprite (slots)", Sprite),
+    ("Sprite (__dict__)", DictSprite),
+]
+
+def run_one(index, count):
+    sgl.init(320, 240, headless=True)
+    if has_tracemalloc:
+        tracemalloc.start()
+
+    used, seconds = measure(CLASSES[index][1], count)
+    print("{} {}".format(used, seconds))
+
+def run(count=100000):
+    for index, (name, sprite_class) in enumerate(CLASSES):
+        output = subprocess.check_output(
+            [sys.executable, __file__, "--one", str(index), str(count)])
+        used, seconds = output.split()[-2:]
+        used, seconds = int(used), float(seconds)
+
+        print("{:<24}{:>8.1f} MB{:>8} bytes/sprite{:>8.1f} ms/loop".format(
+            name, used / 1e6, used // count, seconds * 1000))
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["--one"]:
+        run_one(int(sys.argv[2]), int(sys.argv[3]))
+    else:
+        run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,79 @@
+""" Draws a few hundred spinning sprites, rotating them (smoothly)
+while drawing and with a baked RotationSet, and reports how long each
+frame takes. Runs headless, as fast as possible.
+
+Usage: python rotation_set.py [sprites] [frames]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+import sgl
+from sgl.lib.Sprite import Scene, Sprite
+from sgl.lib.RotationSet import load_or_bake
+
+def make_ship():
+    ship = sgl.make_surface(64, 48)
+    with sgl.with_buffer(ship):
+        sgl.set_fill(0.2, 0.6, 1.0)
+        sgl.draw_rect(0, 8, 48, 32)
+        sgl.set_fill(1.0, 0.8, 0.2)
+        sgl.draw_rect(48, 16, 16, 16)
+    return ship
+
+def measure(ship, rotations, count, frames):
+    scene = Scene()
+    sprites = []
+    for i in range(count):
+        sprite = scene.add(Sprite(ship))
+        sprite.position = (i * 37) % 320, (i * 53) % 240
+        sprite.a_x, sprite.a_y = 0.5, 0.5
+        sprite.pretty = True
+        sprite.rotation_set = rotations
+        sprites.append(sprite)
+
+    timer = timeit.default_timer
+    times = []
+
+    for frame in range(frames):
+        start = timer()
+
+        for i, sprite in enumerate(sprites):
+            sprite.angle = (frame * 3 + i * 7) % 360
+        scene.update()
+        scene.draw()
+
+        times.append(timer() - start)
+
+    return 1000 * sum(times) / len(times)
+
+def run(count=300, frames=120):
+    sgl.init(320, 240, headless=True)
+    ship = make_ship()
+
+    directory = tempfile.mkdtemp()
+    try:
+        file = os.path.join(directory, "ship.png")
+
+        start = timeit.default_timer()
+        load_or_bake(file, ship, steps=64)
+        baked = timeit.default_timer() - start
+
+        start = timeit.default_timer()
+        rotations = load_or_bake(file, ship, steps=64)
+        loaded = timeit.default_timer() - start
+
+        print("baking {:.1f} ms, loading from disk {:.1f} ms".format(
+            1000 * baked, 1000 * loaded))
+
+        for name, used in (("rotating", None), ("rotation set", rotations)):
+            print("{:<16}{:>8.2f} ms/frame".format(
+                name, measure(ship, used, count, frames)))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,115 @@
+""" Switches from one scene to another that loads a dozen large images
+and adds a few thousand sprites, first by building it all at once and
+then with App.prepare_scene, and reports the longest frame and how many
+frames the switch took. Runs headless, as fast as possible.
+
+Usage: python scene_preload.py [images] [sprites]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import timeit
+
+import sgl
+from sgl.lib.Sprite import App, RectSprite, Scene, Sprite
+
+def make_images(directory, count):
+    files = []
+    random.seed(1)
+    for i in range(count):
+        image = sgl.make_surface(1024, 1024)
+        with sgl.with_buffer(image):
+            sgl.no_stroke()
+            for j in range(400):
+                sgl.set_fill(random.random(), random.random(), random.random())
+                sgl.draw_rect(random.randrange(1024), random.randrange(1024),
+                              random.randrange(8, 128), random.randrange(8, 128))
+            file = os.path.join(directory, "image-{}.png".format(i))
+            sgl.save_image(file)
+        files.append(file)
+    return files
+
+class Level(Scene):
+    def __init__(self, files, count):
+        super(Level, self).__init__()
+        self.files = files
+        self.count = count
+
+    def build(self):
+        for file in self.files:
+            self.add(Sprite(sgl.load_image(file)))
+        for i in range(self.count):
+            self.add(RectSprite())
+
+    def prepare(self):
+        images = yield [sgl.load_image_async(file) for file in self.files]
+        for image in images:
+            self.add(Sprite(image))
+            yield
+
+        for i in range(self.count):
+            self.add(RectSprite())
+            if i % 50 == 0:
+                yield 0.5 + 0.5 * i / self.count
+
+class Spinner(Scene):
+    def __init__(self):
+        super(Spinner, self).__init__()
+        self.spinner = self.add(RectSprite())
+        self.spinner.size = 32, 32
+
+    def update(self):
+        super(Spinner, self).update()
+        self.spinner.angle += 5
+
+def measure(app, switch, is_switched):
+    timer = timeit.default_timer
+    times = []
+
+    first = True
+    while True:
+        start = timer()
+        if first:
+            switch()
+            first = False
+        app.update()
+        app.draw()
+        times.append(timer() - start)
+        if is_switched(): break
+
+    return 1000 * max(times), len(times)
+
+def run(images=12, sprites=3000):
+    sgl.init(320, 240, headless=True)
+
+    directory = tempfile.mkdtemp()
+    try:
+        files = make_images(directory, images)
+
+        app = App(Spinner())
+        level = Level(files, sprites)
+
+        def blocking():
+            level.build()
+            app.switch_scene(level)
+
+        longest, frames = measure(app, blocking, lambda: True)
+        print("{:<12}{:>8.1f} ms longest frame{:>6} frames".format(
+            "blocking", longest, frames))
+
+        app = App(Spinner())
+        level = Level(files, sprites)
+
+        longest, frames = measure(
+            app, lambda: app.prepare_scene(level, Spinner()),
+            lambda: app.scene is level)
+        print("{:<12}{:>8.1f} ms longest frame{:>6} frames".format(
+            "prepared", longest, frames))
+    finally:
+        shutil.rmtree(directory)
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
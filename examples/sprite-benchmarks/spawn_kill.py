@@ -0,0 +1,74 @@
+""" Spawns and kills lots of short-lived sprites, like a screen full
+of bullets, and reports how long each frame takes. Runs headless, as
+fast as possible.
+
+Usage: python spawn_kill.py [sprites per second] [seconds] [pool]
+
+If "pool" is given, bullets are reused through a SpritePool instead
+of being created from scratch.
+"""
+
+import sys
+import timeit
+
+import sgl
+from sgl.lib.Sprite import Scene, Sprite, SpritePool
+
+FPS = 60
+
+class Bullet(Sprite):
+    def __init__(self, lifetime=0):
+        super(Bullet, self).__init__()
+        self.size = 2, 2
+        self.lifetime = lifetime
+
+    def reset(self, lifetime):
+        super(Bullet, self).reset()
+        self.lifetime = lifetime
+
+    def update(self):
+        self.x += 1
+        self.lifetime -= 1
+        if self.lifetime <= 0:
+            self.kill()
+
+def run(per_second=10000, seconds=10, pool=False):
+    sgl.init(320, 240, headless=True)
+    sgl.set_fps_limit(FPS)
+
+    scene = Scene()
+    per_frame = per_second // FPS
+
+    if pool:
+        bullets = SpritePool(Bullet, per_frame * 90)
+
+    timer = timeit.default_timer
+    times = []
+
+    for frame in range(FPS * seconds):
+        start = timer()
+
+        for i in range(per_frame):
+            # Lifetimes vary, so sprites die all over the list
+            lifetime = 30 + (frame + i) % 60
+            if pool:
+                bullets.acquire(scene, lifetime)
+            else:
+                scene.add(Bullet(lifetime))
+
+        scene.update()
+        times.append(timer() - start)
+
+    times.sort()
+    print("{} sprites/s for {} s, {} alive at the end".format(
+        per_second, seconds, len(scene.subsprites)))
+    print("mean {:.2f} ms, p99 {:.2f} ms, worst {:.2f} ms".format(
+        1000 * sum(times) / len(times),
+        1000 * times[int(len(times) * 0.99)],
+        1000 * times[-1]))
+    if pool:
+        print("pool: {}".format(bullets.stats))
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:3] if arg.isdigit()]
+    run(*args, pool="pool" in sys.argv[1:])
@@ -0,0 +1,61 @@
+""" Moves and draws 100,000 bullets with a SpriteArray, under a
+scrolling camera, and reports how long each frame takes. Runs
+headless, as fast as possible.
+
+Usage: python sprite_array.py [number of bullets] [frames]
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+import sgl
+from sgl.lib.Sprite import Scene
+from sgl.lib.SpriteArray import SpriteArray
+
+class Bullets(SpriteArray):
+    def update(self):
+        super(Bullets, self).update()
+
+        # Wrap around a 4000x4000 field
+        e = self.entities
+        np.mod(e.x, 4000, out=e.x)
+        np.mod(e.y, 4000, out=e.y)
+
+def run(count=100000, frames=300):
+    sgl.init(320, 240, headless=True)
+
+    dot = sgl.make_surface(4, 4, 1.0)
+
+    scene = Scene()
+
+    random = np.random.RandomState(0)
+    bullets = Bullets(dot)
+    bullets.spawn_many(random.uniform(0, 4000, count),
+                       random.uniform(0, 4000, count),
+                       random.uniform(-100, 100, count),
+                       random.uniform(-100, 100, count))
+    scene.add(bullets)
+
+    timer = timeit.default_timer
+    times = []
+
+    for frame in range(frames):
+        start = timer()
+
+        scene.camera.x = frame * 5
+        scene.update()
+        scene.draw()
+
+        times.append(timer() - start)
+
+    times.sort()
+    print("{} entities, {} frames".format(count, frames))
+    print("mean {:.2f} ms, p99 {:.2f} ms, worst {:.2f} ms".format(
+        1000 * sum(times) / len(times),
+        1000 * times[int(len(times) * 0.99)],
+        1000 * times[-1]))
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
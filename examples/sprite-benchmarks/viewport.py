@@ -0,0 +1,72 @@
+""" Draws a scrolling list of a few hundred entries in a Viewport, the
+usual way and with cache_as_surface turned on (so it is drawn onto its
+own surface, which is scrolled), and reports how long drawing takes
+when the list is still, when it scrolls, and when an entry changes
+every frame. Runs headless, as fast as possible.
+
+Usage: python viewport.py [entries] [frames]
+"""
+
+import sys
+import timeit
+
+import sgl
+from sgl.lib.Sprite import Scene, Sprite, Viewport
+
+def make_entry(number):
+    entry = sgl.make_surface(280, 28)
+    with sgl.with_buffer(entry):
+        sgl.no_stroke()
+        sgl.set_fill(0.3 + 0.05 * (number % 8), 0.4, 0.8)
+        sgl.draw_rect(4, 4, 20, 20)
+        sgl.set_fill(0.9)
+        for i in range(number % 5 + 3):
+            sgl.draw_rect(32 + i * 30, 10, 24, 8)
+    return entry
+
+def measure(entries, cached, frames, scroll, change):
+    scene = Scene()
+
+    menu = scene.add(Viewport())
+    menu.position = 10, 10
+    menu.size = 300, 220
+    menu.background_color = 0.1
+
+    sprites = []
+    for i, entry in enumerate(entries):
+        sprite = menu.add(Sprite(entry))
+        sprite.position = 10, i * 32
+        sprites.append(sprite)
+    menu.enable_spatial_index(64)
+    menu.cache_as_surface = cached
+
+    timer = timeit.default_timer
+    times = []
+
+    for frame in range(frames):
+        if scroll:
+            menu.camera.y = (frame * 2) % (len(entries) * 32 - 220)
+        if change:
+            sprites[frame % len(sprites)].x = 10 + frame % 3
+        scene.update()
+
+        start = timer()
+        scene.draw()
+        times.append(timer() - start)
+
+    return 1000 * sum(times) / len(times)
+
+def run(count=400, frames=300):
+    sgl.init(320, 240, headless=True)
+    entries = [make_entry(i) for i in range(count)]
+
+    for name, scroll, change in (("still", False, False),
+                                 ("scrolling", True, False),
+                                 ("changing", False, True)):
+        print("{:<12}{:>8.2f} ms/frame drawn{:>8.2f} ms/frame cached".format(
+            name,
+            measure(entries, False, frames, scroll, change),
+            measure(entries, True, frames, scroll, change)))
+
+if __name__ == "__main__":
+    run(*[int(arg) for arg in sys.argv[1:3]])
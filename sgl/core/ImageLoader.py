@@ -0,0 +1,124 @@
+""" Loads images on background threads, so that a game can keep
+running while the images for its next level are decoded. Used by
+:py:func:`sgl.load_image_async` and :py:func:`sgl.load_alpha_image_async`.
+
+Decoding an image (which is the slow part) happens on one of a few
+loading threads. Turning the decoded image into something that can be
+drawn quickly has to happen on the main thread, so the backend supplies
+a function to do that, which is called the first time the image is
+asked for, or right before the callback is called. """
+
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+class ImageLoad(object):
+    """ Represents an image that is being loaded from the hard drive,
+    or has been. Returned by :py:func:`sgl.load_image_async`. """
+
+    def __init__(self, file, finish, callback=None):
+        self.file = file
+        """ str: The file the image is being loaded from. """
+
+        self.finish = finish
+        self.callback = callback
+
+        self.error = None
+        """ Exception: If loading the image failed, the reason why.
+        Otherwise ``None``. """
+
+        self.decoded = None
+        self.image = None
+
+        self.finished = threading.Event()
+
+    @property
+    def done(self):
+        """ bool: Whether the image has been loaded (or has failed to
+        be loaded). """
+
+        return self.finished.is_set()
+
+    def wait(self, timeout=None):
+        """ Blocks until the image has been loaded.
+
+        :param float timeout: The maximum amount of time to wait, in
+            seconds. If ``None``, waits forever.
+
+        :return: Whether the image has been loaded
+        :rtype: bool
+        """
+
+        self.finished.wait(timeout)
+        return self.done
+
+    def result(self):
+        """ Returns the loaded image, waiting for it first if it is not
+        done yet. Only call this from the main thread.
+
+        :return: The loaded image
+        :rtype: SGL surface
+
+        :raises: Whatever error loading the image caused, if any.
+        """
+
+        self.finished.wait()
+        if self.error is not None:
+            raise self.error
+
+        if self.image is None:
+            self.image = self.finish(self.decoded)
+            self.decoded = None
+        return self.image
+
+class ImageLoader(object):
+    # """ Internal use only. Owns the loading threads. The backend
+    # supplies how to decode a file, which has to be safe to call from
+    # any thread. """
+
+    def __init__(self, decode, threads=2):
+        self.decode = decode
+
+        self.queue = queue.Queue()
+        self.finished = queue.Queue()
+
+        self.threads = []
+        for i in range(threads):
+            thread = threading.Thread(target=self.run)
+            thread.daemon = True
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, job):
+        self.queue.put(job)
+        return job
+
+    def run(self):
+        while True:
+            job = self.queue.get()
+
+            try:
+                job.decoded = self.decode(job.file)
+            except Exception as error:
+                job.error = error
+
+            job.finished.set()
+
+            if job.callback:
+                self.finished.put(job)
+
+    def run_callbacks(self):
+        # """ Calls the callbacks of finished jobs. Called by the
+        # backend once per frame, so callbacks happen on the main
+        # thread, where it is safe to finish images and touch game
+        # state. """
+
+        while True:
+            try:
+                job = self.finished.get_nowait()
+            except queue.Empty:
+                return
+            job.callback(job)
@@ -0,0 +1,130 @@
+""" Saves images on a background thread, so that taking a screenshot
+does not make the game hitch while the image is being encoded. Used by
+:py:func:`sgl.save_image_async` and :py:func:`sgl.save_image_burst`.
+
+The backend snapshots the surface (which is fast), and hands the
+snapshot to an :any:`ImageWriter`, which encodes and writes it on its
+own thread. The queue between them is bounded, so if the game takes
+screenshots faster than they can be written, it waits instead of
+eating all your memory. """
+
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+class ImageJob(object):
+    """ Represents an image that is waiting to be written to disk, or
+    has been. Returned by :py:func:`sgl.save_image_async`. """
+
+    def __init__(self, file, callback=None):
+        self.file = file
+        """ str: The file the image is being written to. """
+
+        self.callback = callback
+
+        self.error = None
+        """ Exception: If writing the image failed, the reason
+        why. Otherwise ``None``. """
+
+        self.finished = threading.Event()
+
+    @property
+    def done(self):
+        """ bool: Whether the image has been written (or has failed to
+        be written). """
+
+        return self.finished.is_set()
+
+    def wait(self, timeout=None):
+        """ Blocks until the image has been written.
+
+        :param float timeout: The maximum amount of time to wait, in
+            seconds. If ``None``, waits forever.
+
+        :return: Whether the image has been written
+        :rtype: bool
+        """
+
+        self.finished.wait(timeout)
+        return self.done
+
+class BurstCapture(object):
+    """ Represents a series of consecutive frames being saved. Returned
+    by :py:func:`sgl.save_image_burst`. """
+
+    def __init__(self, file, count, callback=None):
+        self.file = file
+        self.count = count
+        self.callback = callback
+
+        self.jobs = []
+        """ list: An :any:`ImageJob` for each frame captured so far. """
+
+    @property
+    def capturing(self):
+        """ bool: Whether there are still frames left to capture. """
+
+        return len(self.jobs) < self.count
+
+    @property
+    def done(self):
+        """ bool: Whether every frame has been captured and written. """
+
+        return (not self.capturing
+                and all(job.done for job in self.jobs))
+
+    def next_file(self):
+        # """ Internal use only. """
+
+        return self.file.format(len(self.jobs))
+
+class ImageWriter(object):
+    # """ Internal use only. Owns the writing thread. The backend
+    # supplies how to save a snapshot, and what to do with it
+    # afterwards (so snapshots can be recycled). """
+
+    def __init__(self, save, release, queue_size=8):
+        self.save = save
+        self.release = release
+
+        self.queue = queue.Queue(queue_size)
+        self.finished = queue.Queue()
+
+        self.thread = threading.Thread(target=self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def submit(self, snapshot, job):
+        # Blocks if the queue is full
+        self.queue.put((snapshot, job))
+        return job
+
+    def run(self):
+        while True:
+            snapshot, job = self.queue.get()
+
+            try:
+                self.save(snapshot, job.file)
+            except Exception as error:
+                job.error = error
+
+            self.release(snapshot)
+            job.finished.set()
+
+            if job.callback:
+                self.finished.put(job)
+
+    def run_callbacks(self):
+        # """ Calls the callbacks of finished jobs. Called by the
+        # backend once per frame, so callbacks happen on the main
+        # thread, where it is safe to touch game state. """
+
+        while True:
+            try:
+                job = self.finished.get_nowait()
+            except queue.Empty:
+                return
+            job.callback(job)
@@ -14,14 +14,20 @@ except:
 
 try:
     import numpy as np
+    import pygame.pixelcopy
     has_numpy = True
 except:
     has_numpy = False
 
+import itertools
 import os
 from Constants import *
 from Errors import *
 import Util
+import SharedFramebuffer
+import ImageLoader
+import ImageWriter
+import Voices
 
 class Backend:
     class Meta:
@@ -249,6 +255,16 @@ class Backend:
     movie_mode = False
     movie_realtime = False
 
+    headless = False
+
+    framebuffer_writer = None
+
+    image_loader = None
+    image_writer = None
+    # (size, flags, bitsize) -> surfaces the image writer is done with
+    snapshot_pool = {}
+    bursts = []
+
     class gfx_state:
         transparent_color = (255,0,255)
 
@@ -268,14 +284,24 @@ class Backend:
     gfx_stack = []
 
     ## SYSTEM
-    def init(self, width, height, scale=1, fullscreen=False):
+    def init(self, width, height, scale=1, fullscreen=False, headless=False):
         self.screen_width = width
         self.screen_height = height
         self.scale = scale
+        self.headless = headless
 
         # centers window in middle of screen
         os.environ["SDL_VIDEO_CENTERED"] = "1"
 
+        # SDL reads these when pygame is initialized, so they have to
+        # be set first. The dummy drivers still let us set a display
+        # mode (which Surface.convert needs), they just never show it.
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+            scale = self.scale = 1
+            fullscreen = False
+
         if fullscreen:
             flags = pygame.FULLSCREEN
         else:
@@ -294,8 +320,13 @@ class Backend:
 
         pygame.mixer.quit()
         pygame.mixer.init(44100)
+        self.voices = Voices.VoiceManager(
+            self.get_channels(), 
+            lambda: pygame.time.get_ticks() / 1000.0
+        )
 
         self.clock = pygame.time.Clock()
+        self.frame_count = 0
 
         self.real_inputs = [input.keyboard, input.mouse]
         self.fake_inputs = []
@@ -313,8 +344,14 @@ class Backend:
         self.movie_realtime = realtime
  
     def frame(self):
-        if self.scale == 1:
+        self.frame_count += 1
+
+        if self.headless:
+            # Nobody is looking, so don't bother presenting anything
+            pass
+        elif self.scale == 1:
             self.window.blit(self.display, (0,0))
+            pygame.display.flip()
         else:
             pygame.transform.scale(
                 self.display,        # source
@@ -322,8 +359,21 @@ class Backend:
                  self.screen_height * self.scale),   # size
                 self.window          # destination
             )
+            pygame.display.flip()
+
+        if self.framebuffer_writer:
+            pygame.pixelcopy.surface_to_array(
+                self.framebuffer_writer.begin(), self.display, "P")
+            self.framebuffer_writer.finish()
+
+        if self.bursts:
+            self.capture_bursts()
 
-        pygame.display.flip()
+        if self.image_writer:
+            self.image_writer.run_callbacks()
+
+        if self.image_loader:
+            self.image_loader.run_callbacks()
 
         self.keys_just_down = []
         self.keys_just_up = []
@@ -373,6 +423,9 @@ class Backend:
 
         if self.movie_mode == True and self.movie_realtime == False: return
 
+        # Fixed time steps, but without sleeping
+        if self.headless and self.fps: return
+
         self.dt = self.clock.tick(self.fps) / 1000.0
 
     def add_input(self, type):
@@ -446,20 +499,48 @@ class Backend:
         else:
             return 1./self.fps
 
+    def get_frame_count(self):
+        return self.frame_count
+
     def is_running(self):
         return self.running
 
     def end(self):
         self.running = False
 
+    def resume(self):
+        self.running = True
+
     ## AUDIO
     def load_sound(self, file):
         sound = pygame.mixer.Sound(file)
         return sound
 
-    def play_sound(self, sound, volume=1.0, loops=0):
-        sound.set_volume(volume)
-        sound.play(loops)
+    def play_sound(self, sound, volume=1.0, loops=0, pan=0.0, priority=0):
+        return self.voices.play(sound, volume, loops, pan, priority)
+
+    def get_channels(self):
+        return [pygame.mixer.Channel(i) 
+                for i in range(pygame.mixer.get_num_channels())]
+
+    def set_voice_count(self, count):
+        pygame.mixer.set_num_channels(count)
+        self.voices.set_channels(self.get_channels())
+
+    def set_sound_limit(self, sound, max_voices=0, max_plays=0, interval=0.0):
+        self.voices.set_limit(sound, max_voices, max_plays, interval)
+
+    def stop_voice(self, voice):
+        voice.stop()
+
+    def set_voice_volume(self, voice, volume, pan=0.0):
+        voice.set_volume(volume, pan)
+
+    def is_voice_playing(self, voice):
+        return voice.playing
+
+    def get_sound_stats(self):
+        return self.voices.get_stats()
 
     def stop_sound(self, sound):
         sound.stop()
@@ -501,20 +582,55 @@ class Backend:
         self.gfx_state.transparent_color = Util.resolve_color(color)
 
     def load_image(self, file, use_transparent_color=True):
+        return self.finish_image(pygame.image.load(file), use_transparent_color)
+
+    def load_alpha_image(self, file):
         image = pygame.image.load(file)
+        image = image.convert_alpha()
+        return image
+
+    def finish_image(self, image, use_transparent_color=True):
         image = image.convert()
         if use_transparent_color: 
             image.set_colorkey(self.gfx_state.transparent_color)
         return image
 
-    def load_alpha_image(self, file):
-        image = pygame.image.load(file)
-        image = image.convert_alpha()
-        return image
+    def load_image_async(self, file, use_transparent_color=True, 
+                         callback=None):
+        def finish(image):
+            return self.finish_image(image, use_transparent_color)
+
+        job = ImageLoader.ImageLoad(file, finish, callback)
+        return self.get_image_loader().submit(job)
+
+    def load_alpha_image_async(self, file, callback=None):
+        job = ImageLoader.ImageLoad(file, pygame.Surface.convert_alpha, callback)
+        return self.get_image_loader().submit(job)
+
+    def get_image_loader(self):
+        if not self.image_loader:
+            # pygame.image.load lets go of the GIL while decoding, so
+            # the threads really do run at the same time
+            self.image_loader = ImageLoader.ImageLoader(pygame.image.load)
+        return self.image_loader
 
     def blitf(self, thing, x, y):
         self.gfx_state.buffer.blit(thing, (x, y))
 
+    def blit_many(self, thing, positions):
+        if isinstance(thing, list):
+            pairs = zip(thing, positions)
+        else:
+            pairs = zip(itertools.repeat(thing), positions)
+
+        buffer = self.gfx_state.buffer
+        if hasattr(buffer, "blits"):
+            # Only exists in Pygame 1.9.4 and up
+            buffer.blits(pairs, False)
+        else:
+            for thing, position in pairs:
+                buffer.blit(thing, position)
+
     def blit(self, thing, x, y, alpha=255, flip_v=False, flip_h=False, 
              angle=0, width=None, height=None, scale=1, a_x=0, a_y=0, 
              src_x=0, src_y=0, src_width=None, src_height=None, 
@@ -763,10 +879,13 @@ class Backend:
                 #     0
                 # )
 
-                # Apparently this is more optimized
-                self.gfx_state.buffer.fill(
+                # Apparently this is more optimized. Some versions of
+                # Pygame fill too much if the rectangle starts past the
+                # left or top edge, though, so it is clipped first
+                buffer = self.gfx_state.buffer
+                buffer.fill(
                     self.gfx_state.fill_color,
-                    ((x, y), (width, height))
+                    pygame.Rect(x, y, width, height).clip(buffer.get_clip())
                 )
 
         if self.gfx_state.stroke_color != None and self.gfx_state.stroke_weight > 0:
@@ -936,6 +1055,9 @@ class Backend:
 
         return surface
 
+    def scroll(self, dx, dy):
+        self.gfx_state.buffer.scroll(dx, dy)
+
     def set_buffer(self, surface):
         self.gfx_state.buffer = surface
 
@@ -1008,8 +1130,80 @@ class Backend:
     def save_image(self, file):
         pygame.image.save(self.gfx_state.buffer, file)
 
-    def to_numpy(self):
-        return pygame.surfarray.pixels3d(self.gfx_state.buffer)
+    def save_image_async(self, file, callback=None):
+        job = ImageWriter.ImageJob(file, callback)
+        return self.get_image_writer().submit(
+            self.snapshot(self.gfx_state.buffer), job)
+
+    def save_image_burst(self, file, count, callback=None):
+        burst = ImageWriter.BurstCapture(file, count, callback)
+        self.bursts.append(burst)
+        return burst
+
+    def capture_bursts(self):
+        for burst in self.bursts[:]:
+            if burst.capturing:
+                job = ImageWriter.ImageJob(burst.next_file())
+                burst.jobs.append(job)
+                self.get_image_writer().submit(self.snapshot(self.display), job)
+
+            elif burst.done:
+                self.bursts.remove(burst)
+                if burst.callback: burst.callback(burst)
+
+    def get_image_writer(self):
+        if not self.image_writer:
+            self.image_writer = ImageWriter.ImageWriter(
+                pygame.image.save, self.release_snapshot)
+        return self.image_writer
+
+    def snapshot(self, surface):
+        # Blitting into a surface the writer has finished with is
+        # cheaper than allocating a new one every time. That only
+        # gives an exact copy of plain surfaces, though; anything with
+        # transparency just gets copied.
+        if not self.can_recycle(surface):
+            return surface.copy()
+
+        key = (surface.get_size(), surface.get_flags(), surface.get_bitsize())
+        pool = self.snapshot_pool.get(key)
+        if pool:
+            copy = pool.pop()
+            copy.blit(surface, (0,0))
+            return copy
+
+        return surface.copy()
+
+    def can_recycle(self, surface):
+        return (surface.get_colorkey() is None
+                and not surface.get_flags() & pygame.SRCALPHA
+                and surface.get_alpha() in (None, 255))
+
+    def release_snapshot(self, surface):
+        # Called from the writer thread
+        if not self.can_recycle(surface):
+            return
+
+        key = (surface.get_size(), surface.get_flags(), surface.get_bitsize())
+        pool = self.snapshot_pool.setdefault(key, [])
+        if len(pool) < 4:
+            pool.append(surface)
+
+    def to_numpy(self, array=None):
+        if array is None:
+            return pygame.surfarray.pixels3d(self.gfx_state.buffer)
+
+        pygame.pixelcopy.surface_to_array(array, self.gfx_state.buffer, "P")
+        return array
+
+    def export_framebuffer(self, name, slots=3):
+        if self.framebuffer_writer:
+            self.framebuffer_writer.close()
+            self.framebuffer_writer = None
+
+        if name is not None:
+            self.framebuffer_writer = SharedFramebuffer.FramebufferWriter(
+                name, self.screen_width, self.screen_height, slots)
 
     def from_numpy(self, array):
         return pygame.surfarray.make_surface(array)
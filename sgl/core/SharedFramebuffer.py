@@ -0,0 +1,282 @@
+""" Publishes frames into a named block of shared memory, so other
+processes on the same machine can read them without copying them or
+slowing the game down. Used by :py:func:`sgl.export_framebuffer`.
+
+The block starts with a header, followed by a ring of frame slots
+(three by default, so the writer and a reader never fight over the
+same slot)::
+
+    magic      4s   "SGLF"
+    version    I    1
+    width      I
+    height     I
+    channels   I    3 (RGB)
+    slots      I
+    sequence   Q    number of the newest complete frame (0 = none yet)
+    slot_seqs  Q*   for each slot, the frame number it holds (0 = being written)
+
+Each slot holds ``width * height * channels`` bytes, indexed
+``[x, y, channel]`` like :py:func:`sgl.to_numpy`. Frame ``n`` always
+lives in slot ``n % slots``.
+
+Readers use :any:`FramebufferReader`, which does not need SGL (or
+Pygame) to be initialized.
+
+Readers are separate programs that find the block by name, so it has
+to be named shared memory. (Memory shared only with child processes,
+like :any:`sgl.lib.Harness` uses, can't be found that way.) """
+
+import atexit
+import mmap
+import os
+import struct
+import tempfile
+
+try:
+    import numpy as np
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+try:
+    from multiprocessing import shared_memory
+    has_shared_memory = True
+except ImportError:
+    has_shared_memory = False
+
+MAGIC = b"SGLF"
+VERSION = 1
+CHANNELS = 3
+
+HEADER = struct.Struct("<4sIIIIIQ")
+SLOT_SEQUENCE = struct.Struct("<Q")
+
+SEQUENCE_OFFSET = HEADER.size - SLOT_SEQUENCE.size
+
+def header_size(slots):
+    # Round up so frame data is nicely aligned
+    size = HEADER.size + SLOT_SEQUENCE.size * slots
+    return (size + 63) // 64 * 64
+
+class Segment(object):
+    # """ Internal use only. A named block of shared memory. Uses
+    # multiprocessing.shared_memory when it exists, and a memory
+    # mapped file otherwise (such as on Python 2). """
+
+    def __init__(self, name, size=0, create=False):
+        self.name = name
+        self.create = create
+        self.shm = None
+        self.file = None
+
+        if has_shared_memory:
+            if create:
+                try:
+                    self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+                except OSError:
+                    # Left behind by a previous run that crashed
+                    old = shared_memory.SharedMemory(name)
+                    old.close()
+                    old.unlink()
+                    self.shm = shared_memory.SharedMemory(name, create=True, size=size)
+            else:
+                self.shm = attach_untracked(name)
+            self.buffer = self.shm.buf
+
+        else:
+            path = segment_path(name)
+            if create:
+                self.file = open(path, "w+b")
+                self.file.truncate(size)
+            else:
+                self.file = open(path, "r+b")
+            self.buffer = mmap.mmap(self.file.fileno(), 0)
+
+    def close(self):
+        # numpy views keep the buffer alive, so closing can fail if a
+        # reader is still holding a frame. That's their problem.
+        try:
+            if self.shm:
+                self.shm.close()
+                if self.create: self.shm.unlink()
+            else:
+                self.buffer.close()
+                self.file.close()
+                if self.create: os.remove(segment_path(self.name))
+        except (BufferError, OSError):
+            pass
+
+def segment_path(name):
+    if os.path.isdir("/dev/shm"):
+        directory = "/dev/shm"
+    else:
+        directory = tempfile.gettempdir()
+    return os.path.join(directory, "sgl-" + name)
+
+def attach_untracked(name):
+    # Python's resource tracker will otherwise delete the block when
+    # the *reader* exits, pulling it out from under the game.
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except (ImportError, AttributeError):
+            pass
+        return shm
+
+class FramebufferWriter(object):
+    # """ Internal use only. The game side of a shared framebuffer.
+    # Backends call publish() with each presented frame. """
+
+    def __init__(self, name, width, height, slots=3):
+        if not has_numpy:
+            raise ImportError("NumPy is required to export the framebuffer")
+
+        self.name = name
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.sequence = 0
+
+        frame_size = width * height * CHANNELS
+        offset = header_size(slots)
+
+        self.segment = Segment(name, offset + frame_size * slots, create=True)
+        buffer = self.segment.buffer
+
+        HEADER.pack_into(buffer, 0, MAGIC, VERSION, width, height,
+                         CHANNELS, slots, 0)
+        for slot in range(slots):
+            SLOT_SEQUENCE.pack_into(buffer, HEADER.size + SLOT_SEQUENCE.size * slot, 0)
+
+        self.frames = [
+            np.frombuffer(buffer, dtype=np.uint8, count=frame_size,
+                          offset=offset + frame_size * slot)
+            .reshape((width, height, CHANNELS))
+            for slot in range(slots)
+        ]
+
+        atexit.register(self.close)
+
+    def begin(self):
+        """ Marks the next slot as being written, and returns the array
+        to write the frame into. """
+
+        self.sequence += 1
+        self.slot = self.sequence % self.slots
+
+        SLOT_SEQUENCE.pack_into(self.segment.buffer,
+                                HEADER.size + SLOT_SEQUENCE.size * self.slot, 0)
+        return self.frames[self.slot]
+
+    def finish(self):
+        """ Makes the frame written since :any:`begin` visible to
+        readers. """
+
+        buffer = self.segment.buffer
+        SLOT_SEQUENCE.pack_into(buffer, HEADER.size + SLOT_SEQUENCE.size * self.slot,
+                                self.sequence)
+        SLOT_SEQUENCE.pack_into(buffer, SEQUENCE_OFFSET, self.sequence)
+
+    def close(self):
+        if self.segment:
+            self.frames = []
+            self.segment.close()
+            self.segment = None
+
+class FramebufferReader(object):
+    """ Reads frames published by :py:func:`sgl.export_framebuffer`
+    from another process.
+
+    Frames are returned as NumPy arrays that point straight into
+    shared memory, so reading is free, but the game will eventually
+    overwrite them. Check :any:`is_valid` after you are done with a
+    frame (or copy it) if you need to be sure it was not torn. ::
+
+        reader = FramebufferReader("my-game")
+        last = 0
+        while True:
+            sequence, frame = reader.latest()
+            if sequence != last:
+                encode(frame)
+                if reader.is_valid(sequence):
+                    last = sequence
+    """
+
+    def __init__(self, name):
+        """
+        Args:
+            name (str): The name passed to
+                :py:func:`sgl.export_framebuffer`.
+        """
+
+        self.segment = Segment(name)
+        buffer = self.segment.buffer
+
+        (magic, version, self.width, self.height, self.channels,
+         self.slots, sequence) = HEADER.unpack_from(buffer, 0)
+
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("\"{}\" is not an SGL framebuffer".format(name))
+
+        frame_size = self.width * self.height * self.channels
+        offset = header_size(self.slots)
+
+        self.frames = [
+            np.frombuffer(buffer, dtype=np.uint8, count=frame_size,
+                          offset=offset + frame_size * slot)
+            .reshape((self.width, self.height, self.channels))
+            for slot in range(self.slots)
+        ]
+
+    @property
+    def sequence(self):
+        """ int: The number of the newest complete frame. Starts at 1;
+        0 means nothing has been published yet. """
+
+        return SLOT_SEQUENCE.unpack_from(self.segment.buffer, SEQUENCE_OFFSET)[0]
+
+    def slot_sequence(self, slot):
+        # """ Internal use only. """
+
+        return SLOT_SEQUENCE.unpack_from(
+            self.segment.buffer, HEADER.size + SLOT_SEQUENCE.size * slot)[0]
+
+    def latest(self):
+        """ Gets the newest complete frame.
+
+        Returns:
+            tuple: ``(sequence, frame)``. ``frame`` is ``None`` if
+                 nothing has been published yet. """
+
+        while True:
+            sequence = self.sequence
+            if sequence == 0:
+                return 0, None
+
+            slot = sequence % self.slots
+            if self.slot_sequence(slot) == sequence:
+                return sequence, self.frames[slot]
+            # The game lapped us while we were looking. Try again.
+
+    def is_valid(self, sequence):
+        """ Returns whether the frame with this sequence number is
+        still intact--in other words, whether the game has not started
+        overwriting it yet.
+
+        Args:
+            sequence (int): A sequence number returned by :any:`latest`.
+
+        Returns:
+            bool: Whether the frame is still intact. """
+
+        return self.slot_sequence(sequence % self.slots) == sequence
+
+    def close(self):
+        """ Detaches from the shared memory. """
+
+        self.frames = []
+        self.segment.close()
@@ -0,0 +1,184 @@
+""" Decides which sounds get to play, and on which channel. Used by the
+backends to implement :py:func:`sgl.play_sound`.
+
+A mixer only has so many channels (*voices*). When they are all busy,
+a new sound steals the voice of the least important sound playing,
+oldest first--unless everything playing is more important than it, in
+which case the new sound is dropped. Sounds can also be limited in how
+many copies of them play at once, and how often they can be started,
+so that forty explosions going off in the same frame don't drown out
+everything else (or cost forty times as much to mix). """
+
+from collections import deque
+
+class Voice(object):
+    """ One sound playing on one channel. Returned by
+    :py:func:`sgl.play_sound`. Once the sound finishes, or is stopped
+    or stolen, the voice is dead, and changing it does nothing. """
+
+    def __init__(self, manager, channel, sound, priority, started, number):
+        self.manager = manager
+        self.channel = channel
+        self.sound = sound
+        self.priority = priority
+        self.started = started
+        # Breaks ties between voices started at the same time
+        self.number = number
+
+    @property
+    def playing(self):
+        """ bool: Whether this voice is still playing its sound. """
+
+        return (self.manager.owners.get(self.channel) is self
+                and self.channel.get_busy())
+
+    def set_volume(self, volume, pan=0.0):
+        # """ Internal use only. See sgl.set_voice_volume. """
+
+        if self.playing:
+            self.channel.set_volume(*pan_volume(volume, pan))
+
+    def stop(self):
+        # """ Internal use only. See sgl.stop_voice. """
+
+        if self.playing:
+            self.channel.stop()
+            del self.manager.owners[self.channel]
+
+class SoundLimit(object):
+    # """ Internal use only. The limits set by sgl.set_sound_limit. """
+
+    def __init__(self, max_voices=0, max_plays=0, interval=0.0):
+        self.max_voices = max_voices
+        self.max_plays = max_plays
+        self.interval = interval
+        self.recent = deque()
+
+def pan_volume(volume, pan):
+    # """ Internal use only. Turns a volume and a pan from -1.0 (left)
+    # to 1.0 (right) into left and right channel volumes. """
+
+    left = volume * min(1.0, 1.0 - pan)
+    right = volume * min(1.0, 1.0 + pan)
+    return left, right
+
+class VoiceManager(object):
+    # """ Internal use only. Knows nothing about any particular audio
+    # library: channels only need play(sound, loops), stop(),
+    # get_busy() and set_volume(left, right), which is exactly what
+    # pygame.mixer.Channel has. """
+
+    def __init__(self, channels, time):
+        self.time = time
+        self.limits = {}
+        self.channels = []
+        self.owners = {}
+
+        self.started = 0
+        self.stolen = 0
+        self.throttled = 0
+        self.dropped = 0
+
+        self.set_channels(channels)
+
+    def set_channels(self, channels):
+        # The new channel objects may not be the old ones, even for the
+        # channels that are kept, so voices are moved over by number.
+        # Voices on channels that are gone were stopped with them.
+        old_channels = self.channels
+        self.channels = list(channels)
+
+        owners = {}
+        for old, new in zip(old_channels, self.channels):
+            voice = self.owners.get(old)
+            if voice:
+                voice.channel = new
+                owners[new] = voice
+        self.owners = owners
+
+    def set_limit(self, sound, max_voices=0, max_plays=0, interval=0.0):
+        if max_voices or max_plays:
+            self.limits[sound] = SoundLimit(max_voices, max_plays, interval)
+        else:
+            self.limits.pop(sound, None)
+
+    def active_voices(self):
+        voices = []
+        for channel in self.channels:
+            voice = self.owners.get(channel)
+            if voice and channel.get_busy():
+                voices.append(voice)
+            elif voice:
+                del self.owners[channel]
+        return voices
+
+    def play(self, sound, volume=1.0, loops=0, pan=0.0, priority=0):
+        now = self.time()
+        limit = self.limits.get(sound)
+        voices = self.active_voices()
+
+        if limit and limit.max_plays:
+            while limit.recent and now - limit.recent[0] >= limit.interval:
+                limit.recent.popleft()
+            if len(limit.recent) >= limit.max_plays:
+                self.throttled += 1
+                return None
+
+        if limit and limit.max_voices:
+            same = [voice for voice in voices if voice.sound is sound]
+            if len(same) >= limit.max_voices:
+                # Only this sound's own voices are fair game
+                voices = same
+                channel = None
+            else:
+                channel = self.free_channel()
+        else:
+            channel = self.free_channel()
+
+        if channel is None:
+            victim = self.choose_victim(voices, priority)
+            if victim is None:
+                self.dropped += 1
+                return None
+
+            channel = victim.channel
+            channel.stop()
+            self.stolen += 1
+
+        channel.play(sound, loops)
+        # Playing resets the channel's volume, so this has to be after
+        channel.set_volume(*pan_volume(volume, pan))
+
+        voice = Voice(self, channel, sound, priority, now, self.started)
+        self.owners[channel] = voice
+        self.started += 1
+
+        if limit and limit.max_plays:
+            limit.recent.append(now)
+
+        return voice
+
+    def free_channel(self):
+        for channel in self.channels:
+            if not channel.get_busy():
+                self.owners.pop(channel, None)
+                return channel
+        return None
+
+    def choose_victim(self, voices, priority):
+        # Lowest priority first, then oldest
+        candidates = [voice for voice in voices if voice.priority <= priority]
+        if not candidates:
+            return None
+        return min(candidates,
+                   key=lambda voice: (voice.priority, voice.started, voice.number))
+
+    def get_stats(self):
+        return {
+            "voices": len(self.channels),
+            "playing": len(self.active_voices()),
+            "started": self.started,
+            "stolen": self.stolen,
+            "throttled": self.throttled,
+            "dropped": self.dropped,
+        }
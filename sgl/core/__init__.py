@@ -38,9 +38,9 @@ def needs_ability(ability):
 ## SYSTEM
 Backend = None
 
-def init(width, height, scale=1, fullscreen=False, backend="pygame"):
+def init(width, height, scale=1, fullscreen=False, backend="pygame", headless=False):
     """ 
-    init(width, height, scale=1, fullscreen=False, backend="pygame")
+    init(width, height, scale=1, fullscreen=False, backend="pygame", headless=False)
 
     Must be called before any other SGL functions to initiate the
     drawing surface.
@@ -57,6 +57,18 @@ def init(width, height, scale=1, fullscreen=False, backend="pygame"):
 
     :param str backend: Which backend to use. Currently, the only
         supported option is "pygame".
+
+    :param bool headless: If true, SGL will not open a window or
+        output any sound. Everything is still drawn to the screen
+        buffer, so :py:func:`sgl.to_numpy` and :py:func:`sgl.save_image`
+        keep working, but :py:func:`sgl.frame` skips presenting it.
+        Useful for automated testing and running many copies of a game
+        at once (see :any:`sgl.lib.Harness`).
+
+        In headless mode, :py:func:`sgl.set_fps_limit` no longer makes
+        SGL wait between frames. Your program will still be told the
+        frame rate is always the limit, so it will run as fast as
+        possible but behave exactly the same every time.
     """
 
     if backend == "pygame":
@@ -83,7 +95,7 @@ def init(width, height, scale=1, fullscreen=False, backend="pygame"):
     # which I'm considering.
     sys.modules["sgl"].key = Backend.Meta.KeyCodes
 
-    Backend.init(width, height, scale, fullscreen)
+    Backend.init(width, height, scale, fullscreen, headless)
 
 def run(update=None, draw=None):
     """ 
@@ -338,6 +350,20 @@ def get_dt():
 
     return Backend.get_dt()
 
+def get_frame_count():
+    """ 
+    get_frame_count()
+
+    Gets the number of frames that have been shown since SGL was
+    initialized. Useful for doing something only once per frame, no
+    matter how many times it is asked for.
+
+    :return: The number of frames shown so far
+    :rtype: int
+    """
+
+    return Backend.get_frame_count()
+
 def is_running():
     """ 
     is_running()
@@ -361,6 +387,17 @@ def end():
 
     Backend.end()
 
+def resume():
+    """ 
+    resume()
+
+    Undoes :any:`sgl.end`, so that :any:`sgl.is_running` returns True
+    again. Useful for harnesses that run the same program more than
+    once without initializing SGL again.
+    """
+
+    Backend.resume()
+
 ## AUDIO
 def load_sound(file):
     """ 
@@ -380,12 +417,18 @@ def load_sound(file):
 
     return Backend.load_sound(file)
 
-def play_sound(sound, volume=1.0, loops=0):
+def play_sound(sound, volume=1.0, loops=0, pan=0.0, priority=0):
     """ 
-    play_sound(sound, volume=1.0, loops=0)
+    play_sound(sound, volume=1.0, loops=0, pan=0.0, priority=0)
 
     Plays a previously loaded sound.
 
+    Only a limited number of sounds can play at once (see
+    :py:func:`sgl.set_voice_count`). If that many are already playing,
+    the sound with the lowest priority stops to make room, the oldest
+    one if there is a tie. If every sound playing has a higher
+    priority than this one, this one is not played.
+
     :param sound: The sound object to play 
     :type sound: SGL sound
 
@@ -397,9 +440,135 @@ def play_sound(sound, volume=1.0, loops=0):
         this is 0, the default, the sound will only play once. If it
         is -1, it will play forever, until :py:obj:`sgl.stop_sound` is
         called on it.
+
+    :param float pan: Where the sound is, from -1.0 (all the way to
+        the left) to 1.0 (all the way to the right).
+
+    :param int priority: How important the sound is. Sounds with a
+        higher priority can interrupt sounds with a lower or equal
+        one, but not the other way around.
+
+    :return: An object representing this particular playback of the
+        sound, which can be passed to :py:func:`sgl.stop_voice` and
+        :py:func:`sgl.set_voice_volume`, or ``None`` if the sound was
+        not played.
+    :rtype: SGL voice
+    """
+
+    return Backend.play_sound(sound, volume, loops, pan, priority)
+
+def stop_voice(voice):
+    """ 
+    stop_voice(voice)
+
+    Stops one playback of a sound, leaving any other playbacks of the
+    same sound alone. Does nothing if it has already stopped.
+
+    :param voice: A voice returned by :py:func:`sgl.play_sound`
+    :type voice: SGL voice
     """
 
-    Backend.play_sound(sound, volume, loops)
+    Backend.stop_voice(voice)
+
+def set_voice_volume(voice, volume, pan=0.0):
+    """ 
+    set_voice_volume(voice, volume, pan=0.0)
+
+    Changes the volume and pan of one playback of a sound while it is
+    playing. Does nothing if it has already stopped.
+
+    :param voice: A voice returned by :py:func:`sgl.play_sound`
+    :type voice: SGL voice
+
+    :param float volume: The new volume. See :py:func:`sgl.play_sound`.
+
+    :param float pan: The new pan. See :py:func:`sgl.play_sound`.
+    """
+
+    Backend.set_voice_volume(voice, volume, pan)
+
+def is_voice_playing(voice):
+    """ 
+    is_voice_playing(voice)
+
+    Determines whether one playback of a sound is still going--in
+    other words, whether it has not finished, been stopped, or been
+    interrupted by another sound.
+
+    :param voice: A voice returned by :py:func:`sgl.play_sound`
+    :type voice: SGL voice
+
+    :return: Whether the voice is playing
+    :rtype: bool
+    """
+
+    return Backend.is_voice_playing(voice)
+
+def set_voice_count(count):
+    """ 
+    set_voice_count(count)
+
+    Sets how many sounds can play at once. The default is 8. Lowering
+    it stops any sounds playing on the voices that were removed.
+
+    :param int count: The number of voices
+    """
+
+    if count < 1:
+        raise ArgumentError("There must be at least one voice")
+
+    Backend.set_voice_count(count)
+
+def set_sound_limit(sound, max_voices=0, max_plays=0, interval=0.0):
+    """ 
+    set_sound_limit(sound, max_voices=0, max_plays=0, interval=0.0)
+
+    Limits how much a sound can be played, which keeps a sound that is
+    triggered over and over (like an explosion, or a footstep) from
+    using up every voice. Sounds over the limit are not played, and
+    :py:func:`sgl.play_sound` returns ``None`` for them. 
+
+    For example, to allow at most 3 explosions to be started every 50
+    milliseconds::
+
+        sgl.set_sound_limit(explosion, max_plays=3, interval=0.05)
+
+    :param sound: The sound to limit
+    :type sound: SGL sound
+
+    :param int max_voices: How many copies of the sound can play at
+        once. Once there are this many, a new copy replaces the oldest
+        (if its priority allows it). 0 means no limit.
+
+    :param int max_plays: How many times the sound can be started in
+        any ``interval``. 0 means no limit. Calling this function with
+        both limits set to 0 removes any limits on the sound.
+
+    :param float interval: The length of time that ``max_plays``
+        applies to, in seconds.
+    """
+
+    Backend.set_sound_limit(sound, max_voices, max_plays, interval)
+
+def get_sound_stats():
+    """ 
+    get_sound_stats()
+
+    Gets statistics about sound playback, to help you figure out
+    whether your program is playing more sounds than it should.
+
+    :return: A dictionary containing the number of voices
+        (``"voices"``), how many of them are currently playing
+        (``"playing"``), and, since the program started, how many
+        sounds were started (``"started"``), interrupted to make room
+        for another one (``"stolen"``), not played because of
+        :py:func:`sgl.set_sound_limit` (``"throttled"``), and not
+        played because everything playing was more important
+        (``"dropped"``).
+    :rtype: dict
+    """
+
+    return Backend.get_sound_stats()
 
 def stop_sound(sound):
     """ 
@@ -572,6 +741,53 @@ def load_alpha_image(file):
 
     return Backend.load_alpha_image(file)
 
+def load_image_async(file, use_transparent_color=True, callback=None):
+    """ 
+    load_image_async(file, use_transparent_color=True, callback=None)
+
+    Like :py:func:`sgl.load_image`, but the image is decoded on a
+    background thread, so your program can keep running while it
+    loads. Several images can be loading at once.
+
+    :param str file: The filename of the image to load.
+
+    :param function callback: If given, called with the returned job
+        once the image has been loaded. It is called from inside
+        :py:func:`sgl.frame`, so it is safe to do anything in it.
+
+    :return: A job object. Its ``done`` attribute tells whether the
+        image has been loaded yet, and its ``result()`` method returns
+        the loaded surface, waiting for it if need be (and raising the
+        error that occurred if loading failed). Only call ``result()``
+        from the main thread.
+    """
+
+    if not os.path.exists(file):
+        raise FileNotFoundError(file)
+    extension = os.path.splitext(file)[1].lower()
+    if extension not in Backend.Meta.ImageTypes:
+        raise UnsupportedFormatError(file, extension)
+
+    return Backend.load_image_async(file, use_transparent_color, callback)
+
+def load_alpha_image_async(file, callback=None):
+    """ 
+    load_alpha_image_async(file, callback=None)
+
+    Like :py:func:`sgl.load_alpha_image`, but the image is decoded on
+    a background thread. See :py:func:`sgl.load_image_async`.
+
+    :return: A job object, like :py:func:`sgl.load_image_async`.
+    """
+
+    if not os.path.exists(file):
+        raise FileNotFoundError(file)
+    extension = os.path.splitext(file)[1].lower()
+    if extension not in Backend.Meta.ImageTypes:
+        raise UnsupportedFormatError(file, extension)
+
+    return Backend.load_alpha_image_async(file, callback)
+
 def blitf(thing, x, y):
     """ 
     blitf(thing, x, y)
@@ -591,6 +807,28 @@ def blitf(thing, x, y):
 
     Backend.blitf(thing, x, y)
 
+def blit_many(thing, positions):
+    """ 
+    blit_many(thing, positions)
+
+    Draws many surfaces at once, without any special effects, like
+    :py:obj:`sgl.blitf`. Much faster than calling
+    :py:obj:`sgl.blitf` in a loop when you have hundreds or thousands
+    of things to draw.
+
+    :param thing: Either one surface, which will be drawn at every
+        position, or a list of surfaces, one per position.
+
+    :type thing: SGL surface or list
+
+    :param positions: A sequence of ``(x, y)`` pairs (such as a list
+        of tuples, or the result of calling ``tolist()`` on an
+        ``N x 2`` NumPy array of integers) specifying where each
+        surface should be drawn.
+    """
+
+    Backend.blit_many(thing, positions)
+
 def blit(thing, x, y, alpha=255, flip_v=False, flip_h=False, 
          angle=0, width=None, height=None, scale=1, a_x=0, a_y=0, 
          src_x=0, src_y=0, src_width=None, src_height=None, 
@@ -1037,6 +1275,23 @@ def get_chunk(x, y, width, height):
 
     return Backend.get_chunk(x, y, width, height)
 
+def scroll(dx, dy):
+    """ 
+    scroll(dx, dy)
+
+    Moves everything on the current surface over by some amount, in
+    place. Whatever moves off the edge is lost, and the area it leaves
+    behind keeps its old contents, so it should be drawn over. Only
+    the clip rectangle is scrolled, if there is one. Much faster than
+    drawing everything again, which makes it useful for scrolling
+    things that are drawn onto surfaces.
+
+    :param int dx, dy: How many pixels to move everything by, right
+        and down. Negative numbers move it left and up.
+    """
+
+    Backend.scroll(int(dx), int(dy))
+
 def set_buffer(surface):
     """ 
     set_buffer(surface)
@@ -1161,10 +1416,79 @@ def save_image(file):
 
     return Backend.save_image(file)
 
+@needs_ability(abilities.save_buffer)
+def save_image_async(file, callback=None):
+    """
+    save_image_async(file, callback=None)
+
+    Like :py:func:`sgl.save_image`, but the image is encoded and
+    written on a background thread, so taking a screenshot does not
+    make your program hitch. The current surface is copied right away,
+    so you can keep drawing to it.
+
+    If many images are waiting to be written, this will wait until
+    there is room, rather than using up more and more memory.
+
+    :param str file: The filename of the image to save to. The
+        extension will determine the file type.
+
+    :param function callback: If given, called with the returned job
+        once the image has been written. It is called from inside
+        :py:func:`sgl.frame`, so it is safe to do anything in it.
+
+    :return: A job object. Its ``done`` attribute tells whether the
+        image has been written yet, its ``wait()`` method blocks until
+        it has, and its ``error`` attribute is the exception that
+        occurred if writing failed.
+    """
+
+    extension = os.path.splitext(file)[1].lower()
+    if extension not in Backend.Meta.ImageSaveTypes:
+        raise UnsupportedFormatError(file, extension)
+
+    return Backend.save_image_async(file, callback)
+
+@needs_ability(abilities.save_buffer)
+def save_image_burst(file, count, callback=None):
+    """
+    save_image_burst(file, count, callback=None)
+
+    Saves the next ``count`` frames displayed by :py:func:`sgl.frame`,
+    one image per frame, in the background. Useful for attaching a
+    short clip of a bug to a report.
+
+    :param str file: The filename pattern of the images. ``{}`` will
+        be replaced with the number of the frame, starting at 0, for
+        example ``"bug-{:03}.png"``. The extension will determine the
+        file type.
+
+    :param int count: How many frames to save.
+
+    :param function callback: If given, called with the returned
+        object once every frame has been written. Like with
+        :py:func:`sgl.save_image_async`, it is called from inside
+        :py:func:`sgl.frame`.
+
+    :return: A burst object. Its ``jobs`` attribute is a list of the
+        jobs (see :py:func:`sgl.save_image_async`) for the frames
+        captured so far, and its ``done`` attribute tells whether every
+        frame has been captured and written.
+    """
+
+    extension = os.path.splitext(file)[1].lower()
+    if extension not in Backend.Meta.ImageSaveTypes:
+        raise UnsupportedFormatError(file, extension)
+
+    if file.format(0) == file:
+        raise ArgumentError("The filename must contain \"{}\", "
+                            "or every frame would overwrite the last")
+
+    return Backend.save_image_burst(file, count, callback)
+
 @needs_ability(abilities.numpy)
-def to_numpy():
+def to_numpy(array=None):
     """ 
-    to_numpy()
+    to_numpy(array=None)
 
     Exports the current surface as a NumPy array. On some back ends,
     such as Pygame, this might return a "live" NumPy array that is
@@ -1172,11 +1496,47 @@ def to_numpy():
     instantly change the surface. This is much more efficient than the
     alternative, but can be unexpected.
 
+    On Pygame, a surface cannot be drawn on while a live array of it
+    exists, so if you want the pixels of every frame, pass in an array
+    to fill instead. It will be overwritten in place and returned, so
+    the same array can be reused every frame without allocating a new
+    one.
+
+    :param array: An existing array to copy the pixels into. Must be
+        shaped ``(width, height, 3)`` and have a dtype of ``uint8``.
+    :type array: NumPy array
+
     :return: The pixel data of the current surface, in a three-dimensional array
     :rtype: NumPy array
     """
 
-    return Backend.to_numpy()
+    return Backend.to_numpy(array)
+
+@needs_ability(abilities.numpy)
+def export_framebuffer(name, slots=3):
+    """ 
+    export_framebuffer(name, slots=3)
+
+    Starts publishing every frame displayed by :py:func:`sgl.frame`
+    into a named block of shared memory, so that other processes on
+    this computer (such as a video encoder or a bot) can read them
+    without slowing your program down. Each frame costs one copy into
+    shared memory, no matter how many readers there are.
+
+    Other processes can read the frames with
+    ``sgl.core.SharedFramebuffer.FramebufferReader``, which does not
+    require SGL to be initialized.
+
+    :param str name: The name of the shared memory block. Readers must
+        use the same name. Pass ``None`` to stop exporting.
+
+    :param int slots: How many frames to keep in the ring
+        buffer. Three means the program can write a new frame while a
+        reader is still busy with the previous one without either
+        waiting.
+    """
+
+    Backend.export_framebuffer(name, slots)
 
 @needs_ability(abilities.numpy)
 def from_numpy(array):
@@ -1652,8 +2012,10 @@ def with_buffer(buffer):
 
     push()
     set_buffer(buffer)
-    yield
-    pop()
+    try:
+        yield
+    finally:
+        pop()
 
 @contextlib.contextmanager
 def with_state():
@@ -1668,5 +2030,7 @@ def with_state():
     """
 
     push()
-    yield
-    pop()
+    try:
+        yield
+    finally:
+        pop()
@@ -0,0 +1,161 @@
+""" This module provides :any:`BackgroundLayer`, a sprite that repeats
+one graphic forever, across and/or down, for things like skies, walls
+of bricks, and parallax scenery::
+
+    sky = scene.add(BackgroundLayer(sgl.load_image("clouds.png")))
+    sky.parallax = 4
+
+    hills = scene.add(BackgroundLayer(sgl.load_image("hills.png"),
+                                      repeat_y=False))
+    hills.parallax = 2
+    hills.y = 120
+
+Only the copies of the graphic that can be seen are drawn, so drawing a
+background costs the same however big the level is. By default the
+graphic is drawn repeated onto one surface big enough to cover the
+screen, ahead of time, so the whole background is drawn in one go no
+matter how small the graphic is. """
+
+import math
+
+import sgl
+from sgl.lib.Sprite import Sprite
+
+class BackgroundLayer(Sprite):
+    """ A :any:`sgl.lib.Sprite.Sprite` that draws its graphic over and
+    over, so that it fills the screen in the directions it repeats in.
+    Moving it (or the camera) scrolls the pattern. It works with
+    :any:`sgl.lib.Sprite.Sprite.parallax` like any other sprite, and
+    is always drawn (see :any:`sgl.lib.Sprite.Sprite.infinite_space`).
+
+    Its position is where one of the copies goes; the rest are lined
+    up with it. Of the effects, only :any:`sgl.lib.Sprite.Sprite.alpha`
+    is used. """
+
+    # Made again by get_strip, so snapshots don't keep it
+    snapshot_derived = ("strip",)
+
+    def __init__(self, graphic=None, repeat_x=True, repeat_y=True):
+        """
+        Args:
+            graphic (SGL surface): The graphic to repeat.
+            repeat_x (bool): Whether to repeat the graphic across.
+            repeat_y (bool): Whether to repeat the graphic down.
+        """
+
+        super(BackgroundLayer, self).__init__(graphic)
+
+        self.infinite_space = True
+
+        self.repeat_x = repeat_x
+        """ bool: Whether the graphic is repeated across. If not, there
+        is one row of it, at the sprite's Y position. """
+
+        self.repeat_y = repeat_y
+        """ bool: Whether the graphic is repeated down. """
+
+        self.cache_strip = True
+        """ bool: Whether to draw the graphic repeated onto one surface
+        a little bigger than the screen, and draw that, instead of
+        drawing every copy of the graphic separately. Costs a
+        screen-sized surface of memory, and saves a lot of time when
+        the graphic is small. The surface is made again when
+        :any:`sgl.lib.Sprite.Sprite.surface` or the size of the view
+        changes. """
+
+        self.strip = None
+        self.strip_key = None
+
+    def get_placements(self):
+        """ Works out where the copies of the graphic that can be seen
+        go.
+
+        Returns:
+            tuple: A list of X positions and a list of Y positions, in
+                 screen coordinates. A copy goes at every combination
+                 of the two. """
+
+        view = self.get_view_rect()
+        view_x, view_y = int(view.x), int(view.y)
+        view_x2 = int(math.ceil(view.x + view.width))
+        view_y2 = int(math.ceil(view.y + view.height))
+
+        width, height = int(self.width), int(self.height)
+        if width <= 0 or height <= 0: return [], []
+
+        a_x, a_y = self.real_anchor
+        left = int(math.floor(self.screen_x - a_x))
+        top = int(math.floor(self.screen_y - a_y))
+
+        if self.repeat_x:
+            # Python's % is never negative, so this is at or before
+            # the left edge of the view
+            first = view_x - (view_x - left) % width
+            xs = list(range(first, view_x2, width))
+        elif left < view_x2 and left + width > view_x:
+            xs = [left]
+        else:
+            xs = []
+
+        if self.repeat_y:
+            first = view_y - (view_y - top) % height
+            ys = list(range(first, view_y2, height))
+        elif top < view_y2 and top + height > view_y:
+            ys = [top]
+        else:
+            ys = []
+
+        return xs, ys
+
+    def draw_self(self):
+        if not self.surface: return
+
+        xs, ys = self.get_placements()
+        if not xs or not ys: return
+
+        if self.cache_strip:
+            # One copy of the strip always covers everything that can
+            # be seen, wherever the pattern starts
+            self.draw_graphic(self.get_strip(), xs[0], ys[0])
+            return
+
+        if self.alpha == 255 or self.alpha == 1.0:
+            sgl.blit_many(self.surface, [(x, y) for y in ys for x in xs])
+        else:
+            for y in ys:
+                for x in xs:
+                    self.draw_graphic(self.surface, x, y)
+
+    def draw_graphic(self, graphic, x, y):
+        # """ Internal use only. """
+
+        if self.alpha == 255 or self.alpha == 1.0:
+            sgl.blitf(graphic, x, y)
+        else:
+            sgl.blit(graphic, x, y, alpha=self.alpha)
+
+    def get_strip(self):
+        # """ Internal use only. Returns the graphic drawn repeated
+        # enough times to cover the view from any starting point,
+        # making it if needed. """
+
+        view = self.get_view_rect()
+        width, height = int(self.width), int(self.height)
+
+        # One more copy than fits, plus one for the part of a copy
+        # hanging off each edge
+        columns = int(math.ceil(view.width / float(width))) + 1
+        rows = int(math.ceil(view.height / float(height))) + 1
+        if not self.repeat_x: columns = 1
+        if not self.repeat_y: rows = 1
+
+        key = (self.surface, columns, rows)
+        if self.strip is None or self.strip_key != key:
+            self.strip = sgl.make_surface(columns * width, rows * height)
+            with sgl.with_buffer(self.strip):
+                sgl.blit_many(self.surface, [
+                    (column * width, row * height)
+                    for row in range(rows) for column in range(columns)])
+            self.strip_key = key
+
+        return self.strip
@@ -11,6 +11,28 @@ from sgl.lib.Rect import Rect
 import inspect
 import math
 
+def is_colliding_in_scene(sprite, other):
+    # """ Internal use only. Like Sprite.is_colliding_with, but also
+    # works for sprites with different parents, whose collision bounds
+    # are in different coordinates, by comparing them on the
+    # screen. """
+
+    if sprite.parent is other.parent:
+        return sprite.is_colliding_with(other)
+
+    if not sprite.solid or not other.solid:
+        return False
+
+    sprite.refresh_transform()
+    other.refresh_transform()
+
+    left, top, right, bottom = sprite.screen_collision_bounds
+    other_left, other_top, other_right, other_bottom = (
+        other.screen_collision_bounds)
+
+    return (other_right > left and other_left < right
+            and other_bottom > top and other_top < bottom)
+
 class CollisionChecker(object):
     """ An object that checks whether sprites are overlapping every
     frame, and takes user-specified action as a result.
@@ -72,6 +94,17 @@ class CollisionChecker(object):
             self.check_collision(True)
 
     def check_collision(self, do_callback=False):
+        # A tag means every sprite with that tag in object1's scene
+        if not isinstance(self.object2, Sprite):
+            if self.object1.scene is None: return False
+            for sprite in self.object1.scene.by_tag(self.object2):
+                if (sprite is not self.object1
+                    and is_colliding_in_scene(self.object1, sprite)):
+                    if do_callback:
+                        self.do_callback(self.object1, sprite)
+                    return True
+            return False
+
         # Only check collision against the other sprite's rectangle if
         # it has a display surface. If it doesn't, that means it's a
         # group, and we don't want to test the rectangle of the whole
@@ -230,7 +263,11 @@ def add(object1, object2, callback):
              be tested for collision.
         object2 (:any:`Sprite`): The second object to
              test. This can be any kind of sprite, and subsprites will
-             be tested for collision.
+             be tested for collision. It can also be a tag (see
+             :any:`Sprite.tags`), to test every sprite with that tag
+             in ``object1``'s scene, wherever it is in the scene.
+             Tagged sprites with a different parent than ``object1``
+             are compared by where they are on the screen.
         callback (function): The function to call when the objects
              overlap. This function will have different information
              passed to it depending on how many arguments it accepts.
@@ -238,8 +275,8 @@ def add(object1, object2, callback):
              * If it accepts no arguments, nothing special will be
                passed to it.
              * If it accepts 1 argument, it will be passed a reference
-               to the subsprite of ``object2`` that ``object1``
-               collided with on that frame.
+               to the subsprite of ``object2`` (or sprite with the
+               tag) that ``object1`` collided with on that frame.
              * If it accepts 2 arguments, it will be passed a
                reference to ``object1``, and then the subsprite of
                ``object2`` that ``object1`` collided with on that
@@ -286,7 +323,11 @@ def add_sliding(object1, object2, callback=None):
              be tested for collision.
         object2 (:any:`Sprite`): The second object to
              test. This can be any kind of sprite, and subsprites will
-             be tested for collision.
+             be tested for collision. It can also be a tag (see
+             :any:`Sprite.tags`), to test every sprite with that tag
+             in ``object1``'s scene, wherever it is in the scene.
+             Tagged sprites with a different parent than ``object1``
+             are compared by where they are on the screen.
         callback (function): The function to call when the objects
              overlap. This function will have different information
              passed to it depending on how many arguments it accepts.
@@ -0,0 +1,327 @@
+""" This module wraps SGL programs in the ``reset()``/``step(action)``
+interface that most reinforcement learning code expects, so you can
+train bots on your games without writing the glue yourself.
+
+Each *action* is turned into fake keyboard input, the game is advanced
+by exactly one update and one draw, and the screen is copied into a
+NumPy array that is reused from step to step. Nothing is ever shown
+in a window.
+
+:any:`VectorEnvironment` steps many copies of a game in lockstep, each
+in its own process, with all of their screens written straight into
+one shared batch array.
+
+A simple example::
+
+    import sgl
+    from sgl.lib.Harness import init_headless
+    from sgl.lib.Environment import Environment
+
+    init_headless(160, 120)
+
+    env = Environment(lambda: App(MyScene()),
+                      actions=[(), ("left",), ("right",), ("space",)])
+
+    observation = env.reset()
+    while True:
+        observation, reward, done, info = env.step(choose(observation))
+        if done:
+            observation = env.reset()
+"""
+
+import ctypes
+import multiprocessing
+
+import sgl
+from sgl.lib.Harness import init_headless, resolve_callbacks
+
+try:
+    import numpy as np
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+def resolve_key(key):
+    # """ Internal use only. Lets keys be given by name, so action
+    # lists can be written before SGL is initialized. """
+
+    if isinstance(key, int):
+        return key
+    return getattr(sgl.key, key)
+
+class Environment(object):
+    """ Wraps one SGL program in a step/observe interface. SGL must
+    already be initialized, preferably in headless mode (see
+    :any:`sgl.lib.Harness.init_headless`). """
+
+    def __init__(self, make_game, actions, reward=None, done=None, fps=60):
+        """
+        Args:
+            make_game (function): Called with no arguments by
+                :any:`reset` to start a new episode. Must return
+                either an object with ``update`` and ``draw`` methods
+                (like :any:`sgl.lib.Sprite.App`) or an ``(update,
+                draw)`` tuple.
+            actions (list): The possible actions. Each one is either a
+                sequence of keys to hold down during the step (as
+                ``sgl.key`` values or their names, like ``"left"``),
+                or a function, which will be called before the game
+                updates and can produce whatever fake input it likes.
+            reward (function): Called with the game object after
+                every step, and should return the reward for that
+                step. If not given, the game's ``get_reward`` method
+                is used if it has one. Otherwise, the reward is
+                always 0.
+            done (function): Called with the game object after every
+                step, and should return whether the episode is
+                over. If not given, the game's ``is_done`` method is
+                used if it has one. Otherwise, an episode ends when
+                the game calls :any:`sgl.end`.
+            fps (int): The frame rate the game will be told it is
+                running at. See :any:`sgl.set_fps_limit`.
+        """
+
+        if not has_numpy:
+            raise sgl.ArgumentError("Environments require NumPy")
+
+        self.make_game = make_game
+        self.actions = actions
+        self.reward_function = reward
+        self.done_function = done
+
+        self.game = None
+        self.update = None
+        self.draw = None
+
+        self.held_keys = ()
+        self.frame = 0
+
+        self.observation = np.zeros(
+            (sgl.get_width(), sgl.get_height(), 3), dtype=np.uint8)
+        """ NumPy array: The screen, indexed like
+        :any:`sgl.to_numpy`. This is the same array every step, and
+        it is overwritten in place, so copy it if you need to keep an
+        old observation around. You may replace it with your own array
+        of the same shape, and it will be filled instead. """
+
+        sgl.set_fps_limit(fps)
+
+        for type in (sgl.input.keyboard, sgl.input.mouse):
+            sgl.remove_input(type)
+            sgl.add_fake_input(type)
+
+    def reset(self):
+        """ Starts a new episode by creating a new game.
+
+        Returns:
+            NumPy array: The first observation. """
+
+        self.release_keys(())
+        self.held_keys = ()
+
+        # The last game may have ended by calling sgl.end
+        sgl.resume()
+
+        self.game = self.make_game()
+        self.update, self.draw = resolve_callbacks(self.game)
+        self.frame = 0
+
+        self.draw()
+        sgl.to_numpy(self.observation)
+
+        return self.observation
+
+    def release_keys(self, keys):
+        # """ Internal use only. Releases every held key not in
+        # ``keys``. """
+
+        for key in self.held_keys:
+            if key not in keys:
+                sgl.got_key_up(key)
+
+    def apply_action(self, action):
+        # """ Internal use only. Turns an action into fake input. """
+
+        action = self.actions[action]
+
+        if hasattr(action, "__call__"):
+            self.release_keys(())
+            self.held_keys = ()
+            action()
+            return
+
+        keys = tuple(resolve_key(key) for key in action)
+
+        self.release_keys(keys)
+        for key in keys:
+            if key not in self.held_keys:
+                sgl.got_key_down(key)
+
+        self.held_keys = keys
+
+    def step(self, action):
+        """ Advances the game by one frame.
+
+        Args:
+            action (int): The index in :any:`actions` of the action
+                to take.
+
+        Returns:
+            tuple: ``(observation, reward, done, info)``, where
+                 ``info`` is a dictionary containing the number of
+                 frames this episode has run. """
+
+        self.apply_action(action)
+
+        self.update()
+        self.draw()
+        sgl.frame()
+
+        sgl.to_numpy(self.observation)
+        self.frame += 1
+
+        return (self.observation, self.get_reward(), self.is_done(),
+                {"frame": self.frame})
+
+    def get_reward(self):
+        # """ Internal use only. """
+
+        if self.reward_function:
+            return self.reward_function(self.game)
+        if hasattr(self.game, "get_reward"):
+            return self.game.get_reward()
+        return 0
+
+    def is_done(self):
+        # """ Internal use only. """
+
+        if self.done_function:
+            return self.done_function(self.game)
+        if hasattr(self.game, "is_done"):
+            return self.game.is_done()
+        return not sgl.is_running()
+
+class VectorEnvironment(object):
+    """ Steps many :any:`Environment` instances in lockstep, each in
+    its own headless worker process.
+
+    Episodes that end are reset automatically, so the observation
+    returned for an environment that is done is the first observation
+    of its next episode. """
+
+    def __init__(self, make_env, count, width, height):
+        """
+        Args:
+            make_env (function): Called in each worker, after SGL has
+                been initialized, with the index of the worker. Must
+                return an :any:`Environment`. Since it crosses a
+                process boundary, it must be defined at the top level
+                of a module.
+            count (int): How many environments to run.
+            width (int): The width of each environment's screen.
+            height (int): The height of each environment's screen.
+        """
+
+        if not has_numpy:
+            raise sgl.ArgumentError("Environments require NumPy")
+
+        self.count = count
+        shape = (width, height, 3)
+
+        self.raw_observations = multiprocessing.RawArray(
+            ctypes.c_uint8, count * width * height * 3)
+
+        self.observations = np.frombuffer(
+            self.raw_observations, dtype=np.uint8).reshape((count,) + shape)
+        """ NumPy array: The screens of every environment, indexed by
+        ``[environment, x, y, channel]``. The workers write into this
+        array directly, so it is overwritten by every step. """
+
+        self.connections = []
+        self.processes = []
+
+        for index in range(count):
+            connection, worker_connection = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_env_worker,
+                args=(index, make_env, width, height,
+                      self.raw_observations, worker_connection))
+            process.daemon = True
+            process.start()
+
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def reset(self):
+        """ Resets every environment.
+
+        Returns:
+            NumPy array: :any:`observations`. """
+
+        for connection in self.connections:
+            connection.send(("reset", None))
+        for connection in self.connections:
+            connection.recv()
+
+        return self.observations
+
+    def step(self, actions):
+        """ Steps every environment once.
+
+        Args:
+            actions (list): One action index per environment.
+
+        Returns:
+            tuple: ``(observations, rewards, dones, infos)``, where
+                 ``rewards`` and ``dones`` are NumPy arrays and
+                 ``infos`` is a list. """
+
+        for connection, action in zip(self.connections, actions):
+            connection.send(("step", action))
+
+        results = [connection.recv() for connection in self.connections]
+
+        rewards = np.array([result[0] for result in results])
+        dones = np.array([result[1] for result in results], dtype=bool)
+        infos = [result[2] for result in results]
+
+        return self.observations, rewards, dones, infos
+
+    def close(self):
+        """ Stops every worker process. """
+
+        for connection in self.connections:
+            connection.send(("close", None))
+        for process in self.processes:
+            process.join()
+
+        self.connections = []
+        self.processes = []
+
+def run_env_worker(index, make_env, width, height, raw_observations, connection):
+    # """ Internal use only. The main loop of a vector environment
+    # worker process. """
+
+    init_headless(width, height)
+
+    size = width * height * 3
+    env = make_env(index)
+    env.observation = np.frombuffer(
+        raw_observations, dtype=np.uint8,
+        count=size, offset=index * size).reshape((width, height, 3))
+
+    while True:
+        command, argument = connection.recv()
+
+        if command == "step":
+            observation, reward, done, info = env.step(argument)
+            if done:
+                env.reset()
+            connection.send((reward, done, info))
+
+        elif command == "reset":
+            env.reset()
+            connection.send(None)
+
+        elif command == "close":
+            break
@@ -0,0 +1,330 @@
+""" This module lets you run many copies of an SGL program at once,
+each in its own process, without opening any windows. It is meant for
+soak testing and for things like training game-playing bots, where
+you want as many frames as possible out of every core.
+
+Each worker initializes SGL in headless mode, turns off real input and
+drives the game with fake input instead, and runs with no frame rate
+limit. Per-frame timings (and, optionally, shrunken copies of the
+screen) are written into shared memory, so the parent process can read
+them without any copying or message passing. Workers never talk to
+each other, so throughput should scale with the number of cores you
+give it.
+
+A simple example::
+
+    import sgl
+    from sgl.lib.Harness import Harness
+
+    def setup(worker):
+        return App(MyScene())
+
+    if __name__ == "__main__":
+        harness = Harness(setup, 320, 240, workers=8, frames=3600)
+        result = harness.run()
+        print(result.summary())
+
+Because everything passed to the workers has to cross a process
+boundary, ``setup`` and any input function must be defined at the top
+level of a module, so they can be pickled.
+"""
+
+import ctypes
+import multiprocessing
+import timeit
+
+import sgl
+
+try:
+    import numpy as np
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+# Which fake input function each event name in a recording maps to
+EVENT_FUNCTIONS = {
+    "key_down": "got_key_down",
+    "key_up": "got_key_up",
+    "mouse_move": "got_mouse_move",
+    "mouse_down": "got_mouse_down",
+    "mouse_up": "got_mouse_up",
+}
+
+# Columns of the timing array
+UPDATE_TIME = 0
+DRAW_TIME = 1
+FRAME_TIME = 2
+TIMING_COLUMNS = 3
+
+def init_headless(width, height):
+    """ Initializes SGL the way every harness worker does: headless,
+    with no frame rate limit, and with keyboard and mouse input
+    replaced by fake input. Useful if you are writing your own worker
+    processes.
+
+    Args:
+        width (int): The width of the screen buffer.
+        height (int): The height of the screen buffer. """
+
+    sgl.init(width, height, headless=True)
+    sgl.set_fps_limit(0)
+
+    for type in (sgl.input.keyboard, sgl.input.mouse):
+        sgl.remove_input(type)
+        sgl.add_fake_input(type)
+
+def resolve_callbacks(game):
+    # """ Internal use only. Turns whatever a setup function returned
+    # into an (update, draw) pair. """
+
+    if isinstance(game, tuple):
+        return game
+    return game.update, game.draw
+
+def group_events(events):
+    # """ Internal use only. Turns a recording into a dictionary of
+    # frame number -> list of (function, args). """
+
+    grouped = {}
+    for frame, name, args in events:
+        function = getattr(sgl, EVENT_FUNCTIONS[name])
+        grouped.setdefault(frame, []).append((function, tuple(args)))
+    return grouped
+
+def shared_view(raw, shape, dtype):
+    # """ Internal use only. Wraps a shared ctypes array in a NumPy
+    # array without copying it. """
+
+    return np.frombuffer(raw, dtype=dtype).reshape(shape)
+
+class HarnessResult(object):
+    """ The data collected by a :any:`Harness`. The arrays inside are
+    backed by shared memory, so they fill in live while the workers
+    are running. """
+
+    def __init__(self, harness):
+        self.harness = harness
+
+        self.timings = shared_view(
+            harness.raw_timings,
+            (harness.workers, harness.frames, TIMING_COLUMNS),
+            np.float64)
+        """ NumPy array: Seconds spent on each frame, indexed by
+        ``[worker, frame, column]``. The columns are
+        :any:`UPDATE_TIME`, :any:`DRAW_TIME` and :any:`FRAME_TIME`,
+        the last of which covers the whole frame, including input and
+        capturing. """
+
+        self.progress = shared_view(
+            harness.raw_progress, (harness.workers,), np.int64)
+        """ NumPy array: How many frames each worker has finished. """
+
+        self.framebuffers = None
+        """ NumPy array or None: The most recently captured screen of
+        each worker, indexed by ``[worker, x, y, channel]``, like
+        :any:`sgl.to_numpy`. Only available if capturing was turned
+        on. """
+
+        if harness.raw_framebuffers is not None:
+            self.framebuffers = shared_view(
+                harness.raw_framebuffers,
+                (harness.workers,) + harness.capture_shape,
+                np.uint8)
+
+    def summary(self):
+        """ Sums up the frame times of each worker.
+
+        Returns:
+            list: One dictionary per worker, with the number of
+                 frames run, and the mean, 99th percentile and worst
+                 frame time in seconds. """
+
+        summary = []
+        for worker in range(self.harness.workers):
+            frames = int(self.progress[worker])
+            times = self.timings[worker, :frames, FRAME_TIME]
+            if frames:
+                summary.append({
+                    "frames": frames,
+                    "mean": float(times.mean()),
+                    "p99": float(np.percentile(times, 99)),
+                    "worst": float(times.max()),
+                })
+            else:
+                summary.append({"frames": 0})
+        return summary
+
+class Harness(object):
+    """ Runs many headless copies of an SGL program in parallel. """
+
+    def __init__(self, setup, width, height, workers=None, frames=600,
+                 inputs=None, capture_every=0, capture_step=4):
+        """
+        Args:
+            setup (function): Called in each worker, after SGL has
+                been initialized, with the index of the worker. Must
+                return either an object with ``update`` and ``draw``
+                methods (like :any:`sgl.lib.Sprite.App`) or an
+                ``(update, draw)`` tuple.
+            width (int): The width of each worker's screen.
+            height (int): The height of each worker's screen.
+            workers (int): How many processes to run. By default,
+                one per CPU core.
+            frames (int): How many frames each worker will run for,
+                unless the program calls :any:`sgl.end` first.
+            inputs (list or function): Where fake input comes from.
+
+                If it is a *list,* it is treated as a recording, and
+                replayed identically in every worker. Each item should
+                be a ``(frame, event, args)`` tuple, where ``event``
+                is one of ``"key_down"``, ``"key_up"``,
+                ``"mouse_move"``, ``"mouse_down"`` or
+                ``"mouse_up"``, and ``args`` is a tuple of arguments
+                for the matching ``sgl.got_*`` function.
+
+                If it is a *function,* it is called before every frame
+                with the worker index and frame number, and can call
+                the ``sgl.got_*`` functions itself. This is the way to
+                give each worker different input.
+            capture_every (int): If this is not 0, every this many
+                frames, each worker copies its screen into
+                :any:`HarnessResult.framebuffers`.
+            capture_step (int): How much to shrink captured screens
+                by. Only every ``capture_step``-th pixel in each
+                direction is kept.
+        """
+
+        if not has_numpy:
+            raise sgl.ArgumentError("The harness requires NumPy")
+
+        self.setup = setup
+        self.width = width
+        self.height = height
+        self.workers = workers or multiprocessing.cpu_count()
+        self.frames = frames
+        self.inputs = inputs
+        self.capture_every = capture_every
+        self.capture_step = capture_step
+
+        self.processes = []
+
+        # Only the worker processes started here use these arrays, so
+        # anonymous memory they inherit is enough, and it goes away
+        # with this process. (sgl.export_framebuffer needs named shared
+        # memory instead, because unrelated programs attach to it.)
+        #
+        # lock=False: every worker only ever writes to its own slice,
+        # so there is nothing to synchronize, and the locks would be
+        # the only thing the workers share.
+        self.raw_timings = multiprocessing.RawArray(
+            "d", self.workers * self.frames * TIMING_COLUMNS)
+        self.raw_progress = multiprocessing.RawArray(
+            ctypes.c_int64, self.workers)
+
+        if capture_every:
+            # Matches the size of array[::step, ::step]
+            self.capture_shape = (
+                (width + capture_step - 1) // capture_step,
+                (height + capture_step - 1) // capture_step,
+                3)
+            size = self.capture_shape[0] * self.capture_shape[1] * 3
+            self.raw_framebuffers = multiprocessing.RawArray(
+                "B", self.workers * size)
+        else:
+            self.capture_shape = None
+            self.raw_framebuffers = None
+
+    def start(self):
+        """ Starts all the worker processes and returns immediately.
+        Use :any:`join` to wait for them.
+
+        Returns:
+            :any:`HarnessResult`: The live results. """
+
+        for index in range(self.workers):
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(index, self.setup, self.width, self.height,
+                      self.frames, self.inputs,
+                      self.capture_every, self.capture_step,
+                      self.capture_shape, self.raw_timings,
+                      self.raw_progress, self.raw_framebuffers))
+            process.daemon = True
+            process.start()
+            self.processes.append(process)
+
+        return HarnessResult(self)
+
+    def join(self):
+        """ Waits for every worker to finish. """
+
+        for process in self.processes:
+            process.join()
+        self.processes = []
+
+    def run(self):
+        """ Runs every worker to completion.
+
+        Returns:
+            :any:`HarnessResult`: The results. """
+
+        result = self.start()
+        self.join()
+        return result
+
+def run_worker(index, setup, width, height, frames, inputs,
+               capture_every, capture_step, capture_shape,
+               raw_timings, raw_progress, raw_framebuffers):
+    # """ Internal use only. The main loop of a worker process. """
+
+    init_headless(width, height)
+
+    update, draw = resolve_callbacks(setup(index))
+
+    if isinstance(inputs, (list, tuple)):
+        events = group_events(inputs)
+        inputs = None
+    else:
+        events = {}
+
+    # Plain ctypes arrays are fine for the timings, which are written
+    # one number at a time. Only the framebuffer needs NumPy.
+    offset = index * frames * TIMING_COLUMNS
+
+    if raw_framebuffers is not None:
+        size = capture_shape[0] * capture_shape[1] * 3
+        framebuffer = np.frombuffer(
+            raw_framebuffers, dtype=np.uint8,
+            count=size, offset=index * size).reshape(capture_shape)
+
+    timer = timeit.default_timer
+
+    for frame in range(frames):
+        if not sgl.is_running(): break
+
+        start = timer()
+
+        if inputs:
+            inputs(index, frame)
+        for function, args in events.get(frame, ()):
+            function(*args)
+
+        before_update = timer()
+        update()
+        before_draw = timer()
+        draw()
+        after_draw = timer()
+
+        sgl.frame()
+
+        if capture_every and frame % capture_every == 0:
+            framebuffer[...] = sgl.to_numpy()[::capture_step, ::capture_step]
+
+        end = timer()
+
+        position = offset + frame * TIMING_COLUMNS
+        raw_timings[position + UPDATE_TIME] = before_draw - before_update
+        raw_timings[position + DRAW_TIME] = after_draw - before_draw
+        raw_timings[position + FRAME_TIME] = end - start
+
+        raw_progress[index] = frame + 1
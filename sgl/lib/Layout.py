@@ -8,6 +8,22 @@ from sgl.lib.Rect import Rect
 from sgl.lib.Sprite import Sprite, EllipseSprite, RectSprite, Scene, App
 import sgl.lib.Time as time
 
+class FlowItem(object):
+    # """ Internal use only. How a :any:`FlowLayout` places one of the
+    # sprites inside it, as given to :any:`FlowLayout.add`. """
+
+    __slots__ = ("proportion", "other_proportion", "align",
+                 "original_width", "original_height")
+
+    def __init__(self, sprite, proportion=0.0, other_proportion=0.0,
+                 align=0.0):
+        self.proportion = proportion
+        self.other_proportion = other_proportion
+        self.align = align
+
+        self.original_width = sprite.width
+        self.original_height = sprite.height
+
 class FlowLayout(Sprite):
     """ A Sprite that provides similar functionality to `wxWidget's BoxSizer <http://docs.wxwidgets.org/trunk/overview_sizer.html#overview_sizer_box>`_. """
 
@@ -36,6 +52,9 @@ class FlowLayout(Sprite):
 
         self.has_stretchy = False
 
+        # Sprite -> FlowItem, for every sprite added with add
+        self.flow_items = {}
+
         self.draw_debug = False
         """ Mostly for internal use, but could be useful for normal
         development as well. If this is True, the layout, the items
@@ -71,8 +90,9 @@ class FlowLayout(Sprite):
         self._horizontal = value
 
         for sprite in self.subsprites:
-            sprite.width = sprite.original_width
-            sprite.height = sprite.original_height
+            item = self.get_flow_item(sprite)
+            sprite.width = item.original_width
+            sprite.height = item.original_height
 
     def add(self, sprite, proportion=0.0, 
             proportion_other_way=0.0, align=0.0):
@@ -169,15 +189,25 @@ class FlowLayout(Sprite):
         """
 
         super(FlowLayout, self).add(sprite)
-        sprite.flow_proportion = proportion
-        sprite.flow_other_proportion = proportion_other_way
-        sprite.flow_align = align
-        
-        sprite.original_width = sprite.width
-        sprite.original_height = sprite.height
+        self.flow_items[sprite] = FlowItem(
+            sprite, proportion, proportion_other_way, align)
 
         if proportion: self.has_stretchy = True
 
+    def get_flow_item(self, sprite):
+        # """ Internal use only. Returns how a sprite inside is placed,
+        # treating sprites not added with add as if they were added
+        # with the default arguments. """
+
+        item = self.flow_items.get(sprite)
+        if item is None:
+            item = self.flow_items[sprite] = FlowItem(sprite)
+        return item
+
+    def _detach(self, sprite):
+        self.flow_items.pop(sprite, None)
+        super(FlowLayout, self)._detach(sprite)
+
     def clear(self):
         """ Removes everything in this layout. 
 
@@ -185,7 +215,10 @@ class FlowLayout(Sprite):
             Is this a method of :any:`Sprite`? If it isn't, why not? """
 
         self.subsprites = []
+        self.flow_items = {}
         self.has_stretchy = False
+        self.invalidate()
+        self.mark_tree_dirty()
 
     def reflow(self):
         """ Repositions and resizes the elements inside to adhere to
@@ -227,8 +260,9 @@ class FlowLayout(Sprite):
             last_stretchy = None
 
             for sprite in self.subsprites:
-                if sprite.flow_proportion:
-                    stretchy_total += sprite.flow_proportion
+                item = self.get_flow_item(sprite)
+                if item.proportion:
+                    stretchy_total += item.proportion
                     stretchy_amount += 1
                     last_stretchy = sprite
                 else:
@@ -246,6 +280,7 @@ class FlowLayout(Sprite):
 
         # Actually move sprites around
         for sprite in self.subsprites:
+            item = self.get_flow_item(sprite)
 
             # Move to right position
             if self.horizontal:
@@ -258,11 +293,11 @@ class FlowLayout(Sprite):
             other_size = sprite.height if self.horizontal else sprite.width
     
             # Resize proportioned sprites
-            if sprite.flow_proportion:
+            if item.proportion:
                 # Calculate size
                 size = (
                     (leftover / stretchy_total) 
-                    * sprite.flow_proportion
+                    * item.proportion
                 ) 
 
                 # Make sure to take into account spacing, otherwise
@@ -309,8 +344,8 @@ class FlowLayout(Sprite):
                     total_size += sprite.height
 
             # Resize other way. Basically same as other
-            if sprite.flow_other_proportion:
-                new_size = self_other_size * sprite.flow_other_proportion
+            if item.other_proportion:
+                new_size = self_other_size * item.other_proportion
 
                 if self.horizontal:
                     sprite.height = int(new_size)
@@ -338,10 +373,10 @@ class FlowLayout(Sprite):
                         total_other_size = sprite.width
 
             # Move sprite to special place if align specified
-            if sprite.flow_align:
+            if item.align:
                 other_offset = (
-                    self_other_size * sprite.flow_align
-                    - other_size * sprite.flow_align
+                    self_other_size * item.align
+                    - other_size * item.align
                 ) + self.margin
 
                 if self.horizontal:
@@ -416,9 +451,42 @@ class Spacer(object):
         self.visible = False
         self.to_be_deleted = False
 
+        self.fixed = False
+        self.cancel_parent_transform = False
+
+        # Never has a screen position to keep up to date
+        self._transform_dirty = False
+
+        # Never drawn, so never needs to invalidate a cached surface,
+        # or to be checked against a view rectangle
+        self._cache_root = None
+        self.infinite_space = True
+
+        # Never updated, so never needs to sleep
+        self.can_sleep = False
+        self._asleep = False
+
+        # Never looked up by name or tag
+        self._sprite_index = None
+
     def world_to_screen(self, x, y):
         return 0, 0 
 
+    def mark_transform_dirty(self):
+        pass
+
+    def refresh_transform(self):
+        pass
+
+    def set_cache_root(self, cache_root):
+        pass
+
+    def set_sprite_index(self, index):
+        pass
+
+    def update_screen_positions(self):
+        pass
+
     def on_add(self):
         pass
 
@@ -0,0 +1,320 @@
+""" This module measures how long the :any:`sgl.lib.Sprite.Sprite`
+tree takes to update and draw, broken down by sprite class, by named
+sprite, and by where sprites are in the tree. Use it when a frame is
+slow and you can't tell which of your sprites is responsible::
+
+    import sgl.lib.Profiler as profiler
+
+    profiler.enable()
+    # ...run the game for a while...
+    print(profiler.report())
+
+Times are wall clock times, in milliseconds per frame. For each sprite,
+"total" includes everything inside it, and "self" leaves out the time
+spent updating or drawing its child sprites, so it is the cost of its
+own :any:`sgl.lib.Sprite.Sprite.update` or
+:any:`sgl.lib.Sprite.Sprite.draw_self`. A sprite that has a ``name``
+attribute is also counted under that name, so one particular sprite
+can be told apart from others of its class.
+
+:any:`write_folded` saves the same measurements as "folded stacks",
+one line per path through the sprite tree, which tools like
+FlameGraph and speedscope can turn into flame graphs.
+
+Profiling works by replacing the ``update`` and ``draw`` methods of
+every sprite class with timed versions while it is enabled, and
+putting the originals back when it is disabled, so it costs nothing
+at all when it is off. Enable it after all your sprite classes have
+been defined (classes defined later are only timed where they call
+the base class versions). """
+
+import timeit
+
+import sgl
+from sgl.lib.Sprite import Sprite
+
+PHASES = ("update", "draw")
+
+timer = timeit.default_timer
+
+def sprite_classes():
+    # """ Internal use only. Sprite and every class that inherits from
+    # it, each once. """
+
+    found = []
+    to_visit = [Sprite]
+    while to_visit:
+        cls = to_visit.pop()
+        if cls in found: continue
+        found.append(cls)
+        to_visit.extend(cls.__subclasses__())
+    return found
+
+class Stat(object):
+    """ How long one kind of sprite took, added up over every frame
+    since profiling started. """
+
+    __slots__ = ("calls", "total", "own")
+
+    def __init__(self):
+        self.calls = 0
+        """ int: How many times it was updated or drawn. """
+
+        self.total = 0.0
+        """ float: Seconds spent, including child sprites. """
+
+        self.own = 0.0
+        """ float: Seconds spent, not including child sprites. """
+
+class Profiler(object):
+    """ Keeps track of the measurements. You don't usually need to make
+    one of these, as the module functions use a shared one. """
+
+    def __init__(self):
+        self.enabled = False
+        self.originals = []
+        self.stack = []
+        self.clear()
+
+    def reset(self):
+        """ Throws away everything measured so far. """
+
+        self.clear()
+        self.start_frame = sgl.get_frame_count()
+
+    def clear(self):
+        # """ Internal use only. Like reset, but also works before SGL
+        # has been initialized. """
+
+        self.by_class = {}
+        """ dict: Maps ``(class name, phase)`` to a :any:`Stat`. """
+
+        self.by_name = {}
+        """ dict: Maps ``(sprite name, phase)`` to a :any:`Stat`. """
+
+        self.folded = {}
+        """ dict: Maps paths through the sprite tree, like
+        ``"draw;Scene;SpriteGroup;Enemy"``, to the seconds spent in the
+        last sprite on that path itself. """
+
+        self.start_frame = None
+
+    @property
+    def frames(self):
+        """ int: How many frames have passed since measuring
+        started. """
+
+        if self.start_frame is None: return 1
+        return max(1, sgl.get_frame_count() - self.start_frame)
+
+    def enable(self):
+        """ Starts measuring. See :any:`enable`. """
+
+        if self.enabled: return
+        self.enabled = True
+        if self.start_frame is None:
+            self.start_frame = sgl.get_frame_count()
+
+        for cls in sprite_classes():
+            for phase in PHASES:
+                original = cls.__dict__.get(phase)
+                if original is None: continue
+
+                self.originals.append((cls, phase, original))
+                setattr(cls, phase, self.timed(original, phase))
+
+    def disable(self):
+        """ Stops measuring. See :any:`disable`. """
+
+        if not self.enabled: return
+        self.enabled = False
+
+        for cls, phase, original in self.originals:
+            setattr(cls, phase, original)
+        self.originals = []
+        del self.stack[:]
+
+    def timed(self, original, phase):
+        # """ Internal use only. Makes the version of a method that is
+        # swapped in while profiling. """
+
+        stack = self.stack
+        record = self.record
+
+        def timed(sprite, *args, **kwargs):
+            # An override calling the base class version is still the
+            # same sprite, so it is only timed once
+            if stack:
+                top = stack[-1]
+                if top[0] is sprite and top[1] == phase:
+                    return original(sprite, *args, **kwargs)
+
+            entry = [sprite, phase, 0.0]
+            stack.append(entry)
+            start = timer()
+            try:
+                return original(sprite, *args, **kwargs)
+            finally:
+                elapsed = timer() - start
+                stack.pop()
+                if stack: stack[-1][2] += elapsed
+                record(entry, elapsed)
+
+        timed.__name__ = original.__name__
+        timed.__doc__ = original.__doc__
+        return timed
+
+    def record(self, entry, elapsed):
+        # """ Internal use only. Adds up one update or draw of one
+        # sprite. """
+
+        sprite, phase, children = entry[0], entry[1], entry[2]
+        own = elapsed - children
+
+        class_name = type(sprite).__name__
+        name = getattr(sprite, "name", None)
+
+        stats = [self.stat(self.by_class, (class_name, phase))]
+        if name:
+            stats.append(self.stat(self.by_name, (name, phase)))
+        for stat in stats:
+            stat.calls += 1
+            stat.total += elapsed
+            stat.own += own
+
+        path = [name or class_name]
+        for parent in reversed(self.stack):
+            if parent[1] != phase: break
+            path.append(getattr(parent[0], "name", None)
+                        or type(parent[0]).__name__)
+        path.append(phase)
+        path = ";".join(reversed(path))
+        self.folded[path] = self.folded.get(path, 0.0) + own
+
+    def stat(self, stats, key):
+        # """ Internal use only. """
+
+        stat = stats.get(key)
+        if stat is None:
+            stat = stats[key] = Stat()
+        return stat
+
+    def report_lines(self, by="class", sort="own", limit=20):
+        # """ Internal use only. See report. """
+
+        stats = self.by_name if by == "name" else self.by_class
+        frames = float(self.frames)
+        rows = sorted(stats.items(),
+                      key=lambda item: getattr(item[1], sort),
+                      reverse=True)[:limit]
+
+        lines = ["{:<28}{:<8}{:>10}{:>10}{:>10}".format(
+            by, "phase", "calls/f", "total ms", "self ms")]
+        for (label, phase), stat in rows:
+            lines.append("{:<28}{:<8}{:>10.1f}{:>10.3f}{:>10.3f}".format(
+                label[:27], phase, stat.calls / frames,
+                1000 * stat.total / frames, 1000 * stat.own / frames))
+        return lines
+
+profiler = Profiler()
+""" :any:`Profiler`: The profiler the module functions use. """
+
+overlay_font = None
+
+def enable():
+    """ Starts timing every sprite's updating and drawing. Does nothing
+    if profiling is already on. """
+
+    profiler.enable()
+
+def disable():
+    """ Stops timing, and puts every sprite class back the way it was.
+    What was measured is kept until :any:`reset`. """
+
+    profiler.disable()
+
+def reset():
+    """ Throws away everything measured so far, for example to leave
+    out a loading screen. """
+
+    profiler.reset()
+
+def is_enabled():
+    """ Returns whether profiling is on.
+
+    Returns:
+        bool: Whether profiling is on. """
+
+    return profiler.enabled
+
+def report(by="class", sort="own", limit=20):
+    """ Makes a table of the slowest kinds of sprites.
+
+    Args:
+        by (str): ``"class"`` to group sprites by class, or ``"name"``
+            to only list sprites with a ``name`` attribute, by name.
+        sort (str): ``"own"`` to sort by the time spent in sprites
+            themselves, ``"total"`` to include child sprites, or
+            ``"calls"``.
+        limit (int): How many rows to include at most.
+
+    Returns:
+        str: The table, one row per class (or name) and phase, with
+             calls, total time and self time per frame. """
+
+    return "\n".join(profiler.report_lines(by, sort, limit))
+
+def draw_overlay(x=0, y=0, by="class", sort="own", limit=10, font=None):
+    """ Draws the table :any:`report` makes on top of whatever is on
+    the screen. Call it at the end of your draw function.
+
+    Args:
+        x (number): The X position of the top left corner of the
+            table.
+        y (number): The Y position of the top left corner.
+        by (str): See :any:`report`.
+        sort (str): See :any:`report`.
+        limit (int): See :any:`report`.
+        font (SGL font): The font to draw with. Defaults to a small
+            system font. A monospaced one lines up best. """
+
+    global overlay_font
+
+    if font is None:
+        if overlay_font is None:
+            overlay_font = sgl.load_system_font("Courier New", 12)
+        font = overlay_font
+
+    lines = profiler.report_lines(by, sort, limit)
+
+    with sgl.with_state():
+        sgl.set_font(font)
+        line_height = sgl.get_text_height() + 2
+        width = max(sgl.get_text_width(line) for line in lines) + 8
+
+        sgl.no_stroke()
+        sgl.set_fill(0, 0.75)
+        sgl.draw_rect(x, y, width, line_height * len(lines) + 8)
+
+        sgl.set_fill(1.0)
+        for number, line in enumerate(lines):
+            sgl.draw_text(line, x + 4, y + 4 + number * line_height)
+
+def write_folded(file, unit=1e6):
+    """ Saves what was measured as folded stacks: one line per path
+    through the sprite tree, like ``draw;Scene;SpriteGroup;Enemy 1234``,
+    with the time spent in the last sprite on the path itself. Flame
+    graph tools (such as ``flamegraph.pl`` or speedscope) read this
+    format.
+
+    Args:
+        file (str): The filename to save to.
+        unit (number): What to multiply seconds by before saving. The
+            default saves microseconds, since the tools expect whole
+            numbers. """
+
+    with open(file, "w") as output:
+        for path, seconds in sorted(profiler.folded.items()):
+            value = int(round(seconds * unit))
+            if value:
+                output.write("{} {}\n".format(path, value))
@@ -0,0 +1,370 @@
+""" This module provides :any:`RotationSet`, which draws a graphic (or
+every frame of an :any:`sgl.lib.Sprite.AnimatedSprite`) rotated to a
+number of angles, and optionally at a few scales, ahead of time.
+Drawing a rotated sprite then only costs as much as drawing an
+unrotated one, instead of rotating the graphic again every time its
+angle changes. This is a good fit for things like turrets and ships,
+which turn all the time.
+
+The drawn graphics can be saved to the hard drive as one big image
+(plus a small file describing it), so they only have to be made
+once::
+
+    class Ship(AnimatedSprite):
+        frames = Spritesheet(sgl.load_alpha_image("ship.png"), 32, 32)
+        rotations = load_or_bake("cache/ship.png", frames, steps=64)
+
+        def __init__(self):
+            super(Ship, self).__init__()
+            self.rotation_set = self.rotations
+
+    ship = Ship()
+    # Now this costs nothing extra
+    ship.angle = 45
+
+Angles are rounded to the nearest one that was drawn, so use enough
+steps that it isn't noticeable (64 is usually plenty). Sprites that
+are flipped are still rotated the slow way. """
+
+import json
+import math
+import os
+import weakref
+
+import sgl
+
+VERSION = 1
+
+# Rotation sets still in use, keyed by what they were made from, so
+# that unpickling one doesn't bake it again if it's still around
+rotation_sets = weakref.WeakValueDictionary()
+
+def get_key(sources, steps, scales, a_x, a_y, pretty):
+    # """ Internal use only. """
+
+    return (tuple(id(source) for source in sources), steps, tuple(scales),
+            a_x, a_y, pretty)
+
+def rebake(sources, steps, scales, a_x, a_y, pretty):
+    # """ Internal use only. Unpickles a RotationSet, by finding the
+    # one made from the same graphics with the same settings, or by
+    # baking it again. """
+
+    rotations = rotation_sets.get(
+        get_key(sources, steps, scales, a_x, a_y, pretty))
+    if rotations is None:
+        rotations = RotationSet.bake(sources, steps, scales, a_x, a_y, pretty)
+    return rotations
+
+def real_anchor(a_x, a_y, width, height):
+    # """ Internal use only. Turns an anchor point that may be made of
+    # fractions into pixels, like sgl.blit does. """
+
+    if isinstance(a_x, float): a_x = width * a_x
+    if isinstance(a_y, float): a_y = height * a_y
+    return a_x, a_y
+
+def get_size(surface):
+    # """ Internal use only. """
+
+    with sgl.with_buffer(surface):
+        return sgl.get_width(), sgl.get_height()
+
+def metadata_file(file):
+    # """ Internal use only. """
+
+    return os.path.splitext(file)[0] + ".json"
+
+class RotationSet(object):
+    """ A set of graphics drawn at many angles and scales ahead of
+    time. Make one with :any:`bake`, :any:`load` or
+    :any:`load_or_bake`, then either set it as a sprite's
+    :any:`sgl.lib.Sprite.Sprite.rotation_set` or use :any:`draw`
+    yourself.
+
+    When pickled (by :any:`sgl.lib.Snapshot`, for example), only the
+    original graphics and the settings are kept, and the graphics are
+    drawn again when it is unpickled, unless the same set is still in
+    memory. """
+
+    def __init__(self, sources, steps, scales, a_x, a_y, cell_size,
+                 pretty=True):
+        # """ Internal use only. Use bake, load or load_or_bake. """
+
+        self.sources = sources
+        """ list: The original graphics, in the order they were
+        baked. """
+
+        self.steps = steps
+        """ int: How many angles each graphic was drawn at, evenly
+        spread around the circle. """
+
+        self.scales = scales
+        """ tuple: The scales each graphic was drawn at. """
+
+        self.a_x = a_x
+        """ number: The X position of the anchor point graphics were
+        rotated around. Like :any:`sgl.lib.Sprite.Sprite.a_x`, a float
+        is a fraction of the graphic's width. """
+
+        self.a_y = a_y
+        """ number: The Y position of the anchor point. """
+
+        self.cell_size = cell_size
+        """ int: The width and height of each drawn graphic. The
+        anchor point is always in the middle. """
+
+        self.pretty = pretty
+        """ bool: Whether the rotation was smoothed out. """
+
+        self.half = cell_size // 2
+        self.step_angle = 360.0 / steps
+
+        self.indices = dict((id(source), index)
+                            for index, source in enumerate(sources))
+
+        # variants[source index][scale index][angle index]
+        self.variants = [[[None] * steps for scale in scales]
+                         for source in sources]
+
+        rotation_sets[get_key(sources, steps, scales, a_x, a_y, pretty)] = self
+
+    def __reduce__(self):
+        return (rebake, (self.sources, self.steps, self.scales,
+                         self.a_x, self.a_y, self.pretty))
+
+    @classmethod
+    def bake(cls, sources, steps=64, scales=(1,), a_x=0.5, a_y=0.5,
+             pretty=True):
+        """ Draws graphics at many angles and scales.
+
+        Args:
+            sources (SGL surface or list): The graphic to draw, or a
+                list of them (such as an animated sprite's
+                :any:`sgl.lib.Sprite.AnimatedSprite.frames`).
+            steps (int): How many angles to draw each graphic at.
+            scales (tuple): The scales to draw each graphic at.
+            a_x (number): The X position of the point to rotate
+                around. Should be the same as the sprite's
+                :any:`sgl.lib.Sprite.Sprite.a_x`.
+            a_y (number): The Y position of the point to rotate
+                around.
+            pretty (bool): Whether to smooth out the rotation. Since
+                this is done ahead of time, there is little reason not
+                to.
+
+        Returns:
+            :any:`RotationSet`: The drawn graphics. """
+
+        if not isinstance(sources, list):
+            sources = [sources]
+        if steps < 1:
+            raise sgl.ArgumentError("A rotation set needs at least one step")
+        if not scales:
+            raise sgl.ArgumentError("A rotation set needs at least one scale")
+
+        scales = tuple(scales)
+
+        # Every rotation of a graphic fits in a circle around its
+        # anchor point that touches its farthest corner
+        radius = 0
+        for source in sources:
+            width, height = get_size(source)
+            anchor_x, anchor_y = real_anchor(a_x, a_y, width, height)
+            radius = max(radius, math.hypot(max(anchor_x, width - anchor_x),
+                                            max(anchor_y, height - anchor_y)))
+        cell_size = 2 * (int(math.ceil(radius * max(scales))) + 1)
+
+        rotations = cls(sources, steps, scales, a_x, a_y, cell_size, pretty)
+
+        for index, source in enumerate(sources):
+            for scale_index, scale in enumerate(scales):
+                for step in range(steps):
+                    cell = sgl.make_surface(cell_size, cell_size)
+                    with sgl.with_buffer(cell):
+                        sgl.blit(source, rotations.half, rotations.half,
+                                 a_x=a_x, a_y=a_y, scale=scale,
+                                 angle=step * rotations.step_angle,
+                                 pretty=pretty)
+                    rotations.variants[index][scale_index][step] = cell
+
+        return rotations
+
+    def save(self, file):
+        """ Saves every drawn graphic to one image, and a description
+        of it to a JSON file next to it with the same name.
+
+        Args:
+            file (str): The filename of the image. Should be a format
+                that keeps transparency, like PNG. """
+
+        size = self.cell_size
+        rows = len(self.sources) * len(self.scales)
+        atlas = sgl.make_surface(self.steps * size, rows * size)
+
+        with sgl.with_buffer(atlas):
+            for index, per_scale in enumerate(self.variants):
+                for scale_index, per_angle in enumerate(per_scale):
+                    y = (index * len(self.scales) + scale_index) * size
+                    for step, cell in enumerate(per_angle):
+                        sgl.blitf(cell, step * size, y)
+
+            sgl.save_image(file)
+
+        with open(metadata_file(file), "w") as metadata:
+            json.dump(self.describe(), metadata, indent=4, sort_keys=True)
+
+    def describe(self):
+        # """ Internal use only. What is saved next to the image, and
+        # compared with when loading it again. """
+
+        return {
+            "version": VERSION,
+            "steps": self.steps,
+            "scales": list(self.scales),
+            "a_x": self.a_x,
+            "a_y": self.a_y,
+            "pretty": self.pretty,
+            "cell_size": self.cell_size,
+            "sizes": [list(get_size(source)) for source in self.sources],
+        }
+
+    @classmethod
+    def load(cls, file, sources):
+        """ Loads graphics saved by :any:`save`.
+
+        Args:
+            file (str): The filename of the image.
+            sources (SGL surface or list): The original graphics the
+                set was baked from, in the same order. These are what
+                :any:`draw` looks the drawn graphics up by.
+
+        Returns:
+            :any:`RotationSet`: The loaded graphics. """
+
+        if not isinstance(sources, list):
+            sources = [sources]
+
+        with open(metadata_file(file)) as metadata:
+            description = json.load(metadata)
+
+        if len(description["sizes"]) != len(sources):
+            raise sgl.ArgumentError(
+                "{} was baked from {} graphics, not {}".format(
+                    file, len(description["sizes"]), len(sources)))
+
+        rotations = cls(sources, description["steps"],
+                        tuple(description["scales"]),
+                        description["a_x"], description["a_y"],
+                        description["cell_size"],
+                        description.get("pretty", True))
+
+        size = rotations.cell_size
+        atlas = sgl.load_alpha_image(file)
+        with sgl.with_buffer(atlas):
+            for index, per_scale in enumerate(rotations.variants):
+                for scale_index, per_angle in enumerate(per_scale):
+                    y = (index * len(rotations.scales) + scale_index) * size
+                    for step in range(rotations.steps):
+                        per_angle[step] = sgl.get_chunk(
+                            step * size, y, size, size)
+
+        return rotations
+
+    def get(self, source, angle, scale=1):
+        """ Finds the graphic drawn closest to an angle and scale.
+
+        Args:
+            source (SGL surface): One of the original graphics.
+            angle (number): The angle, in degrees.
+            scale (number): The scale.
+
+        Returns:
+            SGL surface: The drawn graphic, with the anchor point in
+                 the middle, or None if ``source`` is not part of this
+                 set. """
+
+        index = self.indices.get(id(source))
+        if index is None: return None
+
+        per_scale = self.variants[index]
+        if len(per_scale) == 1:
+            per_angle = per_scale[0]
+        else:
+            scales = self.scales
+            per_angle = per_scale[min(range(len(scales)),
+                                      key=lambda i: abs(scales[i] - scale))]
+
+        step = int(round(angle / self.step_angle)) % self.steps
+        return per_angle[step]
+
+    def draw(self, source, x, y, angle, scale=1, alpha=255):
+        """ Draws the graphic closest to an angle and scale, with its
+        anchor point at a position.
+
+        Args:
+            source (SGL surface): One of the original graphics.
+            x (number): The X position to draw the anchor point at.
+            y (number): The Y position to draw the anchor point at.
+            angle (number): The angle, in degrees.
+            scale (number): The scale.
+            alpha (number): How transparent to draw the graphic.
+
+        Returns:
+            bool: False if ``source`` is not part of this set, in which
+                 case nothing was drawn. """
+
+        cell = self.get(source, angle, scale)
+        if cell is None: return False
+
+        if alpha == 255:
+            sgl.blitf(cell, x - self.half, y - self.half)
+        else:
+            sgl.blit(cell, x - self.half, y - self.half, alpha=alpha)
+        return True
+
+def load_or_bake(file, sources, steps=64, scales=(1,), a_x=0.5, a_y=0.5,
+                 pretty=True):
+    """ Loads a :any:`RotationSet` saved to ``file``, or bakes and saves
+    it if it hasn't been yet. It is baked again if the saved one was
+    made with different settings or from graphics of a different size.
+    (If you change a graphic without changing its size, delete the
+    saved files.)
+
+    Takes the same arguments as :any:`RotationSet.bake`, plus the
+    filename of the image to save.
+
+    Returns:
+        :any:`RotationSet`: The drawn graphics. """
+
+    if not isinstance(sources, list):
+        sources = [sources]
+
+    if os.path.exists(file) and os.path.exists(metadata_file(file)):
+        with open(metadata_file(file)) as metadata:
+            try:
+                saved = json.load(metadata)
+            except ValueError:
+                saved = None
+
+        expected = {
+            "version": VERSION,
+            "steps": steps,
+            "scales": list(scales),
+            "a_x": a_x,
+            "a_y": a_y,
+            "pretty": pretty,
+            "sizes": [list(get_size(source)) for source in sources],
+        }
+        if saved and all(saved.get(key) == value
+                         for key, value in expected.items()):
+            return RotationSet.load(file, sources)
+
+    rotations = RotationSet.bake(sources, steps, scales, a_x, a_y, pretty)
+
+    directory = os.path.dirname(file)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    rotations.save(file)
+
+    return rotations
@@ -0,0 +1,356 @@
+""" This module saves the state of a whole :any:`sgl.lib.Sprite.Scene`
+into a compact blob of bytes, and brings it back later: every sprite's
+position, animation, and anything else stored on it, plus the camera,
+tilemaps, and what :any:`sgl.lib.Tween` and :any:`sgl.lib.Time` are in
+the middle of doing. This is useful for save states, rewinding, and
+restarting levels quickly, without building the scene from scratch::
+
+    import sgl.lib.Snapshot as snapshot
+
+    checkpoint = snapshot.take(app.scene)
+    # ...later...
+    checkpoint.restore(app)
+
+Graphics aren't copied into snapshots, only referred to, so taking one
+is fast and they stay small. Graphics can be given names with
+:any:`register_asset`; any that aren't are only remembered for as long
+as the snapshot is in memory, so they need names for snapshots saved
+to the hard drive with :any:`Snapshot.save`. Fonts, sounds, and other
+things that can't be copied also need to be registered.
+
+Graphics that sprites make for themselves, and can make again, aren't
+kept at all: surfaces made by
+:any:`sgl.lib.Sprite.Sprite.cache_as_surface`, the drawn graphics of a
+:any:`sgl.lib.RotationSet.RotationSet` (only its original graphics
+are kept), and the like. Your own sprite classes can list attributes
+holding graphics like these in a ``snapshot_derived`` class attribute,
+as long as they make them again when they find them set to None.
+
+A restored scene is a copy, so anything outside of the scene that
+refers to sprites in it (other than tweens and timers) will still refer
+to the old ones. Timers and callbacks should be functions defined at
+the top level of a module, or methods, not lambdas or functions defined
+inside other functions. """
+
+import types
+import zlib
+from collections import deque
+from io import BytesIO
+
+try:
+    import cPickle as pickle
+    has_cpickle = True
+except ImportError:
+    import pickle
+    has_cpickle = False
+
+import sgl
+import sgl.lib.Time as timers
+import sgl.lib.Tween as tween
+from sgl.lib.Sprite import (App, AnimatedSprite, SharedPhase,
+                            no_perspective_sprites, y_key)
+
+VERSION = 1
+
+assets = {}
+assets_by_id = {}
+
+def register_asset(thing, asset_id):
+    """ Gives something that sprites refer to a name, so that
+    snapshots refer to it by that name instead of copying it. Every
+    graphic in a snapshot saved to the hard drive needs one, and so
+    does anything else that can't be copied, like fonts and sounds.
+    The same names have to be registered (with the same things, or
+    equivalent ones loaded from the same files) before restoring the
+    snapshot.
+
+    Args:
+        thing: The graphic (or other thing) to name. If it is a list,
+            like the frames of an animated sprite, each item is
+            registered as ``asset_id`` plus ``"/"`` and its index.
+        asset_id (str): The name. Filenames work well. """
+
+    if isinstance(thing, list):
+        for index, item in enumerate(thing):
+            register_asset(item, "{}/{}".format(asset_id, index))
+        return
+
+    previous = assets_by_id.get(asset_id)
+    if previous is not None:
+        assets.pop(id(previous), None)
+
+    # The thing is kept in the entry, so its id can't be reused
+    assets[id(thing)] = (asset_id, thing)
+    assets_by_id[asset_id] = thing
+
+register_asset(y_key, "sgl.lib.Sprite.y_key")
+for name, value in vars(tween.Easing).items():
+    if isinstance(value, staticmethod):
+        register_asset(getattr(tween.Easing, name),
+                       "sgl.lib.Tween.Easing." + name)
+
+surface_type = None
+
+def walk(sprite):
+    # """ Internal use only. Yields a sprite and everything inside
+    # it. """
+
+    to_visit = [sprite]
+    while to_visit:
+        sprite = to_visit.pop()
+        yield sprite
+        to_visit.extend(getattr(sprite, "subsprites", ()))
+
+class Snapshot(object):
+    """ The saved state of a scene. Made by :any:`take`. """
+
+    def __init__(self, data, surfaces, app, frame):
+        # """ Internal use only. Use take or Snapshot.load. """
+
+        self.data = data
+        """ bytes: The pickled state. """
+
+        self.surfaces = surfaces
+        """ dict: Graphics the snapshot refers to that don't have names
+        (see :any:`register_asset`). """
+
+        self.app = app
+        """ :any:`sgl.lib.Sprite.App`: The application the scene was
+        part of, if any. Not saved to the hard drive. """
+
+        self.frame = frame
+        """ int: The frame (see :any:`sgl.get_frame_count`) the
+        snapshot was taken on. """
+
+    def __len__(self):
+        return len(self.data)
+
+    def restore(self, app=None):
+        """ Makes a copy of the scene as it was when the snapshot was
+        taken, and puts tweens and timers back the way they were.
+
+        Args:
+            app (:any:`sgl.lib.Sprite.App`): If given (or if the scene
+                was part of one when the snapshot was taken), the
+                restored scene is switched to.
+
+        Returns:
+            :any:`sgl.lib.Sprite.Scene`: The restored scene. """
+
+        if app is None: app = self.app
+
+        def persistent_load(pid):
+            kind = pid[0]
+            if kind == "asset":
+                thing = assets_by_id.get(pid[1])
+                if thing is None:
+                    raise sgl.ArgumentError(
+                        "Asset {!r} has not been registered".format(pid[1]))
+                return thing
+            elif kind == "surface":
+                return self.surfaces[pid[1]]
+            elif kind == "method":
+                return getattr(pid[1], pid[2])
+            elif kind == "app":
+                return app
+            # Shared phases and cached surfaces are made again
+            return None
+
+        unpickler = pickle.Unpickler(BytesIO(self.data))
+        unpickler.persistent_load = persistent_load
+        state = unpickler.load()
+
+        scene = state["scene"]
+        # Kept outside of the sprites, so it isn't pickled with them
+        for sprite in state["no_perspective"]:
+            sprite.no_perspective = True
+
+        for sprite in walk(scene):
+            if (isinstance(sprite, AnimatedSprite) and sprite.share_phase
+                and sprite.anim_playing):
+                sprite.anim_join_phase()
+
+        tween.manager.tweens = state["tweens"]
+        tween.manager.time = state["tween_time"]
+        timers.manager.functions = state["timer_functions"]
+        timers.manager.intervals = state["timer_intervals"]
+        timers.manager.time = state["timer_time"]
+
+        if app is not None:
+            app.switch_scene(scene)
+
+        return scene
+
+    def save(self, file):
+        """ Saves the snapshot to the hard drive, compressed. Every
+        graphic it refers to has to have been given a name with
+        :any:`register_asset`.
+
+        Args:
+            file (str): The filename to save to. """
+
+        if self.surfaces:
+            raise sgl.ArgumentError(
+                "Snapshot refers to {} graphics without names; give them "
+                "names with register_asset first".format(len(self.surfaces)))
+
+        with open(file, "wb") as output:
+            output.write(zlib.compress(self.data, 1))
+
+    @classmethod
+    def load(cls, file):
+        """ Loads a snapshot saved with :any:`save`.
+
+        Args:
+            file (str): The filename to load.
+
+        Returns:
+            :any:`Snapshot`: The snapshot. Call :any:`restore` on it
+                 to use it. """
+
+        with open(file, "rb") as input:
+            data = zlib.decompress(input.read())
+        return cls(data, {}, None, 0)
+
+def take(scene):
+    """ Saves the state of a scene, and of every tween and timer.
+
+    Args:
+        scene (:any:`sgl.lib.Sprite.Scene`): The scene to save.
+
+    Returns:
+        :any:`Snapshot`: The snapshot. """
+
+    global surface_type
+    if surface_type is None:
+        surface_type = type(sgl.make_surface(1, 1))
+
+    # Cached surfaces can be drawn again, so they aren't kept
+    derived = set()
+    for sprite in walk(scene):
+        cached = getattr(sprite, "_cache_surface", None)
+        if cached is not None:
+            derived.add(id(cached))
+        for name in getattr(sprite, "snapshot_derived", ()):
+            surface = getattr(sprite, name, None)
+            if surface is not None:
+                derived.add(id(surface))
+
+    surfaces = {}
+
+    def persistent_id(thing):
+        entry = assets.get(id(thing))
+        if entry is not None and entry[1] is thing:
+            return ("asset", entry[0])
+
+        kind = type(thing)
+        if kind is surface_type:
+            if id(thing) in derived:
+                return ("derived",)
+            surfaces[id(thing)] = thing
+            return ("surface", id(thing))
+        if kind is types.MethodType and thing.__self__ is not None:
+            return ("method", thing.__self__, thing.__name__)
+        if isinstance(thing, SharedPhase):
+            return ("phase",)
+        if isinstance(thing, App):
+            return ("app",)
+        return None
+
+    state = {
+        "version": VERSION,
+        "scene": scene,
+        "no_perspective": [sprite for sprite in walk(scene)
+                           if sprite in no_perspective_sprites],
+        "tweens": tween.manager.tweens,
+        "tween_time": tween.manager.time,
+        "timer_functions": timers.manager.functions,
+        "timer_intervals": timers.manager.intervals,
+        "timer_time": timers.manager.time,
+    }
+
+    buffer = BytesIO()
+    pickler = pickle.Pickler(buffer, 2)
+    if has_cpickle:
+        # Only asked about objects cPickle can't handle by itself,
+        # which skips numbers, strings and containers
+        pickler.inst_persistent_id = persistent_id
+    else:
+        pickler.persistent_id = persistent_id
+    pickler.dump(state)
+
+    return Snapshot(buffer.getvalue(), surfaces, scene.app,
+                    sgl.get_frame_count())
+
+class SnapshotHistory(object):
+    """ Takes a snapshot of a scene every so often, and keeps the last
+    few, so that the game can be rewound::
+
+        history = SnapshotHistory(length=10, interval=1.0)
+
+        # In the scene's update
+        history.update(self)
+
+        # Go back two seconds
+        history.rewind(2)
+    """
+
+    def __init__(self, length=10, interval=1.0):
+        """
+        Args:
+            length (int): How many snapshots to keep. Older ones are
+                thrown away.
+            interval (number): How many seconds apart snapshots are
+                taken.
+        """
+
+        self.interval = interval
+        self.snapshots = deque(maxlen=length)
+        """ deque: The snapshots, oldest first. """
+
+        self.time = interval
+
+    def __len__(self):
+        return len(self.snapshots)
+
+    def update(self, scene):
+        """ Takes a snapshot if it's time for one. Call this every
+        frame.
+
+        Args:
+            scene (:any:`sgl.lib.Sprite.Scene`): The scene to take
+                snapshots of. """
+
+        self.time += sgl.get_dt()
+        if self.time >= self.interval:
+            self.time = 0
+            self.snapshots.append(take(scene))
+
+    def rewind(self, steps=1, app=None):
+        """ Restores an earlier snapshot, and throws away the ones
+        taken after it.
+
+        Args:
+            steps (int): How many snapshots back to go. 1 is the last
+                one taken.
+            app (:any:`sgl.lib.Sprite.App`): See
+                :any:`Snapshot.restore`.
+
+        Returns:
+            :any:`sgl.lib.Sprite.Scene`: The restored scene, or None if
+                 there are no snapshots. """
+
+        if not self.snapshots: return None
+
+        steps = max(1, min(steps, len(self.snapshots)))
+        for i in range(steps - 1):
+            self.snapshots.pop()
+
+        self.time = 0
+        return self.snapshots[-1].restore(app)
+
+    def clear(self):
+        """ Throws away every snapshot. """
+
+        self.snapshots.clear()
+        self.time = self.interval
@@ -0,0 +1,207 @@
+""" This module provides a uniform grid that keeps track of which
+sprites are in which part of a sprite's local space, so that drawing
+only has to look at the sprites near the screen instead of every
+single one. You should not usually need to use it directly---call
+:any:`sgl.lib.Sprite.Sprite.enable_spatial_index` on a
+:any:`sgl.lib.Sprite.SpriteGroup` or :any:`sgl.lib.Sprite.Scene`
+instead.
+
+Sprites tell the grid when they move or change size, and the grid
+moves them to their new cells the next time it is queried, so a sprite
+that moves many times in a frame is only re-sorted once.
+"""
+
+from operator import attrgetter
+
+order_key = attrgetter("_order")
+
+class SpatialGrid(object):
+    """ Buckets sprites into square cells by their bounding boxes. """
+
+    max_cells = 64
+    """ int: Sprites that cover more than this many cells are not put
+    in cells at all, and are always returned by :any:`query`
+    instead. """
+
+    def __init__(self, cell_size=256):
+        """
+        Args:
+            cell_size (int): How wide and high each cell is, in
+                pixels. Something around the size of the screen is a
+                good start. Smaller cells waste less time on sprites
+                that are off the screen, but cost more to keep up to
+                date.
+        """
+
+        self.cell_size = cell_size
+
+        self.cells = {}
+        """ dict: Maps ``(column, row)`` tuples to sets of sprites. """
+
+        self.always = set()
+        """ set: Sprites that are returned by every query, because they
+        are not positioned in a way the grid can understand (for
+        example, they have a parallax value, or are fixed to the
+        screen). """
+
+        self.placements = {}
+        self.pending = set()
+        self.next_order = 0
+        self.first_order = 0
+
+    def __len__(self):
+        return len(self.placements) + len(self.pending)
+
+    def add(self, sprite):
+        """ Starts keeping track of a sprite. Sprites are returned by
+        :any:`query` in the order they were added.
+
+        Args:
+            sprite (:any:`sgl.lib.Sprite.Sprite`): The sprite to add. """
+
+        sprite._order = self.next_order
+        self.next_order += 1
+
+        sprite._index = self
+        self.pending.add(sprite)
+
+    def remove(self, sprite):
+        """ Stops keeping track of a sprite.
+
+        Args:
+            sprite (:any:`sgl.lib.Sprite.Sprite`): The sprite to
+                remove. """
+
+        self.pending.discard(sprite)
+        self.unplace(sprite)
+        sprite._index = None
+
+    def move_to_end(self, sprite, front=True):
+        """ Changes where a sprite is in the order :any:`query` returns
+        sprites in.
+
+        Args:
+            sprite (:any:`sgl.lib.Sprite.Sprite`): The sprite to move.
+            front (bool): If True, the sprite is moved after every
+                other sprite. If False, it is moved before them. """
+
+        if front:
+            sprite._order = self.next_order
+            self.next_order += 1
+        else:
+            self.first_order -= 1
+            sprite._order = self.first_order
+
+    def touch(self, sprite):
+        # """ Internal use only. Called by sprites when their bounding
+        # box changes. """
+
+        self.pending.add(sprite)
+
+    def clear(self):
+        """ Stops keeping track of every sprite. """
+
+        for sprite in list(self.placements) + list(self.pending):
+            sprite._index = None
+
+        self.cells = {}
+        self.always = set()
+        self.placements = {}
+        self.pending = set()
+
+    def unplace(self, sprite):
+        # """ Internal use only. Removes a sprite from its cells. """
+
+        placement = self.placements.pop(sprite, None)
+        if placement is None: return
+
+        if placement == "always":
+            self.always.discard(sprite)
+            return
+
+        first_column, first_row, last_column, last_row = placement
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                cell = self.cells[(column, row)]
+                cell.discard(sprite)
+                if not cell: del self.cells[(column, row)]
+
+    def placement_of(self, sprite):
+        # """ Internal use only. Works out which cells a sprite belongs
+        # in, or "always" if it does not belong in any in particular. """
+
+        if (sprite.infinite_space or sprite.fixed
+            or sprite.cancel_parent_transform or sprite.parallax != 1):
+            return "always"
+
+        a_x, a_y = sprite.real_anchor
+        x = sprite.x - a_x
+        y = sprite.y - a_y
+        size = self.cell_size
+
+        placement = (int(x // size), int(y // size),
+                     int((x + sprite.width) // size),
+                     int((y + sprite.height) // size))
+
+        if ((placement[2] - placement[0] + 1)
+            * (placement[3] - placement[1] + 1) > self.max_cells):
+            return "always"
+
+        return placement
+
+    def flush(self):
+        """ Moves every sprite that has changed since the last query
+        to its new cells. Called automatically by :any:`query`. """
+
+        for sprite in self.pending:
+            placement = self.placement_of(sprite)
+            if self.placements.get(sprite) == placement: continue
+
+            self.unplace(sprite)
+            self.placements[sprite] = placement
+
+            if placement == "always":
+                self.always.add(sprite)
+                continue
+
+            first_column, first_row, last_column, last_row = placement
+            for column in range(first_column, last_column + 1):
+                for row in range(first_row, last_row + 1):
+                    cell = self.cells.get((column, row))
+                    if cell is None:
+                        cell = self.cells[(column, row)] = set()
+                    cell.add(sprite)
+
+        self.pending.clear()
+
+    def query(self, x, y, width, height):
+        """ Finds the sprites that might be inside a rectangle.
+
+        Args:
+            x (number): The left edge of the rectangle, in the same
+                coordinates the sprites are positioned in.
+            y (number): The top edge of the rectangle.
+            width (number): The width of the rectangle.
+            height (number): The height of the rectangle.
+
+        Returns:
+            list: Every sprite in the cells the rectangle overlaps, plus
+                 :any:`always`, in the order they were added. Some
+                 may be just outside of the rectangle. """
+
+        if self.pending: self.flush()
+
+        size = self.cell_size
+        first_column = int(x // size)
+        first_row = int(y // size)
+        last_column = int((x + width) // size)
+        last_row = int((y + height) // size)
+
+        found = set(self.always)
+        cells = self.cells
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                cell = cells.get((column, row))
+                if cell: found.update(cell)
+
+        return sorted(found, key=order_key)
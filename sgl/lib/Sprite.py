@@ -3,8 +3,15 @@
 :any:`sgl.lib.Sprite` somehow.
 """
 
+import math
+import timeit
+import weakref
+from operator import attrgetter
+
 import sgl
 from sgl.lib.Rect import Rect
+from sgl.lib.SpatialGrid import SpatialGrid
+from sgl.lib.SpriteIndex import Bucket, SpriteIndex
 
 def is_string(thing):
     # """ Returns whether `thing` is a string or not. """
@@ -14,8 +21,79 @@ def is_string(thing):
     else:
         return isinstance(thing, basestring)
 
+def visual_property(name, doc, own=True):
+    # """ Internal use only. Makes a property, stored in the slot
+    # "_" + name, that throws away the cached surface of any sprite
+    # this one is drawn into (see Sprite.cache_as_surface) when it
+    # changes. If own is False, the sprite's own cached surface is
+    # kept, because the property doesn't change what is drawn in
+    # it. """
+
+    attribute = "_" + name
+
+    def setter(self, value):
+        if own:
+            if ((self._cache_root is not None
+                 or self._cache_surface is not None)
+                and getattr(self, attribute) != value):
+                self.invalidate()
+        elif (self._cache_root is not None
+              and getattr(self, attribute) != value):
+            self._cache_root.invalidate()
+
+        setattr(self, attribute, value)
+
+    return property(attrgetter(attribute), setter, doc=doc)
+
 class Sprite(object):
-    """ Provides a class to represent drawable objects. """
+    """ Provides a class to represent drawable objects. 
+
+    To save memory and make attribute access faster, the built-in
+    sprite classes use ``__slots__``, so you cannot add new attributes
+    to a plain :any:`Sprite` (or :any:`RectSprite`, and so on). Your
+    own subclasses can have whatever attributes they like, unless they
+    define ``__slots__`` themselves. If you want a subclass to be as
+    lean as the built-in ones, give it a ``__slots__`` listing its
+    new attributes. """
+
+    # Everything set in __init__
+    __slots__ = (
+        "to_be_deleted", "view_rect", "_collision_rect", "_rect",
+        "_collision_bounds",
+        "_transform_dirty", "subsprites", "parent",
+        "_x", "_y", "_parallax", "_fixed", "_cancel_parent_transform",
+        "_camera", "_width", "_height", "_a_x", "_a_y",
+        "_spatial_index", "_index", "_order", "_pool", "_in_pool",
+        "_cache_as_surface", "_cache_surface", "_cache_root",
+        "_z", "_layers",
+        "_activity_margin", "_asleep", "_sleep_count", "keep_awake",
+        "prev_x", "prev_y", "screen_x", "screen_y",
+        "_visible", "active", "infinite_space", "scene", "app", "solid",
+        "_flip_h", "_flip_v", "_alpha", "_angle", "_pretty", "_surface",
+        "_rotation_set", "_name", "_tags", "_sprite_index",
+        "__weakref__",
+    )
+
+    can_sleep = False
+    """ bool: Whether sprites of this class can be put to sleep when
+    they are far from the screen, if their parent has
+    :any:`enable_sleeping` turned on. A sleeping sprite (and everything
+    inside it) is not updated, or only updated every
+    :any:`sleep_interval` frames. Set this on your own classes, for
+    example::
+
+        class Enemy(Sprite):
+            can_sleep = True
+
+    Leave it off for anything that needs to keep running when the
+    player can't see it. """
+
+    sleep_interval = 0
+    """ int: If this is more than 0, sleeping sprites of this class
+    are still updated once every this many frames, instead of not at
+    all. (Sprites are spread out over those frames, so they aren't all
+    updated at once.) :any:`sgl.get_dt` only covers one frame, so if
+    you use it, multiply it by this when :any:`asleep`. """
 
     def __init__(self, graphic=None):
         """ 
@@ -39,16 +117,77 @@ class Sprite(object):
         # to provide sane default. Documented there.
         self._collision_rect = None
 
+        # The collision bounding box in the parent's coordinates, as a
+        # (left, top, right, bottom) tuple, or None if anything it
+        # depends on has changed since it was last worked out.
+        self._collision_bounds = None
+
         # The drawing bounding box. Don't change it manually.
         self._rect = Rect()
 
-        self.x = 0      
-        # """ number: The X position of the sprite in local
-        # coordinates. """
+        # Whether screen_x and screen_y are out of date. If a sprite
+        # is dirty, everything inside it is too.
+        self._transform_dirty = True
+
+        self.subsprites = []
+        """ list: A list of child sprites inside this one. """
+
+        self.parent = None
+        """ :any:`Sprite`: A reference to this sprite's parent
+        sprite. """
 
-        self.y = 0      
-        # """ number: The Y position of the sprite in local
-        # coordinates. """
+        # Backing values for the properties that affect screen
+        # positions. Documented there.
+        self._x = 0
+        self._y = 0
+        self._parallax = 1
+        self._fixed = False
+        self._cancel_parent_transform = False
+        self._camera = None
+
+        # Backing values for the properties that affect the bounding
+        # box. Documented there.
+        self._width = 0
+        self._height = 0
+        self._a_x = 0
+        self._a_y = 0
+
+        # The spatial index of this sprite's children, if turned on
+        self._spatial_index = None
+
+        # The spatial index this sprite is in (its parent's), and its
+        # place in the drawing order there
+        self._index = None
+        self._order = 0
+
+        # The SpritePool this sprite came from, if any
+        self._pool = None
+        self._in_pool = False
+
+        # See cache_as_surface. _cache_root is the nearest sprite above
+        # this one that caches its drawing, and so has to throw it
+        # away when this one changes.
+        self._cache_as_surface = False
+        self._cache_surface = None
+        self._cache_root = None
+
+        # See z. _layers maps the names of the layers made by
+        # add_layer to the layers, once there are any.
+        self._z = 0
+        self._layers = None
+
+        # How far around the view child sprites stay awake, if
+        # enable_sleeping has been called (see can_sleep)
+        self._activity_margin = None
+
+        # Whether this sprite is asleep, and how many frames it has
+        # been since it was last updated while asleep
+        self._asleep = False
+        self._sleep_count = 0
+
+        self.keep_awake = False
+        """ bool: If True, this sprite is never put to sleep, even if
+        its class :any:`can_sleep`. """
 
         self.prev_x = 0      
         # """ number: The X position of the sprite on the previous
@@ -58,18 +197,6 @@ class Sprite(object):
         # """ number: The Y position of the sprite on the previous
         # frame in local coordinates. """
 
-        self.a_x = 0      
-        # """ number: The X position of the anchor point of the
-        # sprite. If a float, will consider it to be a percentage of
-        # the sprite size. (So 0.5 would be the middle of the sprite.)
-        # """
-
-        self.a_y = 0      
-        # """ number: The Y position of the anchor point of the
-        # sprite. If a float, will consider it to be a percentage of
-        # the sprite size. (So 0.5 would be the middle of the sprite.)
-        # """
-
         self.screen_x = 0      
         # """ int: The X position of the sprite after taking into
         # account transformations by the camera and parent
@@ -80,19 +207,9 @@ class Sprite(object):
         # account transformations by the camera and parent
         # sprites. Should not be changed manually. """
 
-        self.width = 0      
-        # """ number: The width of the visible portion of the
-        # sprite. """
-
-        self.height = 0      
-        # """ number: The height of the visible portion of the
-        # sprite. """
-
         # Public attributes
 
         self.visible = True
-        """ bool: Whether parent sprites will call "draw" on this
-        object. """
 
         self.active = True
         """ bool: Whether parent sprites will call "update" on this
@@ -102,70 +219,75 @@ class Sprite(object):
         """ bool: Whether this object should be assumed to exist
         everywhere by the drawing functions (for example, for a group
         containing objects that spread across a large area) """
-   
-        self.subsprites = []
-        """ list: A list of child sprites inside this one. """
-
-        self.parent = None
-        """ :any:`Sprite`: A reference to this sprite's parent
-        sprite. """
 
         self.scene = None
         """ :any:`Scene`: A reference to the scene object this sprite
         is part of. """
 
+        # See name and tags. _sprite_index is the index of the scene
+        # this sprite is in, if any.
+        self._name = None
+        self._tags = ()
+        self._sprite_index = None
+
         self.app = None
         """ :any:`App`: A reference to the application object this
         sprite is part of. Useful for, say, switching to a different
         scene. """
 
-        self.parallax = 1
-        """ number: What this sprite's local position will be divided
-        by when transformed by camera movements. """
-
-        self.fixed = False
-        """ bool: If True, will prevent sprite from being transformed
-        by camera movements. Useful for, say, HUD items. """
-
-        self.cancel_parent_transform = False
-        """ bool: If True, will prevent sprite from being transformed
-        by *anything,* including parent sprites. """
-
         self.solid = True
         """ bool: Whether collision functions will bother with this
         sprite. """
 
         # Same effects as sgl.blit
-
         self.flip_h = False
-        """ bool: Whether to flip this sprite's surface
-        horizontally. (Does not propagate to child sprites.) """
-
         self.flip_v = False
-        """ bool: Whether to flip this sprite's surface
-        vertically. (Does not propagate to child sprites.) """
-
         self.alpha = 255
-        """ number: How transparent the surface of this sprite should
-        be drawn. (Does not propagate to child sprites.) """
-
         self.angle = 0
-        """ number: The angle to which the surface of this sprite
-        should be rotated. (Does not propagate to child sprites.) """
-
         self.pretty = False
-        """ bool: Whether the rotation effect should be smoothed
-        out. (Does not propagate to child sprites.) """
+        self.rotation_set = None
 
         # Loads the graphic
         if graphic: 
             self.load_surface(graphic)
         else:
             self.surface = None
-            """ SGL Surface: The graphic of this sprite. If `None`,
-            will depend on child sprites or an overriden
-            :any:`Sprite.draw_self` to draw anything to the
-            screen. """
+
+    # What a sprite looks like. Changing any of these throws away the
+    # cached surfaces it is drawn into.
+    visible = visual_property("visible", """ bool: Whether parent
+    sprites will call "draw" on this object. """, own=False)
+
+    flip_h = visual_property("flip_h", """ bool: Whether to flip this
+    sprite's surface horizontally. (Does not propagate to child
+    sprites.) """)
+
+    flip_v = visual_property("flip_v", """ bool: Whether to flip this
+    sprite's surface vertically. (Does not propagate to child
+    sprites.) """)
+
+    alpha = visual_property("alpha", """ number: How transparent the
+    surface of this sprite should be drawn. (Does not propagate to
+    child sprites.) """)
+
+    angle = visual_property("angle", """ number: The angle to which the
+    surface of this sprite should be rotated. (Does not propagate to
+    child sprites.) """)
+
+    pretty = visual_property("pretty", """ bool: Whether the rotation
+    effect should be smoothed out. (Does not propagate to child
+    sprites.) """)
+
+    rotation_set = visual_property("rotation_set", """
+    :any:`sgl.lib.RotationSet.RotationSet`: If set, the sprite is
+    drawn with the closest angle drawn ahead of time in this set,
+    instead of rotating :any:`surface` every time. (Does not propagate
+    to child sprites.) """)
+
+    surface = visual_property("surface", """ SGL Surface: The graphic
+    of this sprite. If `None`, will depend on child sprites or an
+    overriden :any:`Sprite.draw_self` to draw anything to the
+    screen. """)
 
     def add(self, sprite):
         """ Adds a child sprite to this end of this sprite's sprite
@@ -178,11 +300,29 @@ class Sprite(object):
         sprite.parent = self
         sprite.scene = self.scene
         sprite.app = self.app
-        self.subsprites.append(sprite)
+        if self._spatial_index is not None:
+            self._spatial_index.add(sprite)
+        self.insert_subsprite(sprite)
+        sprite.mark_transform_dirty()
+
+        cache_root = self if self._cache_as_surface else self._cache_root
+        if sprite._cache_root is not cache_root:
+            sprite.set_cache_root(cache_root)
+        if sprite._sprite_index is not self._sprite_index:
+            sprite.set_sprite_index(self._sprite_index)
+        self.invalidate()
+        self.mark_tree_dirty()
+
         sprite.on_add()
 
         return sprite
 
+    def insert_subsprite(self, sprite):
+        # """ Internal use only. Puts a new child sprite in
+        # subsprites. Layer overrides this to keep them sorted. """
+
+        self.subsprites.append(sprite)
+
     def on_add(self):
         """ Exectued when a sprite is added. It's recommended to put
         initialization code here instead of ``__init__``, so that the
@@ -192,6 +332,481 @@ class Sprite(object):
 
         pass
 
+    @property
+    def name(self):
+        """ The name of this sprite, or ``None``. Can be anything that
+        can be a dictionary key, like a string. The :any:`Scene` the
+        sprite is in can find it by this name with :any:`Scene.find`.
+        Layers made with :any:`add_layer` are named after the layer. """
+
+        return self._name
+
+    @name.setter
+    def name(self, value):
+        index = self._sprite_index
+        if index is not None and self._name is not None:
+            index.remove_name(self, self._name)
+        self._name = value
+        if index is not None and value is not None:
+            index.add_name(self, value)
+
+    @property
+    def tags(self):
+        """ tuple: The tags of this sprite, which the :any:`Scene` it
+        is in can find it by with :any:`Scene.by_tag`, and
+        :any:`sgl.lib.Collision` can check collisions against. A tag
+        can be anything that can be a dictionary key, like a string.
+        Can be set to any list of tags, or changed one at a time with
+        :any:`add_tag` and :any:`remove_tag`. """
+
+        return self._tags
+
+    @tags.setter
+    def tags(self, value):
+        for tag in self._tags:
+            self.remove_tag(tag)
+        for tag in value:
+            self.add_tag(tag)
+
+    def add_tag(self, tag):
+        """ Gives this sprite a tag, if it doesn't have it already.
+
+        Args:
+            tag: The tag. """
+
+        if tag in self._tags: return
+        self._tags += (tag,)
+        if self._sprite_index is not None:
+            self._sprite_index.add_tag(self, tag)
+
+    def remove_tag(self, tag):
+        """ Takes a tag away from this sprite, if it has it.
+
+        Args:
+            tag: The tag. """
+
+        if tag not in self._tags: return
+        self._tags = tuple(other for other in self._tags if other != tag)
+        if self._sprite_index is not None:
+            self._sprite_index.remove_tag(self, tag)
+
+    def has_tag(self, tag):
+        """ Returns whether this sprite has a tag.
+
+        Args:
+            tag: The tag.
+
+        Returns:
+            bool: Whether it has the tag. """
+
+        return tag in self._tags
+
+    def set_sprite_index(self, index):
+        # """ Internal use only. Moves this sprite and everything
+        # inside it into the index of the scene it was added to (or out
+        # of any index, if index is None). """
+
+        if self._sprite_index is not None:
+            self._sprite_index.remove(self)
+        self._sprite_index = index
+        if index is not None:
+            index.add(self)
+
+        for sprite in self.subsprites:
+            # Sprites only learn which scene they are in when they are
+            # added, so ones added before this one was need telling
+            sprite.scene = self.scene
+            sprite.app = self.app
+            sprite.set_sprite_index(index)
+
+    def mark_tree_dirty(self):
+        """ Tells this sprite, and every sprite above it, that sprites
+        have been added or taken out somewhere inside it. Happens
+        automatically when you use :any:`add` and :any:`kill`, so you
+        only need this if you change :any:`subsprites` yourself.
+
+        Sprites that keep track of everything inside them (like
+        :any:`PerspectiveGroup`) override this to find out when they
+        need to look again. """
+
+        if self.parent is not None:
+            self.parent.mark_tree_dirty()
+
+    @property
+    def z(self):
+        """ number: Where this sprite is drawn compared to the other
+        sprites in the same :any:`Layer`. Sprites with a higher z are
+        drawn in front of sprites with a lower one, and sprites with
+        the same z are drawn in the order they got it. Changing it
+        only moves the sprite in its layer's list, so it costs
+        nothing when drawing.
+
+        Outside of a :any:`Layer`, this does nothing, and sprites are
+        drawn in the order they were added. """
+
+        return self._z
+
+    @z.setter
+    def z(self, value):
+        self._z = value
+        if self.parent is not None:
+            self.parent.restack(self)
+
+    def restack(self, sprite):
+        # """ Internal use only. Called when a child sprite's z changes.
+        # Only matters to Layer. """
+
+        pass
+
+    def bring_to_front(self):
+        """ Moves this sprite in front of every other sprite in its
+        parent. In a :any:`Layer`, this gives it the highest
+        :any:`z` in the layer. """
+
+        if self.parent is not None:
+            self.parent.move_subsprite(self, True)
+
+    def send_to_back(self):
+        """ Moves this sprite behind every other sprite in its
+        parent. In a :any:`Layer`, this gives it the lowest :any:`z`
+        in the layer. """
+
+        if self.parent is not None:
+            self.parent.move_subsprite(self, False)
+
+    def move_subsprite(self, sprite, front):
+        # """ Internal use only. Moves a child sprite to the front or
+        # the back of the drawing order. """
+
+        self.subsprites.remove(sprite)
+        if front:
+            self.subsprites.append(sprite)
+        else:
+            self.subsprites.insert(0, sprite)
+
+        if self._spatial_index is not None:
+            self._spatial_index.move_to_end(sprite, front)
+
+        self.invalidate()
+
+    def add_layer(self, name, z=None, fixed=False):
+        """ Adds a :any:`Layer` to this sprite. Layers are drawn in
+        order of their :any:`z` (and before or after other sprites in
+        this one depending on when they were added), and can be looked
+        up again by name with :any:`get_layer`.
+
+        Args:
+            name: What to call the layer. Can be anything that can be a
+                dictionary key---a string, for example, or a number.
+            z (number): Where to draw the layer compared to other
+                layers. If not given, ``name`` is used if it is a
+                number, and otherwise the layer goes in front of every
+                other layer.
+            fixed (bool): Whether the layer stays put when the camera
+                moves (see :any:`Sprite.fixed`). If True, the layer is
+                also made the size of this sprite, so things like a
+                HUD can be cached with :any:`cache_as_surface`.
+
+        Returns:
+            :any:`Layer`: The new layer. """
+
+        if self._layers is None:
+            self._layers = {}
+        if name in self._layers:
+            raise sgl.ArgumentError("There is already a layer called {}".format(name))
+
+        if z is None:
+            if isinstance(name, (int, float)):
+                z = name
+            elif self._layers:
+                z = max(layer.z for layer in self._layers.values()) + 1
+            else:
+                z = 0
+
+        layer = Layer(name)
+        layer._z = z
+        if fixed:
+            layer.fixed = True
+            layer.size = self.size
+
+        self._layers[name] = layer
+        self.add(layer)
+
+        # A layer already sorts everything by z. Anything else needs
+        # the new layer moved behind the first layer in front of it.
+        if not isinstance(self, Layer):
+            self.subsprites.remove(layer)
+            index = len(self.subsprites)
+            for i, sprite in enumerate(self.subsprites):
+                if isinstance(sprite, Layer) and sprite.z > z:
+                    index = i
+                    break
+            self.subsprites.insert(index, layer)
+
+            if self._spatial_index is not None:
+                self.enable_spatial_index(self._spatial_index.cell_size)
+
+        return layer
+
+    def get_layer(self, name):
+        """ Finds a layer added with :any:`add_layer`.
+
+        Args:
+            name: The name the layer was given.
+
+        Returns:
+            :any:`Layer`: The layer. """
+
+        if self._layers is None or name not in self._layers:
+            raise sgl.ArgumentError("There is no layer called {}".format(name))
+
+        return self._layers[name]
+
+    def remove_layer(self, name):
+        """ Kills a layer added with :any:`add_layer`, along with
+        everything in it.
+
+        Args:
+            name: The name the layer was given. """
+
+        self.get_layer(name).kill()
+        del self._layers[name]
+
+    @property
+    def no_perspective(self):
+        """ bool: If True, and this sprite is inside a
+        :any:`PerspectiveGroup`, the sprites inside this one are drawn
+        with it, in their usual order, instead of being sorted along
+        with everything else. """
+
+        return self in no_perspective_sprites
+
+    @no_perspective.setter
+    def no_perspective(self, value):
+        if value:
+            no_perspective_sprites.add(self)
+        else:
+            no_perspective_sprites.discard(self)
+        self.mark_tree_dirty()
+
+    def on_remove(self):
+        """ Executed when a sprite that has been killed is taken out
+        of its parent, at the end of the parent's :any:`update`. When
+        many sprites are removed at once, this is called on each of
+        them in the order they were in the parent, after all of them
+        have been taken out. :any:`parent` still refers to the old
+        parent while this runs. Child sprites of the removed sprite
+        are not notified. """
+
+        pass
+
+    # Everything that changes where a sprite ends up on the screen
+    # marks it dirty, so screen positions are only recalculated when
+    # they need to be
+    @property
+    def x(self):
+        """ number: The X position of the sprite in local
+        coordinates. """
+
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        if self._cache_root is not None and value != self._x:
+            self._cache_root.invalidate()
+        self._x = value
+        self._collision_bounds = None
+        if not self._transform_dirty: self.mark_transform_dirty()
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def y(self):
+        """ number: The Y position of the sprite in local
+        coordinates. """
+
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        if self._cache_root is not None and value != self._y:
+            self._cache_root.invalidate()
+        self._y = value
+        self._collision_bounds = None
+        if not self._transform_dirty: self.mark_transform_dirty()
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def parallax(self):
+        """ number: What this sprite's local position will be divided
+        by when transformed by camera movements. """
+
+        return self._parallax
+
+    @parallax.setter
+    def parallax(self, value):
+        if self._cache_root is not None and value != self._parallax:
+            self._cache_root.invalidate()
+        self._parallax = value
+        if not self._transform_dirty: self.mark_transform_dirty()
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def fixed(self):
+        """ bool: If True, will prevent sprite from being transformed
+        by camera movements. Useful for, say, HUD items. """
+
+        return self._fixed
+
+    @fixed.setter
+    def fixed(self, value):
+        if self._cache_root is not None and value != self._fixed:
+            self._cache_root.invalidate()
+        self._fixed = value
+        if not self._transform_dirty: self.mark_transform_dirty()
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def cancel_parent_transform(self):
+        """ bool: If True, will prevent sprite from being transformed
+        by *anything,* including parent sprites. """
+
+        return self._cancel_parent_transform
+
+    @cancel_parent_transform.setter
+    def cancel_parent_transform(self, value):
+        if self._cache_root is not None and value != self._cancel_parent_transform:
+            self._cache_root.invalidate()
+        self._cancel_parent_transform = value
+        if not self._transform_dirty: self.mark_transform_dirty()
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def camera(self):
+        """ :any:`Camera`: If set, the child sprites of this sprite
+        will be transformed by this camera. ``None`` by default, except
+        in :any:`Scene` and :any:`Viewport`. """
+
+        return self._camera
+
+    @camera.setter
+    def camera(self, value):
+        if self._camera is not None:
+            self._camera.owners.remove(self)
+        self._camera = value
+        if value is not None:
+            value.owners.append(self)
+        self.mark_camera_dirty()
+
+    # These don't move the sprite on the screen, but do change its
+    # bounding box, so the spatial index needs to know. They also
+    # change what a sprite looks like, and the size of its cached
+    # surface.
+    @property
+    def width(self):
+        """ number: The width of the visible portion of the
+        sprite. """
+
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        if ((self._cache_root is not None or self._cache_surface is not None)
+            and value != self._width):
+            self.invalidate()
+        self._width = value
+        self._collision_bounds = None
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def height(self):
+        """ number: The height of the visible portion of the
+        sprite. """
+
+        return self._height
+
+    @height.setter
+    def height(self, value):
+        if ((self._cache_root is not None or self._cache_surface is not None)
+            and value != self._height):
+            self.invalidate()
+        self._height = value
+        self._collision_bounds = None
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def a_x(self):
+        """ number: The X position of the anchor point of the
+        sprite. If a float, will consider it to be a percentage of
+        the sprite size. (So 0.5 would be the middle of the sprite.) """
+
+        return self._a_x
+
+    @a_x.setter
+    def a_x(self, value):
+        if ((self._cache_root is not None or self._cache_surface is not None)
+            and value != self._a_x):
+            self.invalidate()
+        self._a_x = value
+        self._collision_bounds = None
+        if self._index is not None: self._index.touch(self)
+
+    @property
+    def a_y(self):
+        """ number: The Y position of the anchor point of the
+        sprite. If a float, will consider it to be a percentage of
+        the sprite size. (So 0.5 would be the middle of the sprite.) """
+
+        return self._a_y
+
+    @a_y.setter
+    def a_y(self, value):
+        if ((self._cache_root is not None or self._cache_surface is not None)
+            and value != self._a_y):
+            self.invalidate()
+        self._a_y = value
+        self._collision_bounds = None
+        if self._index is not None: self._index.touch(self)
+
+    def mark_transform_dirty(self):
+        """ Marks the screen position of this sprite and everything
+        inside it as out of date, so it will be recalculated the next
+        time it is needed. Happens automatically when you change the
+        properties that affect it, so you should only need this if you
+        override :any:`world_to_screen` to depend on something else. """
+
+        self._transform_dirty = True
+        for sprite in self.subsprites:
+            # If it's already dirty, so is everything inside it
+            if not sprite._transform_dirty:
+                sprite.mark_transform_dirty()
+
+    def mark_camera_dirty(self):
+        # """ Internal use only. Marks every child sprite that is
+        # transformed by this sprite's camera as dirty. """
+
+        self.invalidate()
+
+        for sprite in self.subsprites:
+            if (not sprite._transform_dirty and not sprite.fixed
+                and not sprite.cancel_parent_transform):
+                sprite.mark_transform_dirty()
+
+    def refresh_transform(self):
+        """ Recalculates :any:`screen_x` and :any:`screen_y` if
+        anything that affects them has changed since they were last
+        calculated. (Parent sprites are refreshed first if they need
+        it.) This happens automatically before sprites are updated and
+        drawn, but you can call it if you need up-to-date screen
+        coordinates in between. """
+
+        if not self._transform_dirty: return
+
+        if self.parent is not None and self.parent._transform_dirty:
+            self.parent.refresh_transform()
+
+        self.screen_x, self.screen_y = self.world_to_screen(self._x, self._y)
+        self._transform_dirty = False
+
     # User facing access
     @property
     def rect(self):
@@ -225,7 +840,11 @@ class Sprite(object):
         """ :any:`sgl.lib.Rect.Rect`: The bounding box that the
         collision functions will use to determine when this sprite is
         overlapping with others. If none is specified, it will assume
-        you want the entire sprite to be collidable. """
+        you want the entire sprite to be collidable.
+
+        If you change the rectangle in place, set it again afterwards
+        (``sprite.collision_rect = sprite.collision_rect``) so that
+        :any:`collision_bounds` is updated. """
 
         if self._collision_rect:
             return self._collision_rect
@@ -238,6 +857,53 @@ class Sprite(object):
             self._collision_rect = value
         else:
             self._collision_rect = Rect(*value)
+        self._collision_bounds = None
+
+    # Collision code runs for every pair of sprites every frame, so
+    # these return plain tuples that are only recalculated when the
+    # sprite moves or changes size
+    @property
+    def collision_bounds(self):
+        """ tuple: Read-only property returning the collision bounding
+        box of this sprite in world coordinates (the same ones as
+        :any:`world_collision_rect`), as a ``(left, top, right,
+        bottom)`` tuple. Faster than :any:`world_collision_rect`,
+        because nothing is allocated unless the sprite has moved or
+        changed size since the last time it was asked for. """
+
+        bounds = self._collision_bounds
+        if bounds is None:
+            a_x, a_y = self._a_x, self._a_y
+            if isinstance(a_x, float): a_x = self._width * a_x
+            if isinstance(a_y, float): a_y = self._height * a_y
+
+            left = self._x - a_x
+            top = self._y - a_y
+            rect = self._collision_rect
+            if rect is None:
+                width, height = self._width, self._height
+            else:
+                left += rect.x
+                top += rect.y
+                width, height = rect.width, rect.height
+
+            bounds = self._collision_bounds = (
+                left, top, left + width, top + height)
+
+        return bounds
+
+    @property
+    def screen_collision_bounds(self):
+        """ tuple: Read-only property returning the collision bounding
+        box of this sprite in screen coordinates (the same ones as
+        :any:`screen_collision_rect`), as a ``(left, top, right,
+        bottom)`` tuple. """
+
+        left, top, right, bottom = self.collision_bounds
+        offset_x = self.screen_x - self._x
+        offset_y = self.screen_y - self._y
+        return (left + offset_x, top + offset_y,
+                right + offset_x, bottom + offset_y)
 
     @property
     def world_collision_rect(self):
@@ -249,15 +915,8 @@ class Sprite(object):
             * Make this property only disregard camera
               transformations, instead of all of them. """
 
-        real_anchor = self.real_anchor
-        rect = Rect()
-
-        rect.x = self.x + self.collision_rect.x - real_anchor[0]
-        rect.y = self.y + self.collision_rect.y - real_anchor[1]
-        rect.width = self.collision_rect.width
-        rect.height = self.collision_rect.height
-        
-        return rect
+        left, top, right, bottom = self.collision_bounds
+        return Rect(left, top, right - left, bottom - top)
 
     @property
     def screen_collision_rect(self):
@@ -265,15 +924,8 @@ class Sprite(object):
         bounding box of this sprite in screen coordinates (after
         parent and camera transformations have been applied). """
 
-        real_anchor = self.real_anchor
-        rect = Rect()
-
-        rect.x = self.screen_x + self.collision_rect.x - real_anchor[0]
-        rect.y = self.screen_y + self.collision_rect.y - real_anchor[1]
-        rect.width = self.collision_rect.width
-        rect.height = self.collision_rect.height
-        
-        return rect
+        left, top, right, bottom = self.screen_collision_bounds
+        return Rect(left, top, right - left, bottom - top)
 
     def is_colliding_with(self, other):
         """ Returns whether this sprite is colliding with another
@@ -304,9 +956,12 @@ class Sprite(object):
             bool: Whether this sprite is colliding with the other
                 one. """
 
-        return self.world_collision_rect.is_in(
-            other.world_collision_rect
-        )
+        left, top, right, bottom = self.collision_bounds
+        other_left, other_top, other_right, other_bottom = (
+            other.collision_bounds)
+
+        return (other_right > left and other_left < right
+                and other_bottom > top and other_top < bottom)
 
     # Internally, positions are stored as x and y values, but you can
     # deal with them as tuples if you want
@@ -419,44 +1074,39 @@ class Sprite(object):
         Returns: 
             tuple: The new coordinates. """
 
-        screen_x = self.x
-        screen_y = self.y
+        screen_x = self._x
+        screen_y = self._y
 
-        if self.parent and not self.cancel_parent_transform:
+        parent = self.parent
+        if parent and not self._cancel_parent_transform:
 
-            if hasattr(self.parent, "camera") and not self.fixed:
+            if parent._camera is not None and not self._fixed:
                 screen_x, screen_y = (
-                    self.parent.camera.world_to_screen(
-                        self.x, self.y, self.parallax)
+                    parent._camera.world_to_screen(
+                        self._x, self._y, self._parallax)
                 )
 
-            screen_x += self.parent.screen_x
-            screen_y += self.parent.screen_y
+            screen_x += parent.screen_x
+            screen_y += parent.screen_y
 
         return screen_x, screen_y
 
     def update_screen_positions(self):
-        """ Screen positions are slightly broken. By default, screen
-        coordinates are only updated in the :any:`Sprite.preupdate`
-        function. This means that sometimes they will update a frame
-        late if you change a parent sprite's position during its
-        :any:`Sprite.update` phase. In addition, even when it does
-        update, sometimes position changes will not propagate through
-        the hierarchy correctly.
-
-        This function can help you work around that by forcing all of
-        this sprite and all of its child sprites to recursively update
-        their screen coordinates to the correct value. If you see
-        child sprites behaving strangely, try adding a call to this in
-        the parent sprite's code.
-
-        I realize this is a bit of a hack, but it is the lesser
-        evil. I tried to update all screen positions on every frame,
-        but that slowed the sprite system down significantly and
-        created new positioning problems that, unlike these, could not
-        be solved with a single extra function call. """
-
-        self.screen_x, self.screen_y = self.world_to_screen(*self.position)
+        """ Forces this sprite and all of its child sprites to
+        recalculate their screen coordinates, whether or not anything
+        has changed.
+
+        Screen coordinates are kept up to date automatically (see
+        :any:`refresh_transform`), so you should not need this unless
+        you have overriden :any:`world_to_screen` to depend on
+        something SGL does not know about. """
+
+        if self.parent is not None and self.parent._transform_dirty:
+            self.parent.refresh_transform()
+
+        self.screen_x, self.screen_y = self.world_to_screen(self._x, self._y)
+        self._transform_dirty = False
+
         for sprite in self.subsprites:
             sprite.update_screen_positions()
 
@@ -465,10 +1115,10 @@ class Sprite(object):
         logic to save the previous position and update the screen
         position. """
 
-        self.prev_x, self.prev_y = self.position
+        self.prev_x, self.prev_y = self._x, self._y
 
         # Because we might need to know in update()
-        self.screen_x, self.screen_y = self.world_to_screen(*self.position)
+        if self._transform_dirty: self.refresh_transform()
 
     def update(self):
         """ Called every frame to update this sprite and its child
@@ -477,14 +1127,168 @@ class Sprite(object):
         though, make sure to call the :any:`Sprite` base classes'
         update function before yours. """
 
-        for index, sprite in enumerate(self.subsprites):
+        if self._activity_margin is not None:
+            self.update_awake()
+            return
+
+        # Killed sprites are only taken out once everything has been
+        # updated, so that removing many at once is not slow, and does
+        # not make the loop skip anything
+        killed = False
+
+        for sprite in self.subsprites:
             sprite.preupdate()
 
             if sprite.active: 
                 sprite.update()
 
             if sprite.to_be_deleted:
-                del self.subsprites[index]
+                killed = True
+
+        if killed:
+            self.remove_killed()
+
+    def update_awake(self):
+        # """ Internal use only. Like the loop in update, but puts
+        # child sprites that can sleep to sleep when they are outside
+        # the activity region, and wakes them up when they come
+        # back. """
+
+        x, y, width, height = self.get_local_view(self._activity_margin)
+
+        # Whatever the spatial index thinks might be near is awake
+        if self._spatial_index is not None:
+            nearby = set(self._spatial_index.query(x, y, width, height))
+        else:
+            nearby = None
+            region = Rect(x, y, width, height)
+
+        killed = False
+
+        for number, sprite in enumerate(self.subsprites):
+            if sprite.can_sleep and not sprite.keep_awake:
+                if nearby is not None:
+                    awake = sprite in nearby
+                else:
+                    awake = (sprite.infinite_space or sprite.fixed
+                             or sprite.cancel_parent_transform
+                             or sprite.parallax != 1
+                             or sprite.rect.is_in(region))
+
+                if awake == sprite._asleep:
+                    sprite._asleep = not awake
+                    sprite._sleep_count = 0
+                    if awake:
+                        sprite.on_wake()
+                    else:
+                        sprite.on_sleep()
+
+            if sprite._asleep:
+                interval = sprite.sleep_interval
+                sprite._sleep_count += 1
+                # Spread sprites out over the interval
+                if not interval or (sprite._sleep_count + number) % interval:
+                    if sprite.to_be_deleted: killed = True
+                    continue
+
+            sprite.preupdate()
+
+            if sprite.active:
+                sprite.update()
+
+            if sprite.to_be_deleted:
+                killed = True
+
+        if killed:
+            self.remove_killed()
+
+    def enable_sleeping(self, margin=256):
+        """ Makes child sprites whose classes :any:`can_sleep` go to
+        sleep when they are more than ``margin`` pixels outside of the
+        screen (or this sprite's view rectangle), so that big levels
+        don't have to update everything in them every frame. If this
+        sprite has a spatial index (see :any:`enable_spatial_index`),
+        it is used to find the sprites that are near the screen.
+
+        Args:
+            margin (number): How far outside the screen sprites are
+                still kept awake. Make it big enough that sprites have
+                woken up and had time to move by the time they are
+                seen. """
+
+        self._activity_margin = margin
+
+    def disable_sleeping(self):
+        """ Turns off :any:`enable_sleeping`, and wakes up every child
+        sprite that is asleep. """
+
+        self._activity_margin = None
+
+        for sprite in self.subsprites:
+            if sprite._asleep:
+                sprite._asleep = False
+                sprite.on_wake()
+
+    @property
+    def asleep(self):
+        """ bool: Read-only property returning whether this sprite has
+        been put to sleep by its parent. (See :any:`can_sleep`.) """
+
+        return self._asleep
+
+    def on_sleep(self):
+        """ Executed when this sprite is put to sleep because it is far
+        from the screen. (See :any:`can_sleep`.) """
+
+        pass
+
+    def on_wake(self):
+        """ Executed when this sprite wakes up again, before it is next
+        updated. """
+
+        pass
+
+    def remove_killed(self):
+        """ Takes every killed child sprite out of this sprite, and
+        calls their :any:`on_remove` functions. Called automatically
+        at the end of :any:`update`, so you only need this if you
+        override :any:`update` without calling the base class
+        version. """
+
+        subsprites = []
+        killed = []
+        for sprite in self.subsprites:
+            if sprite.to_be_deleted:
+                killed.append(sprite)
+            else:
+                subsprites.append(sprite)
+
+        # Some code keeps references to this list, so change it in
+        # place
+        self.subsprites[:] = subsprites
+        self.mark_tree_dirty()
+
+        for sprite in killed:
+            self._detach(sprite)
+
+    def _detach(self, sprite):
+        # """ Internal use only. Everything that has to happen when a
+        # child sprite is taken out, other than taking it out of the
+        # list. """
+
+        if sprite._index is not None:
+            sprite._index.remove(sprite)
+
+        if sprite._cache_root is not None:
+            sprite.set_cache_root(None)
+        if sprite._sprite_index is not None:
+            sprite.set_sprite_index(None)
+        self.invalidate()
+
+        sprite.on_remove()
+
+        if sprite._pool is not None:
+            sprite._pool.release(sprite)
 
     def draw(self):
         """ Handle drawing this sprite and its children. Should not be
@@ -492,12 +1296,14 @@ class Sprite(object):
         break drawing child sprites. Instead, override
         :any:`Sprite.draw_self`. """
 
-        if not self.visible: return
+        if not self._visible: return
 
         # Because update might have changed things, and we want to
         # draw it in the right place
         # self.screen_x, self.screen_y = self.world_to_screen(*self.position)
 
+        if self._cache_as_surface and self.draw_cached(): return
+
         self.draw_self()
         self.draw_children()
 
@@ -506,8 +1312,15 @@ class Sprite(object):
         sprite drawing works, override this function."""
 
         if self.surface:
+            if (self._rotation_set is not None
+                and not (self._flip_h or self._flip_v)
+                and self._rotation_set.draw(
+                    self.surface, self.screen_x, self.screen_y,
+                    self._angle, alpha=self._alpha)):
+                return
+
             if (not (self.flip_h or self.flip_v) 
-                and self.alpha == 255 or self.alpha == 1.0
+                and (self.alpha == 255 or self.alpha == 1.0)
                 and self.angle == 0):
                 a_x, a_y = self.real_anchor
                 sgl.blitf(
@@ -528,16 +1341,19 @@ class Sprite(object):
         """ Loops through and draws child sprites. Ideally, should not
         be called manually.
 
-        Currently, this updates each sprite's screen position one more
-        time, to make them slightly more predictable. """
+        Any sprites that moved after they were updated get their
+        screen positions refreshed first, so they are drawn in the
+        right place. """
 
         if self.subsprites == []: return
-        # Most accurate way, but slower
-        # Use this if things get stupid again
-        # self.update_screen_positions()
 
-        for sprite in self.subsprites:
-            sprite.screen_x, sprite.screen_y = sprite.world_to_screen(*sprite.position)
+        if self._spatial_index is not None:
+            subsprites = self.get_visible_subsprites()
+        else:
+            subsprites = self.subsprites
+
+        for sprite in subsprites:
+            if sprite._transform_dirty: sprite.refresh_transform()
 
             if self.view_rect and not sprite.infinite_space:
                 if (sprite.screen_rect.is_in(self.view_rect)):
@@ -545,6 +1361,188 @@ class Sprite(object):
             else:
                 sprite.draw()
 
+    def enable_spatial_index(self, cell_size=256):
+        """ Makes this sprite keep track of where its child sprites
+        are, so that it only needs to look at the ones near the screen
+        when drawing, instead of all of them. Worth it for groups and
+        scenes with thousands of sprites spread out over a large area,
+        most of which are off the screen at any given time. (See
+        :any:`sgl.lib.SpatialGrid`.)
+
+        Child sprites with a :any:`parallax` value, or that are
+        :any:`fixed` or in :any:`infinite_space`, are always
+        drawn. The index notices when those properties change, except
+        for :any:`infinite_space`---if you change that on a sprite
+        that has already been added, move it (even by 0 pixels) to let
+        the index know.
+
+        Args:
+            cell_size (int): The size of each cell of the index. See
+                :any:`sgl.lib.SpatialGrid.SpatialGrid`. """
+
+        self.disable_spatial_index()
+
+        self._spatial_index = SpatialGrid(cell_size)
+        for sprite in self.subsprites:
+            self._spatial_index.add(sprite)
+
+    def disable_spatial_index(self):
+        """ Turns off the spatial index turned on by
+        :any:`enable_spatial_index`. """
+
+        if self._spatial_index is not None:
+            self._spatial_index.clear()
+            self._spatial_index = None
+
+    def get_view_rect(self):
+        # """ Internal use only. Returns the nearest view rectangle,
+        # in screen coordinates, that this sprite's children are
+        # drawn in. """
+
+        sprite = self
+        while sprite is not None:
+            if sprite.view_rect is not None:
+                return sprite.view_rect
+            sprite = sprite.parent
+
+        return Rect(0, 0, sgl.get_width(), sgl.get_height())
+
+    def get_local_view(self, margin=0):
+        # """ Internal use only. Returns the view rectangle, grown by
+        # margin on every side, in this sprite's local coordinates, as
+        # an (x, y, width, height) tuple. """
+
+        if self._transform_dirty: self.refresh_transform()
+
+        view_rect = self.get_view_rect()
+
+        # Convert the screen rectangle into local coordinates
+        x = view_rect.x - self.screen_x - margin
+        y = view_rect.y - self.screen_y - margin
+        if self._camera is not None:
+            x += self._camera.x
+            y += self._camera.y
+
+        return x, y, view_rect.width + margin*2, view_rect.height + margin*2
+
+    def get_visible_subsprites(self):
+        # """ Internal use only. Asks the spatial index for the child
+        # sprites that might be inside the view rectangle. """
+
+        return self._spatial_index.query(*self.get_local_view())
+
+    @property
+    def cache_as_surface(self):
+        """ bool: If True, this sprite and everything inside it are
+        drawn once onto a surface, and that surface is drawn from
+        then on, instead of drawing every sprite inside every
+        frame. Worth turning on for things that are made of many
+        sprites but rarely change, like HUD frames, menus laid out
+        with :any:`sgl.lib.Layout.FlowLayout`, and background
+        decorations.
+
+        The surface is thrown away and drawn again whenever anything
+        inside changes: when sprites are added or removed, or when
+        they move, change size, change graphics, or change any of the
+        effects (like :any:`alpha`). Moving this sprite itself is
+        free. If you change something SGL can't see (for example,
+        something your own :any:`draw_self` depends on), call
+        :any:`invalidate`.
+
+        Only what is inside this sprite's bounding box is kept, so
+        make sure :any:`size` covers everything inside. Sprites inside
+        are updated as usual. If the backend can't draw something
+        inside onto a surface (pygame can't draw translucent graphics
+        onto surfaces with an alpha channel), this is turned off
+        again, and everything is drawn normally. """
+
+        return self._cache_as_surface
+
+    @cache_as_surface.setter
+    def cache_as_surface(self, value):
+        if self._cache_root is not None and value != self._cache_as_surface:
+            self._cache_root.invalidate()
+
+        self._cache_as_surface = value
+        self._cache_surface = None
+
+        cache_root = self if value else self._cache_root
+        for sprite in self.subsprites:
+            sprite.set_cache_root(cache_root)
+
+    def invalidate(self):
+        """ Throws away the surface this sprite has been drawn onto, if
+        :any:`cache_as_surface` is on, along with the surfaces of any
+        sprites above it that cache their drawing, so that they will
+        all be drawn again. Happens automatically when anything SGL
+        knows about changes. """
+
+        self._cache_surface = None
+        if self._cache_root is not None:
+            self._cache_root.invalidate()
+
+    def set_cache_root(self, cache_root):
+        # """ Internal use only. Tells this sprite and everything inside
+        # it which sprite they are cached by. """
+
+        self._cache_root = cache_root
+
+        if self._cache_as_surface: cache_root = self
+        for sprite in self.subsprites:
+            sprite.set_cache_root(cache_root)
+
+    def draw_cached(self):
+        # """ Internal use only. Draws the cached surface of this
+        # sprite, making it first if needed. Returns False if it
+        # couldn't be made. """
+
+        if self._cache_surface is None and not self.render_cache():
+            return False
+
+        a_x, a_y = self.real_anchor
+        sgl.blitf(self._cache_surface, self.screen_x - a_x, self.screen_y - a_y)
+        return True
+
+    def render_cache(self):
+        # """ Internal use only. Draws this sprite and everything
+        # inside it onto a new cached surface. """
+
+        a_x, a_y = self.real_anchor
+        width = max(int(math.ceil(self.width)), 0)
+        height = max(int(math.ceil(self.height)), 0)
+        surface = sgl.make_surface(width, height)
+
+        # Draw everything as if the top left corner of the bounding
+        # box was the top left corner of the screen
+        screen_x, screen_y = self.screen_x, self.screen_y
+        view_rect = self.view_rect
+        self.screen_x, self.screen_y = a_x, a_y
+        self.view_rect = Rect(0, 0, width, height)
+        self.mark_children_dirty()
+
+        try:
+            with sgl.with_buffer(surface):
+                self.draw_self()
+                self.draw_children()
+        except sgl.BackendError:
+            self.cache_as_surface = False
+            return False
+        finally:
+            self.screen_x, self.screen_y = screen_x, screen_y
+            self.view_rect = view_rect
+            self.mark_children_dirty()
+
+        self._cache_surface = surface
+        return True
+
+    def mark_children_dirty(self):
+        # """ Internal use only. Marks every child sprite as dirty,
+        # without touching this one. """
+
+        for sprite in self.subsprites:
+            if not sprite._transform_dirty:
+                sprite.mark_transform_dirty()
+
     # Load surface and sets size accordingly.
     def load_surface(self, surface):
         """ Sets the graphic for this sprite, and makes the size match
@@ -587,27 +1585,279 @@ class Sprite(object):
         parent sprite. If it has no parent sprite, it will be placed
         in the center of the screen. """
 
-        self.anchor = 0.5, 0.5
-        
-        if self.parent:
-            self.position = self.parent.width/2, self.parent.height/2
-        else:
-            self.position = sgl.get_width()/2, sgl.get_height()/2
+        self.anchor = 0.5, 0.5
+        
+        if self.parent:
+            self.position = self.parent.width/2, self.parent.height/2
+        else:
+            self.position = sgl.get_width()/2, sgl.get_height()/2
+
+    def centre(self):
+        """ Like :any:`center`, but British. """
+
+        # In honor of wxWidgets
+        self.center()
+
+    def reset(self):
+        """ Called by :any:`SpritePool.acquire` when this sprite is
+        reused, to put it back into a fresh state. The base version
+        resets the position, effects and visibility of the sprite;
+        override it to reset your own attributes too (and call the
+        base version). Any arguments passed to
+        :any:`SpritePool.acquire` are passed on to this. """
+
+        self.position = 0, 0
+        self.prev_x, self.prev_y = 0, 0
+
+        self.visible = True
+        self.active = True
+        self.solid = True
+
+        self.flip_h = False
+        self.flip_v = False
+        self.alpha = 255
+        self.angle = 0
+
+    def kill(self):
+        """ Marks this sprite to be deleted. It will be taken out of
+        its parent at the end of the parent's next :any:`update` (which
+        may be this frame, if the parent has not finished updating
+        yet), and :any:`on_remove` will be called. """
+
+        self.to_be_deleted = True
+
+class AnimationTrack(object):
+    """ One animation from :any:`AnimatedSprite.animations`, compiled
+    into flat lists with one item per frame shown, so that playing it
+    doesn't have to look at the original definition again. Made by
+    :any:`compile_animation`. """
+
+    __slots__ = ("frames", "lengths", "callbacks", "end_callbacks",
+                 "fixed_length", "default_count")
+
+    def __init__(self):
+        self.frames = []
+        """ list: The index (in :any:`AnimatedSprite.frames`) of each
+        frame. """
+
+        self.lengths = []
+        """ list: How long each frame is shown, or None if it uses the
+        sprite's :any:`AnimatedSprite.anim_def_frame_length`. """
+
+        self.callbacks = []
+        """ list: A tuple of callbacks to call when each frame is
+        reached, or None. """
+
+        self.end_callbacks = ()
+        """ tuple: Callbacks to call when the animation reaches its end,
+        before it loops. """
+
+        # The total length is fixed_length, plus default_count frames
+        # of the sprite's default length
+        self.fixed_length = 0
+        self.default_count = 0
+
+def compile_animation(definition):
+    """ Turns an animation definition, in the format described in
+    :any:`AnimatedSprite.animations`, into an :any:`AnimationTrack`.
+    :any:`AnimatedSprite` does this automatically, once for each
+    animation, the first time it is played.
+
+    Args:
+        definition (list): The animation definition.
+
+    Returns:
+        :any:`AnimationTrack`: The compiled animation. """
+
+    track = AnimationTrack()
+
+    # Callbacks from items without a frame are called when the next
+    # frame is reached
+    pending = []
+    default_length = None
+
+    for item in definition:
+        if isinstance(item, dict):
+            if "frame" not in item:
+                if "default_length" in item:
+                    default_length = item["default_length"]
+                if "callback" in item:
+                    pending.append(item["callback"])
+                continue
+
+            frame = item["frame"]
+            length = item.get("length", item.get("time", default_length))
+            if "callback" in item:
+                pending.append(item["callback"])
+        else:
+            frame = item
+            length = default_length
+
+        track.frames.append(frame)
+        track.lengths.append(length)
+        track.callbacks.append(tuple(pending) or None)
+        pending = []
+
+        if length is None:
+            track.default_count += 1
+        else:
+            track.fixed_length += length
+
+    track.end_callbacks = tuple(pending)
+    return track
+
+# Compiled tracks, keyed by the id of the animations dictionary they
+# came from. The dictionary is kept too, so the id can't be reused.
+compiled_animations = {}
+
+def get_track(animations, name):
+    # """ Internal use only. Returns the compiled version of one
+    # animation in an animations dictionary, compiling it if this is
+    # the first time it's been asked for. """
+
+    entry = compiled_animations.get(id(animations))
+    if entry is None:
+        entry = compiled_animations[id(animations)] = (animations, {})
+
+    tracks = entry[1]
+    track = tracks.get(name)
+    if track is None:
+        track = tracks[name] = compile_animation(animations[name])
+    return track
+
+class AnimationClock(object):
+    """ Advances every playing :any:`AnimatedSprite` in a :any:`Scene`
+    in one loop, once per update. Every scene has one of these (see
+    :any:`Scene.animation_clock`), which it ticks at the start of its
+    update, so sprites only animate while they are in a scene that is
+    being updated. Sprites that are inactive (see
+    :any:`Sprite.active`), asleep, or inside a sprite that is, are
+    skipped. """
+
+    def __init__(self):
+        self.playing = Bucket()
+        # """ Bucket: The sprites being animated. """
+
+        self.phases = {}
+        # """ dict: The shared phases of this clock, keyed by which
+        # animation they play and how fast. See get_shared_phase. """
+
+    def __getstate__(self):
+        # Shared phases are made again by the sprites following them
+        # when a snapshot is restored
+        return {"sprites": self.playing.sprites}
+
+    def __setstate__(self, state):
+        self.__init__()
+        for sprite in state["sprites"]:
+            self.playing.add(sprite)
+
+    def add(self, sprite):
+        # """ Internal use only. Called by AnimatedSprite.play. Does
+        # nothing if the sprite is already being animated. """
+
+        self.playing.add(sprite)
+
+    def remove(self, sprite):
+        # """ Internal use only. """
+
+        self.playing.remove(sprite)
+
+    def tick(self):
+        """ Advances every playing animation by :any:`sgl.get_dt`.
+        Called once by every :any:`Scene.update`, whether or not a
+        frame has been shown since the last one, so that loops that
+        update more than once per frame (or never show frames, like
+        :py:func:`sgl.make_movie`) animate at the same pace as they
+        update. """
+
+        self.advance(sgl.get_dt())
+
+    def advance(self, dt):
+        """ Advances every playing animation by a given amount of time,
+        whether or not it has already been done this frame.
 
-    def centre(self):
-        """ Like :any:`center`, but British. """
+        Args:
+            dt (number): The amount of time, in seconds. """
 
-        # In honor of wxWidgets
-        self.center()
+        for phase in list(self.phases.values()):
+            time = phase.anim_time + dt
+            if time < phase.anim_next_frame_time:
+                phase.anim_time = time
+            else:
+                phase.anim_advance(time)
+
+        # Whether each parent, and everything above it, is updated
+        updated = {None: True}
+
+        # Callbacks can play, pause and kill sprites, so loop over a
+        # copy
+        for sprite in list(self.playing.sprites):
+            if (not sprite.anim_playing or not sprite.active
+                or sprite._asleep or sprite.to_be_deleted):
+                continue
+
+            parent = sprite.parent
+            running = updated.get(parent)
+            if running is None:
+                running = self.is_updated(parent, updated)
+            if not running: continue
+
+            time = sprite.anim_time + dt
+            if time < sprite.anim_next_frame_time:
+                sprite.anim_time = time
+            else:
+                sprite.anim_advance(time)
 
-    def kill(self):
-        """ Marks this sprite to be deleted on the next frame. """
+    def is_updated(self, sprite, updated):
+        # """ Internal use only. Returns whether a sprite and every
+        # sprite above it are active and awake, remembering the answer
+        # for each of them in ``updated``. """
 
-        self.to_be_deleted = True
+        result = updated.get(sprite)
+        if result is None:
+            result = updated[sprite] = (
+                sprite.active and not sprite._asleep
+                and not sprite.to_be_deleted
+                and self.is_updated(sprite.parent, updated))
+        return result
+
+def get_animation_clock(sprite):
+    # """ Internal use only. Returns the clock of the scene a sprite
+    # is in, or None if it isn't in one. """
+
+    if sprite._sprite_index is None: return None
+    return sprite.scene.animation_clock
 
 class AnimatedSprite(Sprite):
     """ A subclass of :any:`Sprite` that provides extra functions
-    useful for managing frame-based animations. """
+    useful for managing frame-based animations.
+
+    Animations are compiled once (see :any:`compile_animation`), and
+    every playing animated sprite in a scene is advanced in a single
+    loop by the scene's :any:`Scene.animation_clock`, instead of each
+    sprite doing it in its own :any:`preupdate`. A sprite only
+    animates while it is in a scene; if it is playing when it is
+    added, it picks up where it left off. """
+
+    # frames and animations are meant to be set on the class, so they
+    # are not slots. Subclasses have a __dict__, so they can still
+    # override them per instance.
+    __slots__ = (
+        "anim_time", "anim_next_frame_time", "anim_index", "anim_name",
+        "anim_def_frame_length", "anim_playing", "anim_track",
+        "anim_clock", "anim_phase",
+    )
+
+    share_phase = False
+    """ bool: If True, every sprite of this class that is playing the
+    same animation (at the same :any:`anim_def_frame_length`) shows
+    the same frame at the same time, like the water in a tilemap.
+    Instead of each sprite keeping track of its own animation, one
+    :any:`SharedPhase` does it for all of them, so thousands of them
+    cost about as much as one. Animation callbacks are not called in
+    this mode, since no single sprite is the one reaching the
+    frame. """
     
     frames = []
     """ list: A list of SGL Surfaces that will provide all the
@@ -671,9 +1921,10 @@ class AnimatedSprite(Sprite):
 
     * If a ``"frame"`` item is specified, this will determine which
       frame index to show at that point.
-    * If a ``"time"`` item is specified, this will make just that
-      frame be shown for ``"time"`` amount of time. (A ``"frame"``
-      item must be specified for this to work.)
+    * If a ``"length"`` item is specified, this will make just that
+      frame be shown for ``"length"`` amount of time. (A ``"frame"``
+      item must be specified for this to work. ``"time"`` works
+      too.)
     * If a ``"callback"`` item is specified, this class will call the
       function specified in the value as soon as this frame is
       reached. This value can either be a string, containing the name of
@@ -730,6 +1981,9 @@ class AnimatedSprite(Sprite):
         self.anim_next_frame_time = 0
         self.anim_index = 0
         self.anim_name = ""
+        self.anim_track = None
+        self.anim_clock = None
+        self.anim_phase = None
 
         self.anim_def_frame_length = 1.0/15.0
         """ number: Specifies (in seconds) the amount of time each
@@ -738,21 +1992,19 @@ class AnimatedSprite(Sprite):
         frame for a 15th of a second---in other words, it will play
         your animations at 15 frames per second. """
 
-        self.anim_frame_length = 0
-
         self.anim_playing = False
 
     @property
     def anim_current_frame(self):
-        # """ Internal use only. Returns current int or dict for frame. """
+        # """ Internal use only. Returns the index of the current frame. """
 
-        return self.animations[self.animation][self.anim_index]
+        return self.anim_track.frames[self.anim_index]
 
     @property
     def anim_length(self):
-        # """ Read-only property returning the amount of items in the current animation. """
+        # """ Read-only property returning the amount of frames in the current animation. """
 
-        return len(self.animations[self.animation])
+        return len(self.anim_track.frames)
 
     @property
     def animation(self):
@@ -771,8 +2023,12 @@ class AnimatedSprite(Sprite):
     def animation(self, value):
         self.anim_reset()
         self.anim_name = value
+        self.anim_track = get_track(self.animations, value)
         self.anim_update_frame()
 
+        if self.anim_phase is not None:
+            self.anim_join_phase()
+
     @property
     def playing(self):
         """ bool: Returns whether this sprite is currently playing
@@ -793,11 +2049,22 @@ class AnimatedSprite(Sprite):
         
         self.anim_playing = True
 
+        # Started once this is added to a scene
+        if self.anim_clock is None: return
+
+        if self.share_phase:
+            self.anim_join_phase()
+        else:
+            self.anim_clock.add(self)
+
     def pause(self):
         """ Pauses playment that the current point. You can call
         :any:`play` to resume playment from this point. """
 
         self.anim_playing = False
+        self.anim_leave_phase()
+        if self.anim_clock is not None:
+            self.anim_clock.remove(self)
 
     def stop(self):
         """ Stops playment. This is the same as calling
@@ -805,7 +2072,52 @@ class AnimatedSprite(Sprite):
         the first frame before stopping. """
 
         self.anim_reset()
-        self.anim_playing = False
+        self.pause()
+
+    def anim_join_phase(self):
+        # """ Internal use only. Starts following the shared phase of
+        # the current animation. """
+
+        if self.anim_clock is None: return
+
+        phase = get_shared_phase(self.anim_clock, self.frames,
+                                 self.animations, self.anim_name,
+                                 self.anim_def_frame_length)
+        if phase is self.anim_phase: return
+
+        self.anim_leave_phase()
+        self.anim_phase = phase
+        phase.followers.add(self)
+        self.surface = phase.surface
+
+    def anim_leave_phase(self):
+        # """ Internal use only. """
+
+        phase = self.anim_phase
+        if phase is not None:
+            self.anim_phase = None
+            phase.followers.discard(self)
+            if not phase.followers:
+                phase.release()
+
+    def set_sprite_index(self, index):
+        super(AnimatedSprite, self).set_sprite_index(index)
+        self.set_animation_clock(get_animation_clock(self))
+
+    def set_animation_clock(self, clock):
+        # """ Internal use only. Moves this sprite to the clock of the
+        # scene it is now in (or out of any clock, if clock is None),
+        # carrying on playing if it was. """
+
+        if clock is self.anim_clock: return
+
+        self.anim_leave_phase()
+        if self.anim_clock is not None:
+            self.anim_clock.remove(self)
+
+        self.anim_clock = clock
+        if self.anim_playing:
+            self.play()
 
     def do_callback(self, value):
         # """ Internal function. Calls the function specified in
@@ -820,67 +2132,242 @@ class AnimatedSprite(Sprite):
             getattr(self, value[0])(*value[1:])
 
     def anim_update_frame(self):
-        # """ Internal use only. When the current frame's time has
-        # expired, this will move to the next frame and execute any
-        # special commands on the way. """
-
-        if self.anim_index >= self.anim_length: return
+        # """ Internal use only. Shows the current frame, and calls any
+        # callbacks that go with it. """
 
-        self.anim_time = 0
-
-        frame = self.anim_current_frame
-        complex_frame = isinstance(frame, dict)
-        length = self.anim_frame_length or self.anim_def_frame_length
+        track = self.anim_track
+        index = self.anim_index
+        if track is None or index >= len(track.frames): return
 
-        if complex_frame:
-            if "frame" not in frame:
-                if "default_length" in frame:
-                    self.anim_frame_length = frame["default_length"]
+        self.surface = self.frames[track.frames[index]]
 
-                if "callback" in frame:
-                    self.do_callback(frame["callback"])
-
-                self.anim_index += 1
-                self.anim_update_frame()
-                return
+        length = track.lengths[index]
+        if length is None:
+            length = self.anim_def_frame_length
+        self.anim_next_frame_time = length
 
-            self.surface = self.frames[frame["frame"]]
-            self.anim_next_frame_time = frame.get("length", length)
+        callbacks = track.callbacks[index]
+        if callbacks:
+            for callback in callbacks:
+                self.do_callback(callback)
 
-            if "callback" in frame:
-                self.do_callback(frame["callback"])
+    def anim_step(self, dt):
+        # """ Internal use only. Advances the animation by ``dt``
+        # seconds, for sprites that aren't played by a clock. The
+        # clock does the same thing without the method call. """
 
+        time = self.anim_time + dt
+        if time < self.anim_next_frame_time:
+            self.anim_time = time
         else:
-            self.surface = self.frames[frame]
-            self.anim_next_frame_time = length
-       
-    def preupdate(self):
-        """ Overridden to handle animation logic, in addition to what
-        :any:`Sprite.preupdate` doas. 
+            self.anim_advance(time)
 
-        Todo:
-            * It might be useful to be able to restrict how many times
-              an animation can loop, so you can, say, only play an
-              animation once. Currently you can simulate this
-              callbacks, but that's a little cumbersome.
-            * Maybe make this attempt to make up for lost time, like
-              :any:`sgl.lib.Time` does. """
+    def anim_advance(self, time):
+        # """ Internal use only. Called by the animation clock when at
+        # least one frame's worth of time has passed. Moves forward as
+        # many frames as ``time`` covers, so animations keep up even
+        # when the game is running slowly. """
 
-        super(AnimatedSprite, self).preupdate()
+        track = self.anim_track
+        if track is None or not track.frames: return
 
-        if not self.anim_playing: return
-        
-        self.anim_time += sgl.get_dt()
+        # Skip whole loops at once (without calling their callbacks),
+        # in case a lot of time has passed
+        total = (track.fixed_length
+                 + track.default_count * self.anim_def_frame_length)
+        if total > 0:
+            time %= total
+
+        while time >= self.anim_next_frame_time:
+            time -= self.anim_next_frame_time
 
-        if self.anim_time >= self.anim_next_frame_time:
             self.anim_index += 1
-            if self.anim_index >= self.anim_length:
+            if self.anim_index >= len(self.anim_track.frames):
                 self.anim_index = 0
-                # loop restricting logic here?
+                for callback in self.anim_track.end_callbacks:
+                    self.do_callback(callback)
 
             self.anim_update_frame()
-        # maybe awkward that this does not attempt to make up for
-        # lost time like sgl.lib.Time does?
+
+            # A callback might have paused or changed the animation.
+            # Frames that all take no time could also loop forever.
+            if (not self.anim_playing or self.anim_track is not track
+                or total <= 0):
+                time = 0
+                break
+
+        self.anim_time = time
+
+class SharedPhase(AnimatedSprite):
+    """ Plays one animation on behalf of every sprite following it, and
+    hands them each new frame. Made automatically for
+    :any:`AnimatedSprite` classes with :any:`AnimatedSprite.share_phase`
+    turned on. A shared phase is never added to a scene; it is only
+    advanced by the :any:`AnimationClock` of the scene its followers
+    are in. """
+
+    def __init__(self, clock, key, frames, animations, name, frame_length):
+        super(SharedPhase, self).__init__()
+
+        self.followers = set()
+        """ set: The sprites showing this animation. """
+
+        self.clock = clock
+        self.key = key
+
+        self.frames = frames
+        self.animations = animations
+        self.anim_def_frame_length = frame_length
+        self.animation = name
+        self.play()
+
+    def do_callback(self, value):
+        # Callbacks are meant for the sprites following this, and
+        # which one should get them isn't clear
+        pass
+
+    def release(self):
+        # """ Internal use only. Called when the last follower leaves,
+        # so that the clock stops playing this. """
+
+        if self.clock.phases.get(self.key) is self:
+            del self.clock.phases[self.key]
+
+    def anim_update_frame(self):
+        super(SharedPhase, self).anim_update_frame()
+
+        # Followers leave when they are taken out of the scene, so
+        # every one of them is still showing this
+        surface = self.surface
+        for sprite in self.followers:
+            sprite.surface = surface
+
+def get_shared_phase(clock, frames, animations, name, frame_length):
+    # """ Internal use only. Returns a clock's shared phase for an
+    # animation, making it if needed. """
+
+    key = (id(frames), id(animations), name, frame_length)
+    phase = clock.phases.get(key)
+    if phase is None:
+        phase = clock.phases[key] = SharedPhase(
+            clock, key, frames, animations, name, frame_length)
+    return phase
+
+class SpritePool(object):
+    """ Keeps a stock of sprites of one class around to be reused,
+    instead of making new ones and throwing them away. Useful for
+    things like bullets and particles, which are created and destroyed
+    in large numbers, and would otherwise make Python's garbage
+    collector work hard at the worst possible times.
+
+    Sprites are taken from the pool with :any:`acquire`. When they
+    are killed (with :any:`Sprite.kill`), they are automatically put
+    back once their parent removes them. For example::
+
+        bullets = SpritePool(Bullet, 200)
+
+        # In update
+        bullet = bullets.acquire(self.scene, self.x, self.y)
+
+    ...where ``Bullet`` overrides :any:`Sprite.reset` to take a
+    position. """
+
+    def __init__(self, sprite_class, size=0):
+        """
+        Args:
+            sprite_class (class): The class of sprite to make. It (or
+                any function) will be called with no arguments to make
+                new sprites.
+            size (int): How many sprites to make right away. More
+                will be made if the pool runs out. """
+
+        self.sprite_class = sprite_class
+
+        self.free = []
+        # """ list: The sprites waiting to be reused. """
+
+        self.size = 0
+        """ int: How many sprites this pool has made in total. """
+
+        self.in_use = 0
+        """ int: How many sprites are currently out of the pool. """
+
+        self.high_water = 0
+        """ int: The most sprites that have been out of the pool at
+        once. If this is higher than the size you gave the pool, you
+        may want to make the pool bigger. """
+
+        for i in range(size):
+            self.free.append(self.make())
+
+    def make(self):
+        # """ Internal use only. Makes a new sprite for the pool. """
+
+        sprite = self.sprite_class()
+        sprite._pool = self
+        sprite._in_pool = True
+        self.size += 1
+        return sprite
+
+    def acquire(self, parent=None, *args, **kwargs):
+        """ Takes a sprite out of the pool (or makes a new one, if the
+        pool is empty), and resets it with :any:`Sprite.reset`.
+
+        Args:
+            parent (:any:`Sprite`): If given, the sprite will be added
+                to this sprite.
+            *args: Passed on to :any:`Sprite.reset`.
+            **kwargs: Passed on to :any:`Sprite.reset`.
+
+        Returns:
+            :any:`Sprite`: The sprite. """
+
+        if self.free:
+            sprite = self.free.pop()
+        else:
+            sprite = self.make()
+
+        sprite._in_pool = False
+        sprite.to_be_deleted = False
+        sprite.reset(*args, **kwargs)
+
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+
+        if parent is not None:
+            parent.add(sprite)
+
+        return sprite
+
+    def release(self, sprite):
+        """ Puts a sprite back into the pool. This happens
+        automatically when a sprite from this pool is killed and
+        removed from its parent, so you only need to call this for
+        sprites you never added to anything.
+
+        Args:
+            sprite (:any:`Sprite`): A sprite from this pool. """
+
+        if sprite._in_pool: return
+
+        sprite._in_pool = True
+        sprite.parent = None
+        self.in_use -= 1
+        self.free.append(sprite)
+
+    @property
+    def stats(self):
+        """ dict: Read-only property returning the ``size``,
+        ``free``, ``in_use`` and ``high_water`` counts of this
+        pool. """
+
+        return {
+            "size": self.size,
+            "free": len(self.free),
+            "in_use": self.in_use,
+            "high_water": self.high_water,
+        }
 
 # Might be an object later
 def Spritesheet(surface, frame_width=0, frame_height=0):
@@ -937,38 +2424,48 @@ class ShapeSprite(Sprite):
 
     This will often be faster than drawing the equivalent surface. """
 
+    __slots__ = (
+        "_no_stroke", "_stroke_color", "_stroke_weight", "_no_fill",
+        "_fill_color",
+    )
+
     def __init__(self):
         super(ShapeSprite, self).__init__()
         
         self.no_stroke = False
-        """ bool: Whether strokes should be turned off when drawing the
-        shape. (See :any:`sgl.no_stroke`.) """
-
         self.stroke_color = 1.0
-        """ number or tuple: What color the strokes of the shape
-        should be. (See :any:`sgl.set_stroke`.)
+        self.stroke_weight = 1
+        self.no_fill = False
+        self.fill_color = 0.75
 
-        This class will attempt to mix this color value with the
-        :any:`alpha` value, so you can accurately set the
-        transparency of sprites with this property. Keep in mind that
-        under Pygame this is quite slow. """
+    no_stroke = visual_property("no_stroke", """ bool: Whether strokes
+    should be turned off when drawing the shape. (See
+    :any:`sgl.no_stroke`.) """)
 
-        self.stroke_weight = 1
-        """ number: How thick the strokes of the shape should be. (See
-        :any:`sgl.set_stroke_weight`.) """
+    stroke_color = visual_property("stroke_color", """ number or tuple:
+    What color the strokes of the shape should be. (See
+    :any:`sgl.set_stroke`.)
 
-        self.no_fill = False
-        """ bool: Whether fills should be turned off when drawing the
-        shape. (See :any:`sgl.no_fill`.) """
+    This class will attempt to mix this color value with the
+    :any:`alpha` value, so you can accurately set the transparency of
+    sprites with this property. Keep in mind that under Pygame this is
+    quite slow. """)
 
-        self.fill_color = 0.75
-        """ number or tuple: What color the fill of the shape
-        should be. (See :any:`sgl.set_fill`.)
+    stroke_weight = visual_property("stroke_weight", """ number: How
+    thick the strokes of the shape should be. (See
+    :any:`sgl.set_stroke_weight`.) """)
+
+    no_fill = visual_property("no_fill", """ bool: Whether fills should
+    be turned off when drawing the shape. (See :any:`sgl.no_fill`.) """)
 
-        This class will attempt to mix this color value with the
-        :any:`alpha` value, so you can accurately set the
-        transparency of sprites with this property. Keep in mind that
-        under Pygame this is quite slow. """
+    fill_color = visual_property("fill_color", """ number or tuple:
+    What color the fill of the shape should be. (See
+    :any:`sgl.set_fill`.)
+
+    This class will attempt to mix this color value with the
+    :any:`alpha` value, so you can accurately set the transparency of
+    sprites with this property. Keep in mind that under Pygame this is
+    quite slow. """)
 
     def draw_shape(self):
         """ Override this function to specify what shape this sprite
@@ -1019,6 +2516,8 @@ class RectSprite(ShapeSprite):
     """ A subclass of :any:`ShapeSprite` that draws a rectangle in the
     bounding box of the sprite. """
 
+    __slots__ = ()
+
     def draw_shape(self):
         sgl.draw_rect(*self.screen_rect.to_tuple())
 
@@ -1027,6 +2526,8 @@ class EllipseSprite(ShapeSprite):
     circle, if :any:`width` and :any:`height` are the same) in the
     bounding box of the sprite. """
 
+    __slots__ = ()
+
     def draw_shape(self):
         sgl.draw_ellipse(*self.screen_rect.to_tuple())
                 
@@ -1036,7 +2537,35 @@ class Camera(object):
     given scene. """
 
     def __init__(self):
-        self.x, self.y = 0,0
+        self._x, self._y = 0,0
+
+        self.owners = []
+        # """ list: The sprites using this camera, whose children
+        # need their screen positions recalculated when it moves. """
+
+    @property
+    def x(self):
+        """ number: The X position of the camera. """
+
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        if value != self._x:
+            self._x = value
+            for owner in self.owners: owner.mark_camera_dirty()
+
+    @property
+    def y(self):
+        """ number: The Y position of the camera. """
+
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        if value != self._y:
+            self._y = value
+            for owner in self.owners: owner.mark_camera_dirty()
 
     @property
     def position(self):
@@ -1055,12 +2584,12 @@ class Camera(object):
 
     def world_to_screen(self, x, y, parallax=1):
         if parallax == 1:
-            return (x - self.x, y - self.y) 
+            return (x - self._x, y - self._y) 
         else:
-            return (x - self.x/parallax, y - self.y/parallax)             
+            return (x - self._x/parallax, y - self._y/parallax)             
 
     def screen_to_world(self, x, y, parallax=1):
-        return (x + self.x*parallax, y + self.y*parallax) 
+        return (x + self._x*parallax, y + self._y*parallax) 
 
 # Specialized types of groups
 class SpriteGroup(Sprite):
@@ -1070,11 +2599,124 @@ class SpriteGroup(Sprite):
     Identical to a plain :any:`Sprite`, except :any:`infinite_space`
     is turned on by default."""
 
+    __slots__ = ()
+
     def __init__(self):
         super(SpriteGroup, self).__init__()
         
         self.infinite_space = True
 
+class Layer(SpriteGroup):
+    """ A :any:`SpriteGroup` that keeps the sprites inside sorted by
+    their :any:`Sprite.z` values, so they are drawn in that order
+    without having to sort anything when drawing. Changing a sprite's
+    :any:`Sprite.z`, or calling :any:`Sprite.bring_to_front` or
+    :any:`Sprite.send_to_back`, only moves that one sprite. Usually
+    made with :any:`Sprite.add_layer`::
+
+        scene.add_layer("background")
+        scene.add_layer("world")
+        scene.add_layer("hud", fixed=True)
+
+        scene.get_layer("world").add(player)
+        scene.get_layer("hud").add(health_bar)
+
+    Since a layer is just a sprite, it can be hidden with
+    :any:`Sprite.visible`, and its drawing cached with
+    :any:`Sprite.cache_as_surface` (give it a size first). """
+
+    __slots__ = ("next_number", "first_number")
+
+    def __init__(self, name=None):
+        """
+        Args:
+            name: The name of this layer.
+        """
+
+        super(Layer, self).__init__()
+
+        self.name = name
+
+        # Break ties between sprites with the same z, newest in front
+        # (or behind, for send_to_back)
+        self.next_number = 0
+        self.first_number = 0
+
+    def find_place(self, order):
+        # """ Internal use only. Returns the index of the first child
+        # sprite whose place in the order comes after ``order``. """
+
+        subsprites = self.subsprites
+        low, high = 0, len(subsprites)
+        while low < high:
+            middle = (low + high) // 2
+            if order < subsprites[middle]._order:
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    def place(self, sprite, front=True):
+        # """ Internal use only. Inserts a sprite in the right place for
+        # its z. """
+
+        if front:
+            number = self.next_number
+            self.next_number += 1
+        else:
+            self.first_number -= 1
+            number = self.first_number
+
+        # The spatial index draws sprites in the order of _order, so
+        # it follows the layer's order too
+        sprite._order = (sprite._z, number)
+        self.subsprites.insert(self.find_place(sprite._order), sprite)
+
+    def take_out(self, sprite):
+        # """ Internal use only. Removes a sprite from the list, found
+        # by its place in the order. """
+
+        index = self.find_place(sprite._order) - 1
+        if index < 0 or self.subsprites[index] is not sprite:
+            index = self.subsprites.index(sprite)
+        del self.subsprites[index]
+
+    def insert_subsprite(self, sprite):
+        self.place(sprite)
+
+    def restack(self, sprite):
+        self.take_out(sprite)
+        self.place(sprite)
+        self.invalidate()
+
+    def move_subsprite(self, sprite, front):
+        self.take_out(sprite)
+
+        if self.subsprites:
+            if front:
+                sprite._z = max(sprite._z, self.subsprites[-1]._z)
+            else:
+                sprite._z = min(sprite._z, self.subsprites[0]._z)
+
+        self.place(sprite, front)
+        self.invalidate()
+
+    def enable_spatial_index(self, cell_size=256):
+        # The index numbers sprites as it is given them, which would
+        # lose their z values
+        orders = [sprite._order for sprite in self.subsprites]
+        super(Layer, self).enable_spatial_index(cell_size)
+        for sprite, order in zip(self.subsprites, orders):
+            sprite._order = order
+
+# The default sort key of every PerspectiveGroup. Shared, so that
+# sgl.lib.Snapshot can refer to it by name.
+y_key = attrgetter("y")
+
+# Every sprite with no_perspective set. Few sprites set it, so it is
+# kept here instead of on every sprite.
+no_perspective_sprites = weakref.WeakSet()
+
 class PerspectiveGroup(SpriteGroup):
     """ A subclass of :any:`SpriteGroup` that disregards the usual
     sprite rendering order and instead draws every sprite inside in
@@ -1086,15 +2728,50 @@ class PerspectiveGroup(SpriteGroup):
 
     By default, it completely flattens the sprite hierarchy inside
     when drawing sprites. This can be customized with the
-    :any:`max_level` attribute, or by setting a ``no_perspective``
-    attribute to ``True`` on a given sprite instance---this will make
-    it so children of that sprites are not flattened out, and are
-    drawn in their intended order. """
+    :any:`max_level` attribute, or by setting
+    :any:`Sprite.no_perspective` to ``True`` on a given sprite
+    instance---this will make it so children of that sprites are not
+    flattened out, and are drawn in their intended order.
+
+    The flattened list is only rebuilt when sprites are added or
+    taken out somewhere inside, and is kept sorted from one frame to
+    the next. Since most sprites don't pass each other in any given
+    frame, it is nearly sorted already, which makes sorting it again
+    much faster than sorting it from scratch. """
+
+    __slots__ = ("_max_level", "sort_key", "_flattened", "_whole")
 
     def __init__(self):
         super(PerspectiveGroup, self).__init__()
 
+        # Every sprite to draw, flattened and in the order they were
+        # drawn last frame, or None if it needs to be rebuilt
+        self._flattened = None
+
+        # The sprites in _flattened drawn with their children
+        self._whole = set()
+
         self.max_level = 100
+
+        self.sort_key = y_key
+        """ function: Given a sprite, returns the value sprites are
+        sorted by. Sprites with lower values are drawn first. By
+        default, this is each sprite's y coordinate (in the
+        coordinates of its own parent). For example, to sort by the
+        bottom of each sprite instead::
+
+            group.sort_key = lambda sprite: sprite.y + sprite.height
+
+        Or, to sort by a ``z`` attribute you set on your own sprite
+        classes::
+
+            group.sort_key = operator.attrgetter("z")
+
+        Sprites that have the same value keep the order they were drawn
+        in the frame before. """
+
+    @property
+    def max_level(self):
         """ int: The maximum number of levels this class will traverse
         when flattening the sprite hierarchy. So, if you set this to
         1, it will reorder only the sprites directly within this
@@ -1102,7 +2779,16 @@ class PerspectiveGroup(SpriteGroup):
 
         By default, this is set to 100. """
 
-        self.recursion_level = 0
+        return self._max_level
+
+    @max_level.setter
+    def max_level(self, value):
+        self._max_level = value
+        self._flattened = None
+
+    def mark_tree_dirty(self):
+        self._flattened = None
+        super(PerspectiveGroup, self).mark_tree_dirty()
 
     def draw_children(self):
         """ You should not need to deal with this function yourself,
@@ -1118,50 +2804,129 @@ class PerspectiveGroup(SpriteGroup):
         # way to do it
 
         if self.subsprites == []: return
-        # Most accurate way, but slower
-        # Use this if things get stupid again
-        # self.update_screen_positions()
 
-        subsprites = sorted(self.get_subsprites(self), key = lambda o: o.y)
+        if self._flattened is None:
+            self._flattened = []
+            self._whole = set()
+            self.flatten(self, 1)
+
+        # Sorted in place, so that the order from last frame is the
+        # starting point
+        subsprites = self._flattened
+        subsprites.sort(key=self.sort_key)
+
+        whole = self._whole
+        view_rect = self.view_rect
 
         for sprite in subsprites:
-            sprite.screen_x, sprite.screen_y = sprite.world_to_screen(*sprite.position)
+            if not sprite.visible: continue
 
-            if (hasattr(sprite, "no_perspective") 
-                and sprite.no_perspective):
-                draw_function = sprite.draw
-            else:
-                draw_function = sprite.draw_self
+            if sprite._transform_dirty: sprite.refresh_transform()
 
-            if self.view_rect and not sprite.infinite_space:
-                if (sprite.screen_rect.is_in(self.view_rect)):
-                    draw_function()
+            if (view_rect and not sprite.infinite_space
+                and not sprite.screen_rect.is_in(view_rect)):
+                continue
+
+            if sprite in whole:
+                sprite.draw()
             else:
-                draw_function()
+                sprite.draw_self()
 
-    def get_subsprites(self, sprite):
-        # """ Internal use only. Returns a flattened list of a
-        # sprite's subsprites. """
+    def flatten(self, sprite, level):
+        # """ Internal use only. Adds everything inside a sprite to
+        # the flattened list, noting which sprites are drawn with
+        # their children. """
 
-        subsprites = sprite.subsprites[:]
         for item in sprite.subsprites:
-            if ((hasattr(item, "no_perspective") 
-                 and item.no_perspective) or 
-                self.recursion_level >= self.max_level):
-                subsprites.append(item)
-                if item.subsprites:
-                    item.no_perspective = True
+            self._flattened.append(item)
 
+            if (getattr(item, "no_perspective", True)
+                or level >= self._max_level):
+                self._whole.add(item)
             else:
-                self.recursion_level += 1
-                subsprites += self.get_subsprites(item)
-                self.recursion_level -= 1
+                self.flatten(item, level + 1)
+
+class ScenePreparation(object):
+    """ A scene being built a bit at a time by
+    :any:`App.prepare_scene`. """
+
+    def __init__(self, scene, transition=None, budget=0.004):
+        # """ Internal use only. Use App.prepare_scene. """
+
+        self.scene = scene
+        """ :any:`Scene`: The scene being prepared. """
+
+        self.transition = transition
+        """ :any:`Scene`: The scene shown while waiting, if any. """
+
+        self.budget = budget
+        """ float: How many seconds a frame may spend preparing. """
+
+        self.progress = 0.0
+        """ float: How far along preparing is, from 0 to 1, as last
+        reported by :any:`Scene.prepare`. Good for loading bars. """
 
-        return subsprites
+        self.ready = False
+        """ bool: Whether the scene is done being prepared. """
+
+        self.steps = iter(scene.prepare())
+        self.waiting = None
+        self.results = []
+        self.sending = None
+
+    def step(self):
+        # """ Internal use only. Does as much preparing as fits in the
+        # budget. Returns whether the scene is ready. """
+
+        timer = timeit.default_timer
+        start = timer()
+
+        while not self.ready:
+            waiting = self.waiting
+            if waiting is not None:
+                if not isinstance(waiting, list):
+                    if not waiting.done: break
+                    self.sending = waiting.result()
+                else:
+                    # Finishing images takes a little while too, so
+                    # it is spread out as well
+                    results = self.results
+                    while len(results) < len(waiting):
+                        job = waiting[len(results)]
+                        if not job.done: break
+                        results.append(job.result())
+                        if timer() - start >= self.budget: break
+                    if len(results) < len(waiting): break
+                    self.sending, self.results = results, []
+                self.waiting = None
+
+            sending, self.sending = self.sending, None
+            try:
+                if sending is None:
+                    value = next(self.steps)
+                else:
+                    value = self.steps.send(sending)
+            except StopIteration:
+                self.ready = True
+                self.progress = 1.0
+                break
+
+            if isinstance(value, (int, float)):
+                self.progress = value
+            elif value is not None:
+                self.waiting = value
+
+            if timer() - start >= self.budget: break
+
+        return self.ready
 
 class App(object):
     """ A very simple object that wraps over scenes in order to let
-    you easily switch between multiple scenes. """
+    you easily switch between multiple scenes. 
+
+    Scenes that take a while to build can be built a bit at a time
+    instead, while another scene keeps running; see
+    :any:`prepare_scene`. """
 
     def __init__(self, first_scene):
         """
@@ -1171,6 +2936,9 @@ class App(object):
                 :any:`switch_scene`.
         """
 
+        self.preparing = None
+        """ :any:`ScenePreparation`: The scene being prepared, if any. """
+
         self.switch_scene(first_scene)
 
     def switch_scene(self, scene):
@@ -1185,9 +2953,58 @@ class App(object):
         self.scene = scene
         scene.app = self
 
+    def prepare_scene(self, scene, transition=None, budget=0.004):
+        """ Builds a scene a bit at a time, while the current scene
+        (or a transition scene) keeps running, and switches to it once
+        it is ready. The scene is built by its :any:`Scene.prepare`
+        method, which can load images in the background and stop
+        whenever it likes to let a frame be drawn::
+
+            class Battle(Scene):
+                def prepare(self):
+                    # Both images are loaded at the same time
+                    background, hero = yield [
+                        sgl.load_image_async("arena.png"),
+                        sgl.load_alpha_image_async("hero.png")]
+
+                    self.add(Sprite(background))
+                    for i in range(500):
+                        self.add(Enemy())
+                        # Lets a frame be drawn, if this one is out of
+                        # time
+                        yield
+
+            app.prepare_scene(Battle(), transition=Curtain())
+
+        Preparing another scene replaces the one being prepared.
+
+        Args:
+            scene (:any:`Scene`): The scene to prepare. Its
+                ``__init__`` should be quick, leaving the slow parts
+                for :any:`Scene.prepare`.
+            transition (:any:`Scene`): If given, switched to right
+                away, and shown until the scene is ready. 
+            budget (float): How many seconds to spend preparing the
+                scene each frame, at most. A step that takes longer
+                still finishes, so keep steps short.
+
+        Returns:
+            :any:`ScenePreparation`: Shows how far along preparing
+                 is. """
+
+        self.preparing = ScenePreparation(scene, transition, budget)
+        if transition is not None:
+            self.switch_scene(transition)
+        return self.preparing
+
     def update(self):
         """ An update function you can pass to :any:`sgl.run`. """
 
+        preparing = self.preparing
+        if preparing is not None and preparing.step():
+            self.preparing = None
+            self.switch_scene(preparing.scene)
+
         self.scene.update()
 
     def draw(self):
@@ -1222,6 +3039,105 @@ class Scene(Sprite):
 
         self.scene = self
 
+        self.sprite_index = self._sprite_index = SpriteIndex()
+        """ :any:`sgl.lib.SpriteIndex.SpriteIndex`: Keeps track of
+        every sprite in this scene by name, tag and class. See
+        :any:`find`, :any:`by_tag` and :any:`of_type`. """
+
+        self.animation_clock = AnimationClock()
+        """ :any:`AnimationClock`: Plays every
+        :any:`AnimatedSprite` in this scene. Ticked at the start of
+        :any:`update`, so a scene that isn't being updated (because
+        it has been switched away from, or is still being prepared)
+        doesn't animate. """
+
+    def set_sprite_index(self, index):
+        # A scene inside another one keeps its own index
+        pass
+
+    def find(self, name):
+        """ Finds a sprite anywhere in this scene by its
+        :any:`Sprite.name`, without looking through every sprite.
+
+        Args:
+            name: The name to look for.
+
+        Returns:
+            :any:`Sprite`: A sprite with that name, or None if there
+                 aren't any. """
+
+        return self.sprite_index.find(name)
+
+    def find_all(self, name):
+        """ Finds every sprite in this scene with a name.
+
+        Args:
+            name: The name to look for.
+
+        Returns:
+            list: The sprites. Don't change this list. """
+
+        return self.sprite_index.find_all(name)
+
+    def by_tag(self, tag):
+        """ Finds every sprite in this scene with a tag (see
+        :any:`Sprite.tags`), without looking through every sprite::
+
+            for enemy in scene.by_tag("enemy"):
+                enemy.target = scene.find("player")
+
+        Sprites that have been killed are still found until they are
+        taken out of their parent, at the end of its next update.
+
+        Args:
+            tag: The tag to look for.
+
+        Returns:
+            list: The sprites, in no particular order. The scene keeps
+                 this list up to date itself, so don't change it, and
+                 loop over a copy (``list(scene.by_tag("enemy"))``) if
+                 the loop adds or removes sprites with the tag. """
+
+        return self.sprite_index.by_tag(tag)
+
+    def of_type(self, cls):
+        """ Finds every sprite in this scene of a class, or of a class
+        that inherits from it, without looking through every sprite.
+
+        Args:
+            cls (type): The class to look for.
+
+        Returns:
+            list: The sprites, in no particular order. Like
+                 :any:`by_tag`, don't change this list. """
+
+        return self.sprite_index.of_type(cls)
+
+    def prepare(self):
+        """ Builds the slow parts of the scene, when it is prepared by
+        :any:`App.prepare_scene`. Does nothing by default.
+
+        Override this as a generator (a function that uses ``yield``).
+        Each ``yield`` is a point where preparing can stop until the
+        next frame, if this frame's time is used up. What is yielded
+        can be:
+
+        * Nothing, to just allow stopping.
+        * A number from 0 to 1, for how far along preparing is (see
+          :any:`ScenePreparation.progress`).
+        * A job from :py:func:`sgl.load_image_async` or
+          :py:func:`sgl.load_alpha_image_async`, or a list of them.
+          Preparing waits (without stopping the game) until they have
+          loaded, and the ``yield`` gives back the loaded image, or a
+          list of them. """
+
+        return ()
+
+    def update(self):
+        self.animation_clock.tick()
+
+        super(Scene, self).update()
+
     def draw(self):
         sgl.clear(self.background_color)
 
@@ -1232,6 +3148,21 @@ class Viewport(Sprite):
     most circumstances, except it is only rendered in the bounds of
     its bounding box. 
 
+    Turning on :any:`Sprite.cache_as_surface` works a little
+    differently for viewports: the viewport keeps one surface the size
+    of its bounding box for as long as it exists, and draws everything
+    inside onto it again only when something inside changes. When
+    only the camera moves, what is already on the surface is scrolled
+    over, and only the strip that scrolled into view is drawn. This
+    makes scrolling lists, menus and minimaps much cheaper, as long as
+    the camera moves by whole pixels. (Child sprites with a
+    :any:`Sprite.parallax` other than 1, or that are
+    :any:`Sprite.fixed`, don't scroll along with the rest, so with
+    those inside, everything is drawn again whenever the camera
+    moves.) The surface is drawn with the viewport's
+    :any:`Sprite.alpha`, :any:`Sprite.angle` and flipping, and can be
+    drawn elsewhere too; see :any:`offscreen_surface`.
+
     Todo:
         * Make scenes and viewports the same thing. Like, a scene
           automatically become a viewport if its size does not fill
@@ -1257,9 +3188,49 @@ class Viewport(Sprite):
         default it is set to ``None``, which means the background will
         be transparent. """
 
+        # What the cached surface currently shows (see draw_offscreen)
+        self.offscreen_dirty = True
+        self.offscreen_size = None
+        self.offscreen_camera = None
+
+    @property
+    def offscreen_surface(self):
+        """ SGL surface: Read-only property returning the surface
+        everything inside is drawn onto, if :any:`Sprite.cache_as_surface`
+        is on and it has been drawn, or ``None``. Can be drawn
+        somewhere else, scaled down or with effects, for example to
+        show a second copy of a map. """
+
+        return self._cache_surface
+
+    def invalidate(self):
+        if not self._cache_as_surface:
+            super(Viewport, self).invalidate()
+            return
+
+        # The surface is kept, to be drawn over
+        self.offscreen_dirty = True
+        if self._cache_root is not None:
+            self._cache_root.invalidate()
+
+    def mark_camera_dirty(self):
+        if not self._cache_as_surface:
+            super(Viewport, self).mark_camera_dirty()
+            return
+
+        # draw_offscreen notices the camera has moved by itself, and
+        # scrolls instead of drawing everything again
+        if self._cache_root is not None:
+            self._cache_root.invalidate()
+        self.mark_children_dirty()
+
     def draw(self):
         if not self.visible: return
 
+        if self._cache_as_surface and self.draw_offscreen():
+            self.draw_self()
+            return
+
         with sgl.with_state():
             self.view_rect = self.screen_rect
 
@@ -1280,6 +3251,140 @@ class Viewport(Sprite):
 
         self.draw_self()
 
+    def draw_offscreen(self):
+        # """ Internal use only. Brings the cached surface up to date,
+        # and draws it. Returns False if it couldn't be drawn. """
+
+        width = max(int(math.ceil(self.width)), 0)
+        height = max(int(math.ceil(self.height)), 0)
+        camera = self._camera
+        position = (camera._x, camera._y) if camera is not None else (0, 0)
+
+        surface = self._cache_surface
+        regions = [(0, 0, width, height)]
+
+        if surface is None or self.offscreen_size != (width, height):
+            color = self.background_color
+            if color is None or (isinstance(color, tuple)
+                                 and len(color) in (2, 4)):
+                surface = sgl.make_surface(width, height)
+            else:
+                # Without transparency, it's quicker to draw
+                surface = sgl.make_surface(width, height, 0)
+        elif not self.offscreen_dirty:
+            if position == self.offscreen_camera:
+                regions = []
+            else:
+                regions = self.scroll_offscreen(surface, position)
+
+        if regions and not self.render_offscreen(surface, regions):
+            return False
+
+        self._cache_surface = surface
+        self.offscreen_size = (width, height)
+        self.offscreen_camera = position
+        self.offscreen_dirty = False
+
+        a_x, a_y = self.real_anchor
+        if (not (self._flip_h or self._flip_v)
+            and (self._alpha == 255 or self._alpha == 1.0)
+            and self._angle == 0):
+            sgl.blitf(surface, self.screen_x - a_x, self.screen_y - a_y)
+        else:
+            sgl.blit(surface, self.screen_x, self.screen_y,
+                     a_x=self._a_x, a_y=self._a_y,
+                     angle=self._angle, pretty=self.pretty,
+                     flip_h=self._flip_h, flip_v=self._flip_v,
+                     alpha=self._alpha)
+
+        self.view_rect = self.screen_rect
+        return True
+
+    def scroll_offscreen(self, surface, position):
+        # """ Internal use only. Scrolls the cached surface along with
+        # the camera, and returns the strips that need to be drawn
+        # again, as (x, y, width, height) tuples. """
+
+        width, height = self.offscreen_size
+        full = [(0, 0, width, height)]
+
+        # Pixels are only where they would be drawn again if the
+        # camera is at whole numbers, before and after
+        for value in self.offscreen_camera + position:
+            if value != int(value): return full
+
+        dx = int(self.offscreen_camera[0] - position[0])
+        dy = int(self.offscreen_camera[1] - position[1])
+        if abs(dx) >= width or abs(dy) >= height:
+            return full
+
+        for sprite in self.subsprites:
+            if ((sprite._parallax != 1 or sprite._fixed)
+                and not sprite._cancel_parent_transform):
+                return full
+
+        with sgl.with_buffer(surface):
+            sgl.scroll(dx, dy)
+
+        regions = []
+        if dx > 0:
+            regions.append((0, 0, dx, height))
+        elif dx < 0:
+            regions.append((width + dx, 0, -dx, height))
+        if dy > 0:
+            regions.append((0, 0, width, dy))
+        elif dy < 0:
+            regions.append((0, height + dy, width, -dy))
+        return regions
+
+    def render_offscreen(self, surface, regions):
+        # """ Internal use only. Draws everything inside onto parts of
+        # the cached surface, as if the top left corner of the bounding
+        # box was the top left corner of the screen. """
+
+        screen_x, screen_y = self.screen_x, self.screen_y
+        self.screen_x, self.screen_y = self.real_anchor
+
+        # Only the sprites that are drawn have their screen positions
+        # worked out again, which matters when drawing thin strips
+        drawn = []
+
+        try:
+            with sgl.with_buffer(surface):
+                try:
+                    for region in regions:
+                        self.view_rect = Rect(*region)
+                        if self._spatial_index is not None:
+                            subsprites = self.get_visible_subsprites()
+                        else:
+                            subsprites = self.subsprites
+                        for sprite in subsprites:
+                            if not sprite._transform_dirty:
+                                sprite.mark_transform_dirty()
+                        drawn.extend(subsprites)
+
+                        sgl.set_clip_rect(*region)
+                        if self.background_color is None:
+                            sgl.clear(0, 0)
+                        else:
+                            sgl.clear(self.background_color)
+                        self.draw_children()
+                finally:
+                    # The surface keeps its clip rectangle, which would
+                    # get in the way of scrolling it
+                    sgl.no_clip_rect()
+        except sgl.BackendError:
+            self.cache_as_surface = False
+            return False
+        finally:
+            self.screen_x, self.screen_y = screen_x, screen_y
+            self.view_rect = None
+            for sprite in drawn:
+                if not sprite._transform_dirty:
+                    sprite.mark_transform_dirty()
+
+        return True
+
 if __name__ == "__main__":
     # sgl.init(320, 240, 2)
     sgl.init(640, 480, 1)
@@ -0,0 +1,351 @@
+""" This module provides :any:`SpriteArray`, a sprite that holds a
+whole swarm of simple entities (bullets, particles, enemies in a
+shoot-'em-up...) in NumPy arrays instead of as one Python object each.
+Moving, culling and drawing them are each done in a handful of array
+operations, so tens of thousands of entities are no problem.
+
+In exchange, entities can't do everything a :any:`sgl.lib.Sprite.Sprite`
+can: each one only has a position, a velocity, a frame, an alpha value
+and a visibility flag, and any logic has to be written as operations on
+whole arrays. For example::
+
+    class Rain(SpriteArray):
+        def update(self):
+            super(Rain, self).update()
+
+            # Everything that fell off the bottom of the screen
+            e = self.entities
+            self.kill_entities(e.y > sgl.get_height())
+
+    rain = Rain(drop_surface)
+    rain.spawn_many(xs, ys, vy=200)
+    scene.add(rain)
+
+Requires NumPy.
+"""
+
+import sgl
+from sgl.lib.Sprite import Sprite
+
+try:
+    import numpy as np
+    has_numpy = True
+except ImportError:
+    has_numpy = False
+
+if has_numpy:
+    FIELDS = (
+        ("x", np.float64, 0),
+        ("y", np.float64, 0),
+        ("prev_x", np.float64, 0),
+        ("prev_y", np.float64, 0),
+        ("vx", np.float64, 0),
+        ("vy", np.float64, 0),
+        ("frame", np.intp, 0),
+        ("alpha", np.float32, 255),
+        ("visible", np.bool_, True),
+    )
+
+class Entities(object):
+    """ Holds one NumPy array per entity attribute of a
+    :any:`SpriteArray`, each only as long as the number of entities
+    alive:
+
+    * ``x``, ``y``: The position of each entity, in the local
+      coordinates of the :any:`SpriteArray`.
+    * ``prev_x``, ``prev_y``: The position of each entity before the
+      last update.
+    * ``vx``, ``vy``: How many pixels per second each entity moves.
+    * ``frame``: The index of the frame each entity is drawn with.
+    * ``alpha``: How transparent each entity is drawn, from 0 to 255.
+    * ``visible``: Whether each entity is drawn.
+
+    Change them in place (``entities.x += 1``) rather than replacing
+    them. The arrays are replaced whenever entities are added or
+    removed, so don't hold on to them between frames. """
+
+    pass
+
+class SpriteArray(Sprite):
+    """ A sprite that holds many simple entities in NumPy arrays. See
+    the module documentation. """
+
+    def __init__(self, frames, capacity=1024):
+        """
+        Args:
+            frames (SGL Surface or list): The graphic every entity is
+                drawn with, or a list of graphics, one of which is
+                picked for each entity by its ``frame``. They should
+                all be the same size.
+            capacity (int): How many entities to make room for at
+                first. Room for more is made automatically.
+        """
+
+        if not has_numpy:
+            raise sgl.ArgumentError("SpriteArray requires NumPy")
+
+        super(SpriteArray, self).__init__()
+
+        self.infinite_space = True
+
+        if not isinstance(frames, list):
+            frames = [frames]
+
+        self.frames = frames
+        """ list: The graphics entities are drawn with. """
+
+        self.frame_objects = np.empty(len(frames), dtype=object)
+        self.frame_objects[:] = frames
+
+        with sgl.with_buffer(frames[0]):
+            self.entity_width = sgl.get_width()
+            """ int: The width of every entity, used for culling and
+            collisions. Defaults to the width of the first frame. """
+
+            self.entity_height = sgl.get_height()
+            """ int: The height of every entity. Defaults to the
+            height of the first frame. """
+
+        self.entity_a_x = 0
+        """ number: The X position of the anchor point of every
+        entity. Like :any:`Sprite.a_x`, a float is a fraction of the
+        entity's width. """
+
+        self.entity_a_y = 0
+        """ number: The Y position of the anchor point of every
+        entity. """
+
+        self.count = 0
+        """ int: How many entities there are. """
+
+        self.storage = dict(
+            (name, np.full(capacity, default, dtype=dtype))
+            for name, dtype, default in FIELDS)
+        self.dead = np.zeros(capacity, dtype=np.bool_)
+
+        self.entities = Entities()
+        """ :any:`Entities`: The arrays of every entity attribute. """
+
+        self.hits = np.zeros(0, dtype=np.intp)
+        """ NumPy array: The indices of the entities that overlapped
+        the sprite in the last collision check against this
+        array. (See :any:`is_being_collided`.) """
+
+        self.refresh_views()
+
+    def __len__(self):
+        return self.count
+
+    def refresh_views(self):
+        # """ Internal use only. Points the arrays in self.entities at
+        # the living part of the storage. """
+
+        for name, dtype, default in FIELDS:
+            setattr(self.entities, name, self.storage[name][:self.count])
+
+    def grow(self, needed):
+        # """ Internal use only. Makes room for at least ``needed``
+        # entities. """
+
+        capacity = len(self.dead)
+        if needed <= capacity: return
+
+        # Doubling an empty array would never make room
+        capacity = max(capacity, 1)
+        while capacity < needed:
+            capacity *= 2
+
+        for name, dtype, default in FIELDS:
+            old = self.storage[name]
+            self.storage[name] = np.full(capacity, default, dtype=dtype)
+            self.storage[name][:len(old)] = old
+
+        dead = np.zeros(capacity, dtype=np.bool_)
+        dead[:len(self.dead)] = self.dead
+        self.dead = dead
+
+    def spawn(self, x, y, vx=0, vy=0, frame=0, alpha=255, visible=True):
+        """ Adds one entity.
+
+        Returns:
+            int: The index of the new entity. Indices change whenever
+                 entities are removed, so don't keep it around. """
+
+        return self.spawn_many([x], [y], vx, vy, frame, alpha, visible)[0]
+
+    def spawn_many(self, x, y, vx=0, vy=0, frame=0, alpha=255, visible=True):
+        """ Adds many entities at once. Every argument can be either a
+        single value, which is used for every new entity, or an array
+        with one value per entity.
+
+        Args:
+            x (array): The X positions of the new entities.
+            y (array): The Y positions of the new entities.
+            vx (number or array): Their horizontal velocities.
+            vy (number or array): Their vertical velocities.
+            frame (int or array): Their frames.
+            alpha (number or array): Their alpha values.
+            visible (bool or array): Whether they are visible.
+
+        Returns:
+            NumPy array: The indices of the new entities. """
+
+        x = np.asarray(x, dtype=np.float64)
+        amount = len(x)
+        start = self.count
+
+        self.grow(start + amount)
+        self.count += amount
+
+        values = {"x": x, "y": y, "prev_x": x, "prev_y": y,
+                  "vx": vx, "vy": vy, "frame": frame, "alpha": alpha,
+                  "visible": visible}
+        for name, value in values.items():
+            self.storage[name][start:self.count] = value
+        self.dead[start:self.count] = False
+
+        self.refresh_views()
+        return np.arange(start, self.count)
+
+    def kill_entities(self, which):
+        """ Marks entities to be removed. They will not be drawn or
+        collided with any more, and are taken out at the start of the
+        next :any:`update`.
+
+        Args:
+            which (array): Either the indices of the entities to kill,
+                or a boolean array with one value per entity. """
+
+        self.dead[:self.count][which] = True
+
+    def remove_dead(self):
+        # """ Internal use only. Packs the living entities together, all
+        # at once. """
+
+        alive = ~self.dead[:self.count]
+        remaining = int(alive.sum())
+        if remaining == self.count: return
+
+        for name, dtype, default in FIELDS:
+            array = self.storage[name]
+            array[:remaining] = array[:self.count][alive]
+
+        self.dead[:self.count] = False
+        self.count = remaining
+        self.refresh_views()
+
+    def update(self):
+        """ Removes killed entities and moves every entity by its
+        velocity. Override this to add your own logic, and call the
+        base class version first. """
+
+        super(SpriteArray, self).update()
+
+        self.remove_dead()
+
+        e = self.entities
+        e.prev_x[:] = e.x
+        e.prev_y[:] = e.y
+
+        dt = sgl.get_dt()
+        e.x += e.vx * dt
+        e.y += e.vy * dt
+
+    def real_entity_anchor(self):
+        # """ Internal use only. """
+
+        a_x, a_y = self.entity_a_x, self.entity_a_y
+        if isinstance(a_x, float): a_x = self.entity_width * a_x
+        if isinstance(a_y, float): a_y = self.entity_height * a_y
+        return a_x, a_y
+
+    def query_rect(self, x, y, width, height):
+        """ Finds the entities that overlap a rectangle.
+
+        Args:
+            x (number): The left edge of the rectangle, in this
+                sprite's local coordinates.
+            y (number): The top edge of the rectangle.
+            width (number): The width of the rectangle.
+            height (number): The height of the rectangle.
+
+        Returns:
+            NumPy array: The indices of the entities. """
+
+        e = self.entities
+        a_x, a_y = self.real_entity_anchor()
+        left = e.x - a_x
+        top = e.y - a_y
+
+        overlapping = ((left + self.entity_width > x) & (left < x + width)
+                       & (top + self.entity_height > y) & (top < y + height)
+                       & ~self.dead[:self.count])
+        return np.flatnonzero(overlapping)
+
+    def is_being_collided(self, other):
+        """ Returns whether a sprite overlaps any entity, so a
+        :any:`SpriteArray` can be used with :any:`sgl.lib.Collision`
+        like any other sprite. The indices of the entities it overlaps
+        are stored in :any:`hits`, so collision callbacks can find out
+        which ones were hit.
+
+        Args:
+            other (:any:`Sprite`): The sprite to test. Its position is
+                assumed to be in the same coordinates as this sprite's
+                (in other words, they should have the same parent).
+
+        Returns:
+            bool: Whether the sprite overlaps any entity. """
+
+        left, top, right, bottom = other.collision_bounds
+        self.hits = self.query_rect(left - self.x, top - self.y,
+                                    right - left, bottom - top)
+        return len(self.hits) > 0
+
+    def draw_self(self):
+        if not self.count: return
+
+        e = self.entities
+        a_x, a_y = self.real_entity_anchor()
+        screen_x = np.floor(e.x + (self.screen_x - a_x)).astype(np.intp)
+        screen_y = np.floor(e.y + (self.screen_y - a_y)).astype(np.intp)
+
+        # Cull everything outside the view in one go
+        view = self.get_view_rect()
+        shown = ((screen_x + self.entity_width > view.x)
+                 & (screen_x < view.x + view.width)
+                 & (screen_y + self.entity_height > view.y)
+                 & (screen_y < view.y + view.height)
+                 & e.visible & (e.alpha > 0) & ~self.dead[:self.count])
+
+        indices = np.flatnonzero(shown)
+        if not len(indices): return
+
+        frames = e.frame[indices]
+        alpha = e.alpha[indices]
+
+        positions = np.column_stack(
+            (screen_x[indices], screen_y[indices])).tolist()
+        if len(self.frames) == 1:
+            things = self.frames[0]
+        else:
+            things = self.frame_objects[frames].tolist()
+
+        # Opaque entities are drawn in as few calls as possible.
+        # Translucent ones need the backend's alpha handling, so they
+        # are drawn one at a time, in between, so that entities are
+        # still drawn in order
+        start = 0
+        for place in np.flatnonzero(alpha < 255).tolist() + [len(indices)]:
+            if place > start:
+                if len(self.frames) == 1:
+                    batch = things
+                else:
+                    batch = things[start:place]
+                sgl.blit_many(batch, positions[start:place])
+
+            if place < len(indices):
+                x, y = positions[place]
+                sgl.blit(self.frames[frames[place]], x, y,
+                         alpha=int(alpha[place]))
+            start = place + 1
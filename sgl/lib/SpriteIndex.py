@@ -0,0 +1,198 @@
+""" This module provides :any:`SpriteIndex`, which keeps track of every
+sprite in a :any:`sgl.lib.Sprite.Scene` by name, by tag, and by class,
+so that sprites can be found without looking through the whole sprite
+tree. You should not usually need to use it directly---use
+:any:`sgl.lib.Sprite.Scene.find`, :any:`sgl.lib.Sprite.Scene.by_tag`
+and :any:`sgl.lib.Sprite.Scene.of_type` instead.
+
+Sprites are added to the index of their scene when they are added to
+the scene (or to anything inside it), and taken out when they are
+removed, so looking sprites up only costs as much as the number of
+sprites found. """
+
+class Bucket(object):
+    # """ Internal use only. A list of sprites that a sprite can be
+    # taken out of without searching for it, by moving the last sprite
+    # into its place. """
+
+    __slots__ = ("sprites", "places")
+
+    def __init__(self):
+        self.sprites = []
+        self.places = {}
+
+    def add(self, sprite):
+        if sprite in self.places: return
+        self.places[sprite] = len(self.sprites)
+        self.sprites.append(sprite)
+
+    def remove(self, sprite):
+        place = self.places.pop(sprite, None)
+        if place is None: return
+
+        last = self.sprites.pop()
+        if last is not sprite:
+            self.sprites[place] = last
+            self.places[last] = place
+
+class SpriteIndex(object):
+    """ Keeps track of sprites by name, tag, and class. """
+
+    def __init__(self):
+        self.names = {}
+        """ dict: Maps names to :any:`Bucket` objects holding every
+        sprite with that name. """
+
+        self.tags = {}
+        """ dict: Maps tags to :any:`Bucket` objects holding every
+        sprite with that tag. """
+
+        self.classes = {}
+        """ dict: Maps classes to :any:`Bucket` objects holding every
+        sprite of exactly that class. """
+
+        # Class given to of_type -> buckets of it and its subclasses
+        self.subclass_buckets = {}
+
+    def __len__(self):
+        return sum(len(bucket.sprites) for bucket in self.classes.values())
+
+    def __contains__(self, sprite):
+        bucket = self.classes.get(type(sprite))
+        return bucket is not None and sprite in bucket.places
+
+    def add(self, sprite):
+        """ Starts keeping track of a sprite. Does nothing if it is
+        already being kept track of.
+
+        Args:
+            sprite (:any:`sgl.lib.Sprite.Sprite`): The sprite to add. """
+
+        cls = type(sprite)
+        bucket = self.classes.get(cls)
+        if bucket is None:
+            bucket = self.classes[cls] = Bucket()
+            self.subclass_buckets.clear()
+        bucket.add(sprite)
+
+        if sprite.name is not None:
+            self.add_name(sprite, sprite.name)
+        for tag in sprite.tags:
+            self.add_tag(sprite, tag)
+
+    def remove(self, sprite):
+        """ Stops keeping track of a sprite.
+
+        Args:
+            sprite (:any:`sgl.lib.Sprite.Sprite`): The sprite to
+                remove. """
+
+        bucket = self.classes.get(type(sprite))
+        if bucket is not None:
+            bucket.remove(sprite)
+
+        if sprite.name is not None:
+            self.remove_name(sprite, sprite.name)
+        for tag in sprite.tags:
+            self.remove_tag(sprite, tag)
+
+    def add_name(self, sprite, name):
+        # """ Internal use only. """
+
+        bucket = self.names.get(name)
+        if bucket is None:
+            bucket = self.names[name] = Bucket()
+        bucket.add(sprite)
+
+    def remove_name(self, sprite, name):
+        # """ Internal use only. """
+
+        bucket = self.names.get(name)
+        if bucket is not None:
+            bucket.remove(sprite)
+            if not bucket.sprites: del self.names[name]
+
+    def add_tag(self, sprite, tag):
+        # """ Internal use only. """
+
+        bucket = self.tags.get(tag)
+        if bucket is None:
+            bucket = self.tags[tag] = Bucket()
+        bucket.add(sprite)
+
+    def remove_tag(self, sprite, tag):
+        # """ Internal use only. """
+
+        bucket = self.tags.get(tag)
+        if bucket is not None:
+            bucket.remove(sprite)
+
+    def find(self, name):
+        """ Finds a sprite by name.
+
+        Args:
+            name: The name to look for.
+
+        Returns:
+            :any:`sgl.lib.Sprite.Sprite`: A sprite with that name, or
+                 None if there aren't any. If there are several, which
+                 one is returned is not defined. """
+
+        bucket = self.names.get(name)
+        if bucket is None: return None
+        return bucket.sprites[0]
+
+    def find_all(self, name):
+        """ Finds every sprite with a name.
+
+        Args:
+            name: The name to look for.
+
+        Returns:
+            list: The sprites. Don't change this list. """
+
+        bucket = self.names.get(name)
+        if bucket is None: return []
+        return bucket.sprites
+
+    def by_tag(self, tag):
+        """ Finds every sprite with a tag.
+
+        Args:
+            tag: The tag to look for.
+
+        Returns:
+            list: The sprites, in no particular order. This is the list
+                 the index keeps up to date itself, so don't change it,
+                 and copy it with ``list()`` before looping over it if
+                 the loop adds or removes sprites with the tag. """
+
+        bucket = self.tags.get(tag)
+        if bucket is None:
+            bucket = self.tags[tag] = Bucket()
+        return bucket.sprites
+
+    def of_type(self, cls):
+        """ Finds every sprite of a class, including the classes that
+        inherit from it.
+
+        Args:
+            cls (type): The class to look for.
+
+        Returns:
+            list: The sprites, in no particular order. Like
+                 :any:`by_tag`, don't change this list. """
+
+        buckets = self.subclass_buckets.get(cls)
+        if buckets is None:
+            buckets = self.subclass_buckets[cls] = [
+                bucket for other, bucket in self.classes.items()
+                if issubclass(other, cls)]
+
+        if len(buckets) == 1:
+            return buckets[0].sprites
+
+        sprites = []
+        for bucket in buckets:
+            sprites.extend(bucket.sprites)
+        return sprites
@@ -117,9 +117,15 @@ class Tilemap(Sprite):
     def update(self):
         super(Tilemap, self).update()
 
+        # Tiles are never added to the scene, and can be shared by
+        # maps in different scenes, so animated ones are advanced here
+        # instead of by a scene's animation clock
+        dt = sgl.get_dt()
         for item in self.to_update:
             item.preupdate()
             item.update()
+            if isinstance(item, AnimatedSprite) and item.anim_playing:
+                item.anim_step(dt)
 
     def draw_self(self):
         start_x = int(self.screen_x)
@@ -157,22 +163,60 @@ class Tilemap(Sprite):
         x = start_x
         y = start_y
 
+        # Work out what each tile looks like this frame just once, so
+        # animated tiles can be blitted like any other
+        surfaces = [self.get_tile_surface(tile) for tile in self.tiles]
+
+        things = []
+        positions = []
+
         for row in range(first_row, last_row+1):
             for column in range(first_column, last_column+1):
-                tile = self.tiles[self.map[row][column]]
-                if isinstance(tile, Sprite):
+                index = self.map[row][column]
+                surface = surfaces[index]
+                if surface is not None:
+                    things.append(surface)
+                    positions.append((x, y))
+                else:
+                    tile = self.tiles[index]
                     tile.position = x, y
                     tile.update_screen_positions()
                     tile.draw()
-                else:
-                    sgl.blitf(tile, x, y)
 
                 x += self.tile_size[0]
 
             y += self.tile_size[1]
             x = start_x
 
+        if things:
+            sgl.blit_many(things, positions)
+
+    def get_tile_surface(self, tile):
+        # """ Internal use only. Returns the surface to blit for a
+        # tile, or None if it has to be drawn as a sprite. """
+
+        if not isinstance(tile, Sprite):
+            return tile
+
+        # Animated tiles are shared by every spot on the map they are
+        # used in, so they are all on the same frame, and drawing one
+        # is just drawing its current frame
+        if (isinstance(tile, AnimatedSprite) and tile.visible
+            and tile.surface and not tile.subsprites
+            and tile.real_anchor == (0, 0)
+            and not (tile.flip_h or tile.flip_v)
+            and tile.alpha == 255 and tile.angle == 0):
+            return tile.surface
+
+        return None
+
 class AnimatedTile(AnimatedSprite):
+    """ A tile that plays an animation. One is made for each kind of
+    animated tile in :any:`Tilemap.tiles`, and every spot on the map
+    using it shows the same frame, so the map only has to look up the
+    current frame once per frame, no matter how much of the screen
+    the tile covers. """
+
     def __init__(self, frames, speed, animation=[]):
         super(AnimatedTile, self).__init__()
 